@@ -1,6 +1,7 @@
 # backend/app/main.py
 
 # Importaciones necesarias para la aplicación FastAPI
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -14,53 +15,57 @@ from backend.app.routers import (
     reportes,
     admin,
     clima,
+    mapa,
+    eventos,
 )
 
 # Importaciones necesarias para el scheduler de alertas automáticas
-from apscheduler.schedulers.background import BackgroundScheduler
-from backend.models.clima_mdls import ClimaModel
-from backend.models.alertas_calor_mdls import AlertaCalorModel
-from backend.models.notificaciones_mdls import NotificacionModel
-
-# Crear instancia de la aplicación FastAPI
-app = FastAPI(title="CalorSOS API")
+import os
+from backend.worker.tareas import crear_scheduler, registro_tareas
+from backend.services.cliente_clima import ClienteClima
+from backend.database.supabase_config import SupabaseAsync
+from backend.services.serializacion import RespuestaJSON
+from backend.app.security.servicio_passwords import ServicioPasswords
+from backend.app.middleware.compresion import MiddlewareCompresion
+from backend.app.middleware.etag_condicional import MiddlewareETag
 
 # ------------------------ SCHEDULER DE ALERTAS AUTOMÁTICAS ------------------------
 
-scheduler = BackgroundScheduler()
+# Las tareas programadas están en backend/worker/tareas.py. Con
+# CALORSOS_SCHEDULER_EN_API=0 la API no las programa y se ejecutan solo en
+# el worker dedicado (python -m backend.worker). Si la API las programa, el
+# arriendo de liderazgo evita que cada worker de uvicorn ejecute su propia copia.
+SCHEDULER_EN_API = os.getenv("CALORSOS_SCHEDULER_EN_API", "1") != "0"
+
+# -----------------------------------------------------------------------------------
 
-def tarea_alerta_automatica():
+@asynccontextmanager
+async def lifespan(app: FastAPI):
     """
-    Tarea automática que consulta el clima, evalúa si debe generarse una alerta,
-    crea la alerta en la base de datos y genera notificaciones globales.
+    Inicia el scheduler (si está habilitado en la API) con el event loop de la
+    aplicación y los procesos de bcrypt; al apagar los detiene y libera los pools
+    de conexiones de Open-Meteo y de la base de datos.
     """
-    try:
-        clima = ClimaModel.obtener_clima("Cartagena")
-        nivel = ClimaModel.evaluar_alerta_climatica(clima)
-        clima["nivel_alerta"] = nivel
-
-        # Crear alerta basada en clima
-        alerta = AlertaCalorModel.crear_alerta_desde_clima(clima)
-
-        # Mensaje de notificación
-        mensaje = (
-            f"⚠️ ALERTA DE CALOR {nivel.upper()} — "
-            f"Temp: {clima['temperatura']}°C, UV: {clima['uv_index']}"
-        )
+    ServicioPasswords.iniciar()
+    scheduler = crear_scheduler() if SCHEDULER_EN_API else None
+    if scheduler is not None:
+        scheduler.start()
+    yield
+    if scheduler is not None:
+        scheduler.shutdown(wait=False)
+        await registro_tareas.detener()
+    await ClienteClima.cerrar()
+    await SupabaseAsync.cerrar()
+    ServicioPasswords.cerrar()
 
-        # Enviar notificaciones globales
-        NotificacionModel.crear_notificaciones_globales(mensaje)
-
-        print("Alerta y notificaciones generadas automáticamente.")
-
-    except Exception as e:
-        print(f"Error en tarea automática de alerta: {e}")
-
-# Ejecutar la tarea de alertas cada 30 minutos
-scheduler.add_job(tarea_alerta_automatica, "interval", minutes=10)
-scheduler.start()
+# Crear instancia de la aplicación FastAPI
+# Las respuestas se serializan con orjson en vez de json.dumps
+app = FastAPI(title="CalorSOS API", lifespan=lifespan, default_response_class=RespuestaJSON)
 
-# -----------------------------------------------------------------------------------
+# Middlewares de respuesta: el último agregado es el más externo. El de ETag
+# ve el cuerpo sin comprimir; CORS agrega sus cabeceras también a los 304
+app.add_middleware(MiddlewareETag)
+app.add_middleware(MiddlewareCompresion)
 
 # Configurar middleware CORS para permitir acceso desde frontend
 app.add_middleware(
@@ -87,6 +92,8 @@ app.include_router(notificaciones.router)
 app.include_router(reportes.router)
 app.include_router(admin.router)
 app.include_router(clima.router)
+app.include_router(mapa.router)
+app.include_router(eventos.router)
 
 @app.get("/")
 def root():
@@ -0,0 +1,7 @@
+# Inicio __init__.py
+
+# backend/app/middleware/__init__.py
+
+# Archivo de inicialización del módulo middleware
+
+# Fin __init__.py
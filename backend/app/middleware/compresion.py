@@ -0,0 +1,76 @@
+# Inicio compresion.py
+
+# backend/app/middleware/compresion.py
+
+# Importaciones necesarias para el middleware de compresión
+import os
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from backend.services.serializacion import comprimir, elegir_codificacion
+
+# Bytes mínimos de cuerpo para comprimir una respuesta
+UMBRAL_COMPRESION = int(os.getenv("CALORSOS_UMBRAL_COMPRESION", "1024"))
+
+# Tipos de contenido que vale la pena comprimir
+TIPOS_COMPRIMIBLES = ("application/json", "text/")
+
+
+# Clase principal del middleware de compresión
+class MiddlewareCompresion:
+    """
+    Comprime con brotli (si está instalado y el cliente lo acepta) o gzip las
+    respuestas JSON y de texto a partir de 'umbral' bytes. Solo se comprimen las
+    respuestas que llegan en un único bloque: los flujos (SSE) y las respuestas
+    que ya traen Content-Encoding (cuerpos pre-comprimidos de la caché) pasan sin cambios.
+    """
+
+    def __init__(self, app: ASGIApp, umbral: int = UMBRAL_COMPRESION):
+        self.app = app
+        self.umbral = umbral
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        codificacion = elegir_codificacion(Headers(scope=scope).get("accept-encoding", ""))
+        inicio = None
+
+        async def enviar(mensaje: Message):
+            nonlocal inicio
+            if mensaje["type"] == "http.response.start":
+                # Los flujos de eventos se envían de inmediato; el resto se retiene hasta conocer el cuerpo
+                if Headers(raw=mensaje["headers"]).get("content-type", "").startswith("text/event-stream"):
+                    await send(mensaje)
+                else:
+                    inicio = mensaje
+                return
+            if inicio is None:
+                await send(mensaje)
+                return
+
+            cabeceras = MutableHeaders(raw=inicio["headers"])
+            cuerpo = mensaje.get("body", b"")
+            if not mensaje.get("more_body", False) and self._comprimible(cabeceras, cuerpo):
+                # El cuerpo depende de Accept-Encoding aunque este cliente no comprima
+                cabeceras.add_vary_header("Accept-Encoding")
+                if codificacion is not None:
+                    cuerpo = comprimir(cuerpo, codificacion)
+                    cabeceras["Content-Encoding"] = codificacion
+                    cabeceras["Content-Length"] = str(len(cuerpo))
+                    mensaje = {"type": "http.response.body", "body": cuerpo}
+
+            await send(inicio)
+            inicio = None
+            await send(mensaje)
+
+        await self.app(scope, receive, enviar)
+
+    def _comprimible(self, cabeceras: MutableHeaders, cuerpo: bytes) -> bool:
+        return (
+            len(cuerpo) >= self.umbral
+            and "content-encoding" not in cabeceras
+            and cabeceras.get("content-type", "").startswith(TIPOS_COMPRIMIBLES)
+        )
+
+# Fin compresion.py
@@ -0,0 +1,139 @@
+# Inicio etag_condicional.py
+
+# backend/app/middleware/etag_condicional.py
+
+# Importaciones necesarias para el middleware de GET condicional
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, List, Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Proveedores de versión registrados: (prefijo de ruta, función que retorna la versión, vigencia)
+_proveedores: List[Tuple[str, Callable[[], Hashable], float]] = []
+
+
+def registrar_version(prefijo: str, proveedor: Callable[[], Hashable], vigencia: float = 300):
+    """
+    Registra la versión de los datos que sirven las rutas GET que empiezan por 'prefijo'.
+    Mientras 'proveedor()' retorne el mismo valor (y no pasen 'vigencia' segundos),
+    una respuesta ya enviada no cambia y su ETag se puede confirmar sin ejecutar el handler.
+    Los routers lo invocan al importarse, junto a la caché que invalida la versión.
+    """
+    _proveedores.append((prefijo, proveedor, vigencia))
+
+
+def _proveedor_de(ruta: str) -> Optional[Tuple[str, Callable[[], Hashable], float]]:
+    for registro in _proveedores:
+        if ruta.startswith(registro[0]):
+            return registro
+    return None
+
+
+def calcular_etag(cuerpo: bytes) -> str:
+    """
+    ETag fuerte a partir del hash del cuerpo sin comprimir (mismo formato que la caché por tabla).
+    """
+    return f'"{hashlib.sha1(cuerpo).hexdigest()[:20]}"'
+
+
+def coincide(etag: str, if_none_match: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (e.strip().removeprefix("W/") for e in if_none_match.split(","))
+
+
+# Clase principal del middleware de GET condicional
+class MiddlewareETag:
+    """
+    Agrega un ETag a las respuestas GET 200 completas que no lo traen y responde 304
+    (sin cuerpo) si coincide con If-None-Match. Para las rutas con proveedor de
+    versión recuerda el ETag enviado por ruta y consulta; si la versión no cambió,
+    el siguiente If-None-Match con ese ETag responde 304 antes de llegar al handler,
+    sin consultar la base de datos. Guarda a lo sumo 'capacidad' rutas.
+    """
+
+    def __init__(self, app: ASGIApp, capacidad: int = 2048):
+        self.app = app
+        self.capacidad = capacidad
+        # (ruta, consulta) -> (versión, etag, guardado_en)
+        self._enviados: "OrderedDict[Tuple[str, bytes], Tuple[Hashable, str, float]]" = OrderedDict()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match", "")
+        clave = (scope["path"], scope["query_string"])
+        registro = _proveedor_de(scope["path"])
+        # La versión se lee antes del handler: si cambia durante la consulta, el ETag
+        # guardado queda asociado a la versión anterior y no se usa para anticipar
+        version = registro[1]() if registro else None
+
+        if registro and if_none_match:
+            enviado = self._enviados.get(clave)
+            if enviado is not None and enviado[0] == version \
+                    and time.monotonic() - enviado[2] <= registro[2] and coincide(enviado[1], if_none_match):
+                await self._no_modificado(send, enviado[1])
+                return
+
+        inicio = None
+
+        async def enviar(mensaje: Message):
+            nonlocal inicio
+            if mensaje["type"] == "http.response.start":
+                # Los flujos de eventos se envían de inmediato
+                if mensaje["status"] in (200, 304) \
+                        and not Headers(raw=mensaje["headers"]).get("content-type", "").startswith("text/event-stream"):
+                    inicio = mensaje
+                else:
+                    await send(mensaje)
+                return
+            if inicio is None:
+                await send(mensaje)
+                return
+
+            cabeceras = MutableHeaders(raw=inicio["headers"])
+            etag = cabeceras.get("etag")
+            # Sin ETag propio solo se puede calcular sobre un cuerpo completo y sin comprimir
+            if etag is None and inicio["status"] == 200 and not mensaje.get("more_body", False) \
+                    and "content-encoding" not in cabeceras:
+                etag = calcular_etag(mensaje.get("body", b""))
+                cabeceras["ETag"] = etag
+
+            if etag is not None and registro:
+                self._guardar(clave, (version, etag, time.monotonic()))
+
+            if inicio["status"] == 200 and etag is not None and if_none_match and coincide(etag, if_none_match):
+                inicio = None
+                await self._no_modificado(send, etag)
+                return
+
+            await send(inicio)
+            inicio = None
+            await send(mensaje)
+
+        await self.app(scope, receive, enviar)
+
+    def _guardar(self, clave: Tuple[str, bytes], valor: Tuple[Hashable, str, float]):
+        self._enviados[clave] = valor
+        self._enviados.move_to_end(clave)
+        while len(self._enviados) > self.capacidad:
+            self._enviados.popitem(last=False)
+
+    @staticmethod
+    async def _no_modificado(send: Send, etag: str):
+        await send({
+            "type": "http.response.start",
+            "status": 304,
+            "headers": [
+                (b"etag", etag.encode()),
+                (b"cache-control", b"no-cache"),
+                (b"vary", b"Accept-Encoding"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": b""})
+
+# Fin etag_condicional.py
@@ -1,22 +1,26 @@
 # Inicio backend/app/routers/admin.py
 
 # Importaciones necesarias para el router de administración
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Body
+from typing import List
 from backend.models.admin_mdls import AdminModel
-from backend.app.security.jwt_handler import verificar_rol
+from backend.app.security.jwt_handler import solo_admin
+from backend.app.security.servicio_passwords import ServicioPasswords
+from backend.models.usuarios_mdls import almacen_sesiones, directorio_correos
+from backend.worker.tareas import evaluador_alertas, registro_tareas
 
 # Creación del router con prefijo y tags
 router = APIRouter(prefix="/admin", tags=["Administración"])
 
 # Endpoint para validar reportes
 @router.put("/validar_reporte/{id_reporte}")
-def validar_reporte(id_reporte: str, datos_usuario: dict = Depends(verificar_rol(["admin"]))):
+async def validar_reporte(id_reporte: str, datos_usuario: dict = Depends(solo_admin)):
     try:
         # Obtener ID del administrador
         admin_id = datos_usuario["id_usuario"]
 
         # Validar el reporte usando el modelo
-        resultado = AdminModel.validar_reporte(id_reporte, admin_id)
+        resultado = await AdminModel.validar_reporte(id_reporte, admin_id)
 
         # Determinar tipo de entidad creada
         tipo_entidad = resultado["tipo"]
@@ -41,14 +45,55 @@ def validar_reporte(id_reporte: str, datos_usuario: dict = Depends(verificar_rol
 
 # Endpoint para rechazar reportes
 @router.put("/rechazar_reporte/{id_reporte}")
-def rechazar_reporte(id_reporte: str, datos_usuario: dict = Depends(verificar_rol(["admin"]))):
+async def rechazar_reporte(id_reporte: str, datos_usuario: dict = Depends(solo_admin)):
     try:
         # Rechazar el reporte usando el modelo
-        reporte = AdminModel.rechazar_reporte(id_reporte)
+        reporte = await AdminModel.rechazar_reporte(id_reporte)
 
         # Respuesta exitosa
         return {"status": "success", "message": "Reporte rechazado correctamente", "data": reporte}
     except HTTPException as e:
         raise e
 
+# Endpoint para validar y rechazar muchos reportes a la vez
+@router.post("/reportes/lote")
+async def moderar_reportes_lote(
+    validar: List[str] = Body([], description="Ids de los reportes a validar"),
+    rechazar: List[str] = Body([], description="Ids de los reportes a rechazar"),
+    datos_usuario: dict = Depends(solo_admin)
+):
+    """
+    Valida y rechaza hasta 1000 reportes con pocas consultas a la base de datos.
+    Retorna un resultado por reporte ('success' o 'error' con su código y detalle).
+    """
+    try:
+        resultados = await AdminModel.moderar_lote(validar, rechazar, datos_usuario["id_usuario"])
+        exitosos = [r for r in resultados if r["status"] == "success"]
+        return {
+            "status": "success",
+            "message": f"{len(exitosos)} de {len(resultados)} reportes moderados correctamente",
+            "validados": sum(1 for r in exitosos if r["accion"] == "validar"),
+            "rechazados": sum(1 for r in exitosos if r["accion"] == "rechazar"),
+            "errores": len(resultados) - len(exitosos),
+            "data": resultados
+        }
+    except HTTPException as e:
+        raise e
+
+# Endpoint para consultar las métricas de las tareas programadas de este proceso
+@router.get("/tareas")
+async def metricas_tareas(datos_usuario: dict = Depends(solo_admin)):
+    """Liderazgo, ejecuciones, errores y duración de las tareas programadas en este proceso"""
+    return {"status": "success", "data": {**registro_tareas.estadisticas(), "evaluador_alertas": evaluador_alertas.estado()}}
+
+# Endpoint para consultar las métricas del servicio de contraseñas de este proceso
+@router.get("/passwords")
+async def metricas_passwords(datos_usuario: dict = Depends(solo_admin)):
+    """Ocupación, rechazos (503), rehashes y latencias de bcrypt, aciertos del directorio de correos y sesiones en este proceso"""
+    return {"status": "success", "data": {
+        **ServicioPasswords.estadisticas(),
+        "directorio_correos": directorio_correos.estadisticas(),
+        "sesiones": almacen_sesiones.estadisticas(),
+    }}
+
 # Fin backend/app/routers/admin.py
@@ -1,10 +1,14 @@
 # Inicio backend/app/routers/alertas_calor.py
 
 # Importaciones necesarias para el router de alertas de calor
-from fastapi import APIRouter, HTTPException, Depends, Body
+from fastapi import APIRouter, HTTPException, Depends, Body, Query, Request, Response
+from backend.services.serializacion import RespuestaJSON
+from backend.services.cache_tablas import respuesta_cacheada
+from backend.app.middleware.etag_condicional import coincide
 from typing import Optional
+from backend.database.paginacion import parametros_pagina
 from backend.models.alertas_calor_mdls import AlertaCalorModel
-from backend.app.security.jwt_handler import verificar_token, verificar_rol
+from backend.app.security.jwt_handler import verificar_token, solo_admin
 from backend.models.clima_mdls import ClimaModel
 from backend.models.notificaciones_mdls import NotificacionModel
 
@@ -14,30 +18,30 @@ router = APIRouter(prefix="/alertas_calor", tags=["Alertas de Calor"])
 
 # Endpoint para crear alerta de calor (solo administradores)
 @router.post("/")
-def crear_alerta(temperatura: float = Body(...), humedad: float = Body(...), indice_uv: float = Body(...),
-                  nivel_riesgo: str = Body(...), fuente: str = Body("OpenMeteo"),
-                  datos_usuario: dict = Depends(verificar_rol(["admin"]))):
+async def crear_alerta(temperatura: float = Body(...), humedad: float = Body(...), indice_uv: float = Body(...),
+                       nivel_riesgo: str = Body(...), fuente: str = Body("OpenMeteo"),
+                       datos_usuario: dict = Depends(solo_admin)):
     try:
         # Crear nueva alerta usando el modelo
-        alerta = AlertaCalorModel.crear_alerta(temperatura, humedad, indice_uv, nivel_riesgo, fuente)
+        alerta = await AlertaCalorModel.crear_alerta(temperatura, humedad, indice_uv, nivel_riesgo, fuente)
         return {"status": "success", "data": alerta}
     except HTTPException as e:
         raise e
 
 # Endpoint para generar alerta automática desde datos climáticos (solo administradores)    
 @router.post("/generar-desde-clima")
-def generar_alerta_automatica(datos_usuario: dict = Depends(verificar_rol(["admin"]))):
-    clima = ClimaModel.obtener_clima("Cartagena")
+async def generar_alerta_automatica(datos_usuario: dict = Depends(solo_admin)):
+    clima = await ClimaModel.obtener_clima("Cartagena")
     nivel_alerta = ClimaModel.evaluar_alerta_climatica(clima)
     clima["nivel_alerta"] = nivel_alerta
 
     # crear alerta en BD
-    alerta = AlertaCalorModel.crear_alerta_desde_clima(clima)
+    alerta = await AlertaCalorModel.crear_alerta_desde_clima(clima)
 
     # mensaje de notificación
     mensaje = f"⚠️ ALERTA DE CALOR {nivel_alerta.upper()} — Temp: {clima['temperatura']}°C, UV: {clima['uv_index']}"
 
-    NotificacionModel.crear_notificaciones_globales(mensaje)
+    await NotificacionModel.crear_notificaciones_globales(mensaje)
 
     return {
         "status": "ok",
@@ -47,32 +51,44 @@ def generar_alerta_automatica(datos_usuario: dict = Depends(verificar_rol(["admi
 
 # Endpoint para obtener la alerta actual (acceso público)
 @router.get("/actual")
-def alerta_actual():
-    alerts = AlertaCalorModel.listar_alertas()
-    
-    # si no hay alertas
-    if not alerts:
-        return {"status": "success", "data": None}
+async def alerta_actual(request: Request):
+    # alerta activa más reciente, servida desde memoria
+    alerta, etag = await AlertaCalorModel.obtener_alerta_actual()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
 
-    # última por fecha
-    alerts_sorted = sorted(alerts, key=lambda x: x["fecha_alerta"], reverse=True)
-    return {"status": "success", "data": alerts_sorted[0]}
+    # el cliente ya tiene esta versión
+    if coincide(etag, request.headers.get("if-none-match", "")):
+        return Response(status_code=304, headers=headers)
+
+    return RespuestaJSON({"status": "success", "data": alerta}, headers=headers)
+
+# Endpoint para obtener las ventanas de riesgo pronosticadas (acceso público)
+@router.get("/pronostico")
+async def pronostico_alertas(
+    request: Request,
+    horas: int = Query(48, ge=24, le=72, description="Horas de pronóstico a evaluar (24-72)"),
+    ciudad: str = Query("Cartagena", description="Barrio o municipio registrado")
+):
+    """Ventanas de las próximas horas con riesgo de calor medio o alto, según el pronóstico en caché"""
+    entrada = await ClimaModel.obtener_ventanas_riesgo(ciudad, horas)
+    return respuesta_cacheada(request, entrada)
 
 # Endpoint para listar todas las alertas (acceso público)
 @router.get("/")
-def listar_alertas():
-    return {"status": "success", "data": AlertaCalorModel.listar_alertas()}
+async def listar_alertas(pagina: dict = Depends(parametros_pagina)):
+    resultado = await AlertaCalorModel.listar_alertas(**pagina)
+    return {"status": "success", "data": resultado["data"], "next_cursor": resultado["next_cursor"]}
 
 # Endpoint para obtener alerta por ID (acceso público)
 @router.get("/{id_alerta}")
-def obtener_alerta(id_alerta: str):
-    return {"status": "success", "data": AlertaCalorModel.obtener_alerta_por_id(id_alerta)}
+async def obtener_alerta(id_alerta: str):
+    return {"status": "success", "data": await AlertaCalorModel.obtener_alerta_por_id(id_alerta)}
 
 # Endpoint para eliminar alerta (solo administradores)
 @router.delete("/{id_alerta}")
-def eliminar_alerta(id_alerta: str, datos_usuario: dict = Depends(verificar_rol(["admin"]))):
+async def eliminar_alerta(id_alerta: str, datos_usuario: dict = Depends(solo_admin)):
     try:
-        return AlertaCalorModel.eliminar_alerta(id_alerta)
+        return await AlertaCalorModel.eliminar_alerta(id_alerta)
     except HTTPException as e:
         raise e
 
@@ -1,32 +1,81 @@
 # Inicio backend/app/routers/clima.py
 
 # Importaciones necesarias para el router de clima
-from fastapi import APIRouter, Query
-from backend.models.clima_mdls import ClimaModel
+from fastapi import APIRouter, Query, Request
+from typing import Optional
+from backend.models.clima_mdls import ClimaModel, cache_series
+from backend.services.cache_tablas import respuesta_cacheada
+from backend.app.middleware.etag_condicional import registrar_version
+from backend.services import ubicaciones
 
 # Creación del router con prefijo y tags
 router = APIRouter(prefix="/clima", tags=["Datos Climáticos"])
 
+# La serie histórica solo cambia al cerrarse cada hora
+for ruta in ("/historico", "/riesgo-horario"):
+    registrar_version(router.prefix + ruta, ClimaModel.hora_serie, cache_series.vigencia)
+
 # Endpoint para obtener información climática actual
 @router.get("/")
-def obtener_clima(ciudad: str = "Cartagena"):
+async def obtener_clima(ciudad: str = "Cartagena"):
     """Información climática actual"""
-    return ClimaModel.obtener_clima(ciudad)
+    return await ClimaModel.obtener_clima(ciudad)
+
+# Endpoint para listar las ubicaciones registradas
+@router.get("/ubicaciones")
+async def listar_ubicaciones():
+    """Barrios y municipios con datos climáticos disponibles"""
+    return {"status": "success", "data": ubicaciones.listar_ubicaciones()}
+
+# Endpoint para obtener información climática de varias ubicaciones a la vez
+@router.get("/multiple")
+async def obtener_clima_multiple(
+    ciudades: Optional[str] = Query(None, description="Ubicaciones separadas por coma (todas si se omite)")
+):
+    """Información climática actual de varias ubicaciones con una sola consulta por lote"""
+    lista = [c for c in ciudades.split(",") if c.strip()] if ciudades else None
+    return {"status": "success", "data": await ClimaModel.obtener_clima_multiple(lista)}
 
 # Endpoint para obtener histórico de sensación térmica
 @router.get("/historico")
-def obtener_historico_temp_humedad(
+async def obtener_historico_temp_humedad(
+    request: Request,
     dias: int = Query(1, ge=1, le=7, description="Número de días históricos a consultar (1-7)")
 ):
     """Sensación térmica horaria de los últimos días"""
-    return ClimaModel.obtener_historico_temp_humedad(dias)
+    entrada = await cache_series.obtener(
+        ("temp_humedad", dias, ClimaModel.hora_serie()), lambda: ClimaModel.obtener_historico_temp_humedad(dias)
+    )
+    return respuesta_cacheada(request, entrada)
 
 # Endpoint para obtener histórico de temperatura y humedad
 @router.get("/historico-temp-humedad")
-def clima_historico_temp_humedad(
+async def clima_historico_temp_humedad(
+    request: Request,
     dias: int = Query(1, ge=1, le=7, description="Número de días históricos a consultar (1-7)")
 ):
     """Devuelve temperatura y humedad horaria de los últimos N días"""
-    return ClimaModel.obtener_historico_temp_humedad(dias)
+    entrada = await cache_series.obtener(
+        ("temp_humedad", dias, ClimaModel.hora_serie()), lambda: ClimaModel.obtener_historico_temp_humedad(dias)
+    )
+    return respuesta_cacheada(request, entrada)
+
+# Endpoint para obtener la línea de tiempo horaria de riesgo térmico
+@router.get("/riesgo-horario")
+async def riesgo_horario(
+    request: Request,
+    dias: int = Query(1, ge=1, le=7, description="Número de días históricos a consultar (1-7)")
+):
+    """Índices de calor y nivel de alerta por hora de los últimos N días"""
+    entrada = await cache_series.obtener(
+        ("riesgo", dias, ClimaModel.hora_serie()), lambda: ClimaModel.obtener_riesgo_horario(dias)
+    )
+    return respuesta_cacheada(request, entrada)
+
+# Endpoint para consultar los contadores de la caché de pronósticos
+@router.get("/estadisticas-cache")
+async def estadisticas_cache():
+    """Aciertos, fallos y recargas de la caché de pronósticos y de la serie histórica"""
+    return {**ClimaModel.estadisticas_cache(), "series": cache_series.estadisticas()}
 
 # Fin backend/app/routers/clima.py
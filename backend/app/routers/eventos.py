@@ -0,0 +1,46 @@
+# Inicio backend/app/routers/eventos.py
+
+# Importaciones necesarias para el router de eventos en tiempo real
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from backend.services.hub_eventos import hub_eventos
+from backend.app.security.jwt_handler import decodificar_token, solo_admin
+
+# Creación del router con prefijo y tags
+router = APIRouter(prefix="/eventos", tags=["Eventos en Tiempo Real"])
+
+# Endpoint de Server-Sent Events con notificaciones y alertas (usuario autenticado)
+@router.get("/")
+async def flujo_eventos(
+    token: Optional[str] = Query(None, description="Token JWT (EventSource no permite enviar headers)"),
+    last_event_id: Optional[int] = Query(None, description="Último id recibido, alternativa al header Last-Event-ID"),
+    authorization: Optional[str] = Header(None),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    """
+    Flujo text/event-stream con los eventos 'notificacion' (personales),
+    'notificacion_global' y 'alerta'. Al reconectar, el navegador envía
+    Last-Event-ID y solo se reciben los eventos perdidos.
+    """
+    if not token and authorization and authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    if not token:
+        raise HTTPException(status_code=401, detail="Token requerido")
+    datos_usuario = decodificar_token(token)
+
+    if last_event_id is None and last_event_id_header and last_event_id_header.isdigit():
+        last_event_id = int(last_event_id_header)
+
+    return StreamingResponse(
+        hub_eventos.flujo(datos_usuario.get("id_usuario"), last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# Endpoint para consultar el estado del hub (solo administradores)
+@router.get("/estadisticas")
+def estadisticas_eventos(datos_usuario: dict = Depends(solo_admin)):
+    return {"status": "success", "data": hub_eventos.estadisticas()}
+
+# Fin backend/app/routers/eventos.py
@@ -0,0 +1,60 @@
+# Inicio backend/app/routers/mapa.py
+
+# Importaciones necesarias para el router del mapa
+import asyncio
+from fastapi import APIRouter, HTTPException, Query
+from backend.models.punto_hidratacion_mdls import PuntoHidratacionModel, cache_puntos
+from backend.models.zonas_frescas_mdls import ZonaFrescaModel, cache_zonas
+from backend.app.middleware.etag_condicional import registrar_version
+from backend.services.serializacion import RespuestaJSON
+
+# Creación del router con prefijo y tags
+router = APIRouter(prefix="/mapa", tags=["Mapa"])
+
+# Los marcadores cambian con cualquier escritura de puntos o zonas
+registrar_version(
+    router.prefix, lambda: (cache_puntos.version, cache_zonas.version),
+    min(cache_puntos.vigencia, cache_zonas.vigencia)
+)
+
+# Capas disponibles en el mapa
+CAPAS = {
+    "puntos": PuntoHidratacionModel.marcadores_viewport,
+    "zonas": ZonaFrescaModel.marcadores_viewport,
+}
+
+# Endpoint para obtener los marcadores visibles del mapa (acceso público)
+@router.get("/viewport")
+async def marcadores_viewport(
+    sur: float = Query(..., ge=-90, le=90, description="Latitud mínima del viewport"),
+    oeste: float = Query(..., ge=-180, le=180, description="Longitud mínima del viewport"),
+    norte: float = Query(..., ge=-90, le=90, description="Latitud máxima del viewport"),
+    este: float = Query(..., ge=-180, le=180, description="Longitud máxima del viewport"),
+    zoom: int = Query(..., ge=0, le=22, description="Nivel de zoom de Leaflet"),
+    capas: str = Query("puntos,zonas", description="Capas separadas por coma: puntos, zonas")
+):
+    """
+    Retorna los puntos de hidratación y zonas frescas activos del viewport.
+    Por debajo del zoom 16 se agrupan en clusters con cantidad y centroide;
+    desde ese zoom se retornan los recursos individuales.
+    """
+    if sur > norte or oeste > este:
+        raise HTTPException(status_code=400, detail="Viewport inválido: sur/oeste deben ser menores que norte/este")
+
+    solicitadas = [c.strip() for c in capas.split(",") if c.strip()]
+    desconocidas = [c for c in solicitadas if c not in CAPAS]
+    if desconocidas:
+        raise HTTPException(status_code=400, detail=f"Capas no válidas: {', '.join(desconocidas)}")
+
+    # Las capas se consultan en paralelo
+    marcadores = await asyncio.gather(*(CAPAS[capa](sur, oeste, norte, este, zoom) for capa in solicitadas))
+    # Los marcadores ya son tipos JSON: se serializan directo con orjson, sin jsonable_encoder
+    return RespuestaJSON({
+        "status": "success",
+        "data": {
+            "zoom": zoom,
+            **dict(zip(solicitadas, marcadores)),
+        }
+    })
+
+# Fin backend/app/routers/mapa.py
@@ -1,59 +1,91 @@
 # Inicio backend/app/routers/notificaciones.py
 
 # Importaciones necesarias para el router de notificaciones
-from fastapi import APIRouter, HTTPException, Depends, Body
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Body, Query
+from typing import List, Optional
 from backend.models.notificaciones_mdls import NotificacionModel
-from backend.app.security.jwt_handler import verificar_token, verificar_rol
+from backend.app.security.jwt_handler import verificar_token, solo_admin
+from backend.database.paginacion import parametros_pagina
 
 # Creación del router con prefijo y tags
 router = APIRouter(prefix="/notificaciones", tags=["Notificaciones"])
 
 # Endpoint para crear notificación (solo administradores)
 @router.post("/")
-def crear_notificacion(mensaje: str = Body(...), id_usuario: str = Body(...), datos_usuario: dict = Depends(verificar_rol(["admin"]))):
+async def crear_notificacion(mensaje: str = Body(...), id_usuario: str = Body(...), datos_usuario: dict = Depends(solo_admin)):
     try:
         # Crear nueva notificación usando el modelo
-        notificacion = NotificacionModel.crear_notificacion(id_usuario, mensaje)
+        notificacion = await NotificacionModel.crear_notificacion(id_usuario, mensaje)
         return {"status": "success", "data": notificacion}
     except HTTPException as e:
         raise e
 
 # Enviar notificación global (solo administradores)
 @router.post("/global")
-def crear_notificaciones_globales(mensaje: str = Body(...), datos_usuario: dict = Depends(verificar_rol(["admin"]))):
+async def crear_notificaciones_globales(mensaje: str = Body(...), datos_usuario: dict = Depends(solo_admin)):
     try:
-        notifs = NotificacionModel.crear_notificaciones_globales(mensaje)
+        resumen = await NotificacionModel.crear_notificaciones_globales(mensaje)
         return {
             "status": "success",
             "mensaje": "Notificación global generada",
-            "cantidad": len(notifs)
+            "cantidad": resumen["insertadas"],
+            "resumen": resumen
         }
     except HTTPException as e:
         raise e
 
+# Marcar el estado de una notificación global para el usuario autenticado
+@router.put("/global/{id_notificacion}/estado")
+async def actualizar_estado_global(id_notificacion: str, estado: str = Body("leida", embed=True), datos_usuario: dict = Depends(verificar_token)):
+    try:
+        return {"status": "success", "data": await NotificacionModel.actualizar_estado_global(id_notificacion, datos_usuario["id_usuario"], estado)}
+    except HTTPException as e:
+        raise e
+
+# Cantidad de notificaciones no leídas del usuario autenticado
+@router.get("/unread-count")
+async def contar_no_leidas(datos_usuario: dict = Depends(verificar_token)):
+    try:
+        return {"status": "success", "data": {"no_leidas": await NotificacionModel.contar_no_leidas(datos_usuario["id_usuario"])}}
+    except HTTPException as e:
+        raise e
+
+# Marcar como leídas varias notificaciones (o todas, sin 'ids') del usuario autenticado
+@router.put("/leidas")
+async def marcar_leidas(ids: Optional[List[str]] = Body(None, embed=True), datos_usuario: dict = Depends(verificar_token)):
+    try:
+        return {"status": "success", "data": await NotificacionModel.marcar_leidas(datos_usuario["id_usuario"], ids)}
+    except HTTPException as e:
+        raise e
 
 # Endpoint para listar notificaciones con permisos diferenciados
 @router.get("/")
-def listar_notificaciones(id_usuario: Optional[str] = None, datos_usuario: dict = Depends(verificar_token)):
+async def listar_notificaciones(
+    id_usuario: Optional[str] = None,
+    since: Optional[str] = Query(None, description="Id de notificación o fecha ISO: solo las posteriores, en orden de envío"),
+    pagina: dict = Depends(parametros_pagina),
+    datos_usuario: dict = Depends(verificar_token)
+):
     try:
         # Administradores pueden listar todas o filtrar por usuario
         if datos_usuario["rol"] == "admin":
-            return {"status": "success", "data": NotificacionModel.listar_notificaciones(id_usuario)}
+            resultado = await NotificacionModel.listar_notificaciones(id_usuario, since=since, **pagina)
         # Usuarios normales solo ven sus propias notificaciones
-        return {"status": "success", "data": NotificacionModel.listar_notificaciones(datos_usuario["id_usuario"])}
+        else:
+            resultado = await NotificacionModel.listar_notificaciones(datos_usuario["id_usuario"], since=since, **pagina)
+        return {"status": "success", "data": resultado["data"], "next_cursor": resultado["next_cursor"]}
     except HTTPException as e:
         raise e
 
 # Endpoint para obtener notificación por ID (con verificación de permisos)
 @router.get("/{id_notificacion}")
-def obtener_notificacion(id_notificacion: str, datos_usuario: dict = Depends(verificar_token)):
+async def obtener_notificacion(id_notificacion: str, datos_usuario: dict = Depends(verificar_token)):
     try:
         # Obtener notificación del modelo
-        notif = NotificacionModel.obtener_notificacion_por_id(id_notificacion)
+        notif = await NotificacionModel.obtener_notificacion_por_id(id_notificacion)
 
-        # Verificar permisos: admin puede ver todas, usuario solo las suyas
-        if datos_usuario["rol"] != "admin" and notif["id_usuario"] != datos_usuario["id_usuario"]:
+        # Verificar permisos: admin puede ver todas, usuario solo las suyas y las globales
+        if datos_usuario["rol"] != "admin" and not notif.get("global") and notif["id_usuario"] != datos_usuario["id_usuario"]:
             raise HTTPException(status_code=403, detail="No tienes permisos para ver esta notificación")
 
         return {"status": "success", "data": notif}
@@ -62,19 +94,19 @@ def obtener_notificacion(id_notificacion: str, datos_usuario: dict = Depends(ver
 
 # Endpoint para actualizar estado de notificación (solo administradores)
 @router.put("/{id_notificacion}")
-def actualizar_estado(id_notificacion: str, estado: str = Body(...), datos_usuario: dict = Depends(verificar_rol(["admin"]))):
+async def actualizar_estado(id_notificacion: str, estado: str = Body(...), datos_usuario: dict = Depends(solo_admin)):
     try:
         # Actualizar estado usando el modelo
-        return {"status": "success", "data": NotificacionModel.actualizar_estado(id_notificacion, estado)}
+        return {"status": "success", "data": await NotificacionModel.actualizar_estado(id_notificacion, estado)}
     except HTTPException as e:
         raise e
 
 # Endpoint para eliminar notificación (solo administradores)
 @router.delete("/{id_notificacion}")
-def eliminar_notificacion(id_notificacion: str, datos_usuario: dict = Depends(verificar_rol(["admin"]))):
+async def eliminar_notificacion(id_notificacion: str, datos_usuario: dict = Depends(solo_admin)):
     try:
         # Eliminar notificación usando el modelo
-        return NotificacionModel.eliminar_notificacion(id_notificacion)
+        return await NotificacionModel.eliminar_notificacion(id_notificacion)
     except HTTPException as e:
         raise e
 
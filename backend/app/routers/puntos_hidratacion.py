@@ -1,17 +1,23 @@
 # Inicio backend/app/routers/puntos_hidratacion.py
 
 # Importaciones necesarias para el router de puntos de hidratación
-from fastapi import APIRouter, HTTPException, Depends, Body
-from backend.models.punto_hidratacion_mdls import PuntoHidratacionModel
-from backend.app.security.jwt_handler import verificar_token, verificar_rol
+from fastapi import APIRouter, HTTPException, Depends, Body, Query, Request
+from backend.models.punto_hidratacion_mdls import PuntoHidratacionModel, cache_puntos
+from backend.services.cache_tablas import respuesta_cacheada
+from backend.app.middleware.etag_condicional import registrar_version
+from backend.app.security.jwt_handler import verificar_token, solo_admin
 from typing import Optional
+from backend.database.paginacion import parametros_pagina
 
 # Creación del router con prefijo y tags
 router = APIRouter(prefix="/puntos_hidratacion", tags=["Puntos de Hidratación"])
 
+# Las lecturas cambian solo cuando una escritura sube la versión de la caché
+registrar_version(router.prefix, lambda: cache_puntos.version, cache_puntos.vigencia)
+
 # Endpoint para crear punto de hidratación (usuario autenticado)
 @router.post("/")
-def crear_punto(
+async def crear_punto(
     nombre: str,
     descripcion: Optional[str] = None,
     latitud: float = None,
@@ -27,7 +33,7 @@ def crear_punto(
         validado_por = None
 
         # Crear punto usando el modelo
-        punto = PuntoHidratacionModel.crear_punto(
+        punto = await PuntoHidratacionModel.crear_punto(
             nombre, descripcion, latitud, longitud, estado, validado_por
         )
 
@@ -38,48 +44,66 @@ def crear_punto(
 
 # Endpoint para listar puntos (acceso público)
 @router.get("/")
-def listar_puntos(estado: Optional[str] = None):
-    """Lista todos los puntos. Si estado es None, muestra todos; si no, filtra por estado."""
+async def listar_puntos(request: Request, estado: Optional[str] = None, pagina: dict = Depends(parametros_pagina)):
+    """Lista los puntos por páginas. Si estado es None, muestra todos; si no, filtra por estado.
+    Las páginas se sirven desde la caché ya serializadas, con ETag."""
 
-    if estado is None:
-        # Mostrar todos los puntos sin filtro (para administradores)
-        return {
-            "status": "success",
-            "data": PuntoHidratacionModel.listar_puntos(None)
-        }
-    else:
-        # Filtrar por estado (para usuarios normales)
+    async def cargar():
+        # estado None muestra todos los puntos (administradores); si no, filtra por estado
+        resultado = await PuntoHidratacionModel.listar_puntos(estado, **pagina)
         return {
             "status": "success",
-            "data": PuntoHidratacionModel.listar_puntos(estado)
+            "data": resultado["data"],
+            "next_cursor": resultado["next_cursor"]
         }
 
-# Endpoint para obtener punto por ID
-@router.get("/{id_punto}")
-def obtener_punto(id_punto: str):
+    entrada = await cache_puntos.obtener(("listar", estado, *pagina.values()), cargar)
+    return respuesta_cacheada(request, entrada)
+
+# Endpoint para buscar los puntos activos más cercanos (acceso público)
+@router.get("/cercanos")
+async def puntos_cercanos(
+    lat: float = Query(..., ge=-90, le=90, description="Latitud del usuario"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitud del usuario"),
+    radio_km: float = Query(5.0, gt=0, le=50, description="Radio de búsqueda en kilómetros"),
+    k: int = Query(10, ge=1, le=100, description="Número máximo de resultados")
+):
+    """Retorna los k puntos activos más cercanos con su distancia en km."""
     return {
         "status": "success",
-        "data": PuntoHidratacionModel.obtener_punto_por_id(id_punto)
+        "data": await PuntoHidratacionModel.buscar_cercanos(lat, lon, radio_km, k)
     }
 
+# Endpoint para obtener punto por ID
+@router.get("/{id_punto}")
+async def obtener_punto(id_punto: str, request: Request):
+    async def cargar():
+        return {
+            "status": "success",
+            "data": await PuntoHidratacionModel.obtener_punto_por_id(id_punto)
+        }
+
+    entrada = await cache_puntos.obtener(("id", id_punto), cargar)
+    return respuesta_cacheada(request, entrada)
+
 # Endpoint para actualizar punto (solo administradores)
 @router.put("/{id_punto}")
-def actualizar_punto(
+async def actualizar_punto(
     id_punto: str,
     data: dict = Body(...),
-    datos_usuario: dict = Depends(verificar_rol(["admin"]))
+    datos_usuario: dict = Depends(solo_admin)
 ):
     return {
         "status": "success",
-        "data": PuntoHidratacionModel.actualizar_punto(id_punto, data)
+        "data": await PuntoHidratacionModel.actualizar_punto(id_punto, data)
     }
 
 # Endpoint para eliminar punto (solo administradores)
 @router.delete("/{id_punto}")
-def eliminar_punto(
+async def eliminar_punto(
     id_punto: str,
-    datos_usuario: dict = Depends(verificar_rol(["admin"]))
+    datos_usuario: dict = Depends(solo_admin)
 ):
-    return PuntoHidratacionModel.eliminar_punto(id_punto)
+    return await PuntoHidratacionModel.eliminar_punto(id_punto)
 
 # Fin backend/app/routers/puntos_hidratacion.py
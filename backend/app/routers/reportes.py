@@ -3,8 +3,9 @@
 # Importaciones necesarias para el router de reportes
 from fastapi import APIRouter, HTTPException, Depends
 from typing import Optional
+from backend.database.paginacion import parametros_pagina
 from backend.models.reportes_mdls import ReporteModel
-from backend.app.security.jwt_handler import verificar_token, verificar_rol
+from backend.app.security.jwt_handler import verificar_token, solo_admin
 from fastapi import Form
 
 # Creación del router con prefijo y tags
@@ -12,7 +13,7 @@ router = APIRouter(prefix="/reportes", tags=["Reportes"])
 
 # Endpoint para crear reporte (usuario autenticado)
 @router.post("/")
-def crear_reporte(
+async def crear_reporte(
     tipo: str = Form(...),
     nombre: str = Form(None),
     descripcion: str = Form(None),
@@ -30,7 +31,7 @@ def crear_reporte(
         id_usuario = datos_usuario["id_usuario"]
 
         # Crear reporte usando el modelo
-        reporte = ReporteModel.crear_reporte(
+        reporte = await ReporteModel.crear_reporte(
             id_usuario,
             tipo,
             nombre,
@@ -45,49 +46,51 @@ def crear_reporte(
 
 # Endpoint para listar reportes (solo administradores)
 @router.get("/")
-def listar_reportes(
+async def listar_reportes(
     id_usuario: Optional[str] = None,
     tipo: Optional[str] = None,
     estado: Optional[str] = None,
-    datos_usuario: dict = Depends(verificar_rol(["admin"]))
+    pagina: dict = Depends(parametros_pagina),
+    datos_usuario: dict = Depends(solo_admin)
 ):
     """
-    Lista reportes. Solo los administradores pueden acceder a esta ruta.
+    Lista reportes por páginas. Solo los administradores pueden acceder a esta ruta.
     """
-    return {"status": "success", "data": ReporteModel.listar_reportes(id_usuario, tipo, estado)}
+    resultado = await ReporteModel.listar_reportes(id_usuario, tipo, estado, **pagina)
+    return {"status": "success", "data": resultado["data"], "next_cursor": resultado["next_cursor"]}
 
 # Endpoint para obtener reporte específico (usuario autenticado)
 @router.get("/{id_reporte}")
-def obtener_reporte(
+async def obtener_reporte(
     id_reporte: str,
     datos_usuario: dict = Depends(verificar_token)
 ):
     """
     Obtiene un reporte por su ID. Requiere autenticación.
     """
-    return {"status": "success", "data": ReporteModel.obtener_reporte_por_id(id_reporte)}
+    return {"status": "success", "data": await ReporteModel.obtener_reporte_por_id(id_reporte)}
 
 # Endpoint para actualizar reporte (solo administradores)
 @router.put("/{id_reporte}")
-def actualizar_reporte(
+async def actualizar_reporte(
     id_reporte: str,
     data: dict,
-    datos_usuario: dict = Depends(verificar_rol(["admin"]))
+    datos_usuario: dict = Depends(solo_admin)
 ):
     """
     Actualiza un reporte existente. Solo los administradores pueden hacerlo.
     """
-    return {"status": "success", "data": ReporteModel.actualizar_reporte(id_reporte, data)}
+    return {"status": "success", "data": await ReporteModel.actualizar_reporte(id_reporte, data)}
 
 # Endpoint para eliminar reporte (solo administradores)
 @router.delete("/{id_reporte}")
-def eliminar_reporte(
+async def eliminar_reporte(
     id_reporte: str,
-    datos_usuario: dict = Depends(verificar_rol(["admin"]))
+    datos_usuario: dict = Depends(solo_admin)
 ):
     """
     Elimina un reporte por su ID. Solo los administradores pueden hacerlo.
     """
-    return ReporteModel.eliminar_reporte(id_reporte)
+    return await ReporteModel.eliminar_reporte(id_reporte)
 
 # Fin backend/app/routers/reportes.py
@@ -1,10 +1,12 @@
 # Inicio backend/app/routers/usuarios.py
 
 # Importaciones necesarias para el router de usuarios
-from fastapi import APIRouter, HTTPException, Form, Depends, Body
+from fastapi import APIRouter, HTTPException, Form, Depends, Body, Request
 from backend.models.usuarios_mdls import UsuarioModel
-from backend.app.security.hashing import hash_password, verify_password
-from backend.app.security.jwt_handler import crear_token, verificar_token, verificar_rol
+from backend.services.cache_tablas import respuesta_cacheada
+from backend.app.security.servicio_passwords import ServicioPasswords
+from backend.app.security.jwt_handler import verificar_token, solo_admin
+from backend.database.paginacion import parametros_pagina
 
 # Creación del router con prefijo y tags
 router = APIRouter(prefix="/usuarios", tags=["Usuarios"])
@@ -13,7 +15,7 @@ router = APIRouter(prefix="/usuarios", tags=["Usuarios"])
 # REGISTRO DE USUARIOS
 # ======================================================
 @router.post("/register")
-def register(
+async def register(
     nombre: str = Form(...),
     correo: str = Form(...),
     password: str = Form(...),
@@ -21,16 +23,16 @@ def register(
     rol: str = Form("usuario")
 ):
     try:
-        # Verificar si el correo ya existe
-        existente = UsuarioModel.obtener_usuario_por_correo(correo)
+        # Verificar si el correo ya existe (sin la caché: pudo registrarse en otro proceso)
+        existente = await UsuarioModel.obtener_credenciales(correo, fresco=True)
         if existente:
             raise HTTPException(status_code=400, detail="El correo ya está registrado")
 
-        # Hashear la contraseña
-        hashed_pw = hash_password(password)
+        # Hashear la contraseña (bcrypt es costoso: se ejecuta en el pool de procesos)
+        hashed_pw = await ServicioPasswords.hashear(password)
 
         # Crear nuevo usuario
-        usuario = UsuarioModel.crear_usuario(
+        usuario = await UsuarioModel.crear_usuario(
             nombre=nombre,
             correo=correo,
             password=hashed_pw,
@@ -44,6 +46,8 @@ def register(
             "data": usuario
         }
 
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -51,78 +55,82 @@ def register(
 # LOGIN DE USUARIOS
 # ======================================================
 @router.post("/login")
-def login(correo: str = Form(...), password: str = Form(...)):
-    # Buscar usuario por correo
-    usuario = UsuarioModel.obtener_usuario_por_correo(correo)
+async def login(correo: str = Form(...), password: str = Form(...)):
+    # Buscar las credenciales del usuario por correo
+    usuario = await UsuarioModel.obtener_credenciales(correo)
     if not usuario:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
 
-    # Verificar contraseña
-    if not verify_password(password, usuario["password"]):
+    # Verificar contraseña (en el pool de procesos); si el hash usa otro costo, se recalcula
+    valido, nuevo_hash = await ServicioPasswords.verificar(password, usuario["password"])
+    if not valido:
         raise HTTPException(status_code=401, detail="Contraseña incorrecta")
+    if nuevo_hash is not None:
+        await UsuarioModel.reemplazar_hash_password(usuario["id_usuario"], usuario["password"], nuevo_hash)
 
-    # Crear token de acceso
-    token = crear_token({
-        "id_usuario": usuario["id_usuario"],
-        "correo": usuario["correo"],
-        "rol": usuario["rol"]
-    })
+    # Crear la sesión: access token y refresh token
+    tokens = await UsuarioModel.iniciar_sesion(usuario)
 
-    return {
-        "status": "success",
-        "access_token": token,
-        "token_type": "bearer"
-    }
+    return {"status": "success", **tokens}
+
+# ======================================================
+# RENOVAR SESIÓN (ROTACIÓN DEL REFRESH TOKEN)
+# ======================================================
+@router.post("/refresh")
+async def renovar_sesion(refresh_token: str = Form(...)):
+    """
+    Cambia un refresh token por uno nuevo y un access token nuevo, sin volver a
+    enviar la contraseña. Cada refresh token sirve una sola vez.
+    """
+    tokens = await UsuarioModel.renovar_sesion(refresh_token)
+    return {"status": "success", **tokens}
+
+# ======================================================
+# CERRAR SESIÓN
+# ======================================================
+@router.post("/logout")
+async def cerrar_sesion(refresh_token: str = Form(...)):
+    """
+    Revoca la sesión del refresh token; el access token vence por sí solo.
+    """
+    await UsuarioModel.cerrar_sesion(refresh_token)
+    return {"status": "success", "message": "Sesión cerrada correctamente"}
 
 # ======================================================
 # PERFIL DEL USUARIO ACTUAL
 # ======================================================
 @router.get("/perfil")
-def perfil(datos_usuario: dict = Depends(verificar_token)):
+async def perfil(request: Request, datos_usuario: dict = Depends(verificar_token)):
     """
-    Devuelve el usuario actual basado en el token.
+    Devuelve el usuario actual basado en el token (sin contraseña).
+    El perfil se sirve desde la caché y se vuelve a leer solo tras actualizar el usuario.
     """
-    # Obtener el usuario completo desde la base de datos
-    usuario_completo = UsuarioModel.obtener_usuario_por_id(datos_usuario["id_usuario"])
-
-    # Filtrar la contraseña por seguridad
-    usuario_filtrado = {
-        "id_usuario": usuario_completo["id_usuario"],
-        "nombre": usuario_completo["nombre"],
-        "correo": usuario_completo["correo"],
-        "telefono": usuario_completo.get("telefono"),
-        "rol": usuario_completo["rol"]
-    }
-
-    return {
-        "status": "success",
-        "usuario_actual": usuario_filtrado
-    }
+    return respuesta_cacheada(request, await UsuarioModel.obtener_perfil(datos_usuario["id_usuario"]))
 
 # ======================================================
 # ADMIN - LISTAR TODOS LOS USUARIOS
 # ======================================================
 @router.get("/")
-def listar_todos_los_usuarios(datos_usuario: dict = Depends(verificar_rol(["admin"]))):
-    # Obtener lista completa de usuarios
-    usuarios = UsuarioModel.listar_usuarios()
+async def listar_todos_los_usuarios(pagina: dict = Depends(parametros_pagina), datos_usuario: dict = Depends(solo_admin)):
+    # Obtener una página de usuarios (sin contraseñas)
+    resultado = await UsuarioModel.listar_usuarios(**pagina)
     return {
         "status": "success",
-        "total": len(usuarios),
-        "usuarios": usuarios
+        "usuarios": resultado["data"],
+        "next_cursor": resultado["next_cursor"]
     }
 
 # ======================================================
 # OBTENER USUARIO POR ID
 # ======================================================
 @router.get("/{id_usuario}")
-def obtener_usuario_por_id(id_usuario: str, datos_usuario: dict = Depends(verificar_token)):
+async def obtener_usuario_por_id(id_usuario: str, datos_usuario: dict = Depends(verificar_token)):
     # Verificar permisos de acceso
     if datos_usuario["rol"] != "admin" and datos_usuario["id_usuario"] != id_usuario:
         raise HTTPException(status_code=403, detail="No tienes permisos para acceder a este perfil")
 
     # Obtener usuario específico
-    usuario = UsuarioModel.obtener_usuario_por_id(id_usuario)
+    usuario = await UsuarioModel.obtener_usuario_por_id(id_usuario)
 
     return {
         "status": "success",
@@ -133,7 +141,7 @@ def obtener_usuario_por_id(id_usuario: str, datos_usuario: dict = Depends(verifi
 # ACTUALIZAR USUARIO
 # ======================================================
 @router.put("/{id_usuario}")
-def actualizar_usuario(
+async def actualizar_usuario(
     id_usuario: str,
     data: dict = Body(...),
     datos_usuario: dict = Depends(verificar_token)
@@ -143,7 +151,7 @@ def actualizar_usuario(
         raise HTTPException(status_code=403, detail="No tienes permisos para modificar este perfil")
 
     # Actualizar usuario
-    usuario_actualizado = UsuarioModel.actualizar_usuario(id_usuario, data)
+    usuario_actualizado = await UsuarioModel.actualizar_usuario(id_usuario, data)
 
     return {
         "status": "success",
@@ -155,14 +163,14 @@ def actualizar_usuario(
 # ELIMINAR USUARIO (ADMIN)
 # ======================================================
 @router.delete("/{id_usuario}")
-def eliminar_usuario(id_usuario: str, datos_usuario: dict = Depends(verificar_rol(["admin"]))):
-    return UsuarioModel.eliminar_usuario(id_usuario)
+async def eliminar_usuario(id_usuario: str, datos_usuario: dict = Depends(solo_admin)):
+    return await UsuarioModel.eliminar_usuario(id_usuario)
 
 # ======================================================
 # CAMBIAR CONTRASEÑA
 # ======================================================
 @router.put("/{id_usuario}/cambiar-password")
-def cambiar_password(
+async def cambiar_password(
     id_usuario: str,
     data: dict = Body(...),
     datos_usuario: dict = Depends(verificar_token)
@@ -175,18 +183,22 @@ def cambiar_password(
         raise HTTPException(status_code=403, detail="No tienes permisos para modificar este perfil")
 
     # Verificar contraseña actual
-    usuario = UsuarioModel.obtener_usuario_por_id(id_usuario)
-    if not verify_password(data["currentPassword"], usuario["password"]):
+    usuario = await UsuarioModel.obtener_usuario_por_id(id_usuario)
+    valido, _ = await ServicioPasswords.verificar(data["currentPassword"], usuario["password"])
+    if not valido:
         raise HTTPException(status_code=401, detail="Contraseña actual incorrecta")
 
     # Hashear nueva contraseña
-    nueva_password_hasheada = hash_password(data["newPassword"])
+    nueva_password_hasheada = await ServicioPasswords.hashear(data["newPassword"])
 
     # Actualizar en la base de datos
-    usuario_actualizado = UsuarioModel.actualizar_usuario(id_usuario, {
+    usuario_actualizado = await UsuarioModel.actualizar_usuario(id_usuario, {
         "password": nueva_password_hasheada
     })
 
+    # Las sesiones abiertas con la contraseña anterior deben volver a iniciar sesión
+    await UsuarioModel.cerrar_sesiones_usuario(id_usuario)
+
     return {
         "status": "success",
         "message": "Contraseña cambiada correctamente"
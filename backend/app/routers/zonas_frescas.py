@@ -1,17 +1,23 @@
 # Inicio backend/app/routers/zonas_frescas.py
 
 # Importaciones necesarias para el router de zonas frescas
-from fastapi import APIRouter, HTTPException, Depends, Body
-from backend.models.zonas_frescas_mdls import ZonaFrescaModel
-from backend.app.security.jwt_handler import verificar_token, verificar_rol
+from fastapi import APIRouter, HTTPException, Depends, Body, Query, Request
+from backend.models.zonas_frescas_mdls import ZonaFrescaModel, cache_zonas
+from backend.services.cache_tablas import respuesta_cacheada
+from backend.app.middleware.etag_condicional import registrar_version
+from backend.app.security.jwt_handler import verificar_token, solo_admin
 from typing import Optional
+from backend.database.paginacion import parametros_pagina
 
 # Creación del router con prefijo y tags
 router = APIRouter(prefix="/zonas_frescas", tags=["Zonas Frescas"])
 
+# Las lecturas cambian solo cuando una escritura sube la versión de la caché
+registrar_version(router.prefix, lambda: cache_zonas.version, cache_zonas.vigencia)
+
 # Endpoint para crear zona fresca (usuario autenticado)
 @router.post("/")
-def crear_zona(
+async def crear_zona(
     nombre: str,
     descripcion: str = None,
     latitud: float = None,
@@ -26,45 +32,62 @@ def crear_zona(
         validado_por = None
 
         # Crear zona usando el modelo
-        zona = ZonaFrescaModel.crear_zona(nombre, descripcion, latitud, longitud, tipo, estado, validado_por)
+        zona = await ZonaFrescaModel.crear_zona(nombre, descripcion, latitud, longitud, tipo, estado, validado_por)
         return {"status": "success", "data": zona}
     except HTTPException as e:
         raise e
 
 # Endpoint para listar zonas (acceso público)
 @router.get("/")
-def listar_zonas(estado: Optional[str] = None):
-    """Lista todas las zonas frescas. Si estado es None, muestra todas; si no, filtra por estado."""
-    if estado is None:
-        # Mostrar todas las zonas sin filtro (para administradores)
-        return {"status": "success", "data": ZonaFrescaModel.listar_zonas(None)}
-    else:
-        # Filtrar por estado (para usuarios normales)
-        return {"status": "success", "data": ZonaFrescaModel.listar_zonas(estado)}
+async def listar_zonas(request: Request, estado: Optional[str] = None, pagina: dict = Depends(parametros_pagina)):
+    """Lista las zonas frescas por páginas. Si estado es None, muestra todas; si no, filtra por estado.
+    Las páginas se sirven desde la caché ya serializadas, con ETag."""
+    async def cargar():
+        # estado None muestra todas las zonas (administradores); si no, filtra por estado
+        resultado = await ZonaFrescaModel.listar_zonas(estado, **pagina)
+        return {"status": "success", "data": resultado["data"], "next_cursor": resultado["next_cursor"]}
+
+    entrada = await cache_zonas.obtener(("listar", estado, *pagina.values()), cargar)
+    return respuesta_cacheada(request, entrada)
+
+# Endpoint para buscar las zonas activas más cercanas (acceso público)
+@router.get("/cercanas")
+async def zonas_cercanas(
+    lat: float = Query(..., ge=-90, le=90, description="Latitud del usuario"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitud del usuario"),
+    radio_km: float = Query(5.0, gt=0, le=50, description="Radio de búsqueda en kilómetros"),
+    k: int = Query(10, ge=1, le=100, description="Número máximo de resultados")
+):
+    """Retorna las k zonas frescas activas más cercanas con su distancia en km."""
+    return {"status": "success", "data": await ZonaFrescaModel.buscar_cercanas(lat, lon, radio_km, k)}
 
 # Endpoint para obtener zona por ID (acceso público)
 @router.get("/{id_zona}")
-def obtener_zona(id_zona: str):
-    """Obtiene una zona fresca por su ID (público)."""
-    return {"status": "success", "data": ZonaFrescaModel.obtener_zona_por_id(id_zona)}
+async def obtener_zona(id_zona: str, request: Request):
+    """Obtiene una zona fresca por su ID (público), desde la caché."""
+    async def cargar():
+        return {"status": "success", "data": await ZonaFrescaModel.obtener_zona_por_id(id_zona)}
+
+    entrada = await cache_zonas.obtener(("id", id_zona), cargar)
+    return respuesta_cacheada(request, entrada)
 
 # Endpoint para actualizar zona (solo administradores)
 @router.put("/{id_zona}")
-def actualizar_zona(
+async def actualizar_zona(
     id_zona: str,
     data: dict = Body(...),
-    datos_usuario: dict = Depends(verificar_rol(["admin"]))
+    datos_usuario: dict = Depends(solo_admin)
 ):
     """Actualiza una zona fresca (solo administradores)."""
-    return {"status": "success", "data": ZonaFrescaModel.actualizar_zona(id_zona, data)}
+    return {"status": "success", "data": await ZonaFrescaModel.actualizar_zona(id_zona, data)}
 
 # Endpoint para eliminar zona (solo administradores)
 @router.delete("/{id_zona}")
-def eliminar_zona(
+async def eliminar_zona(
     id_zona: str,
-    datos_usuario: dict = Depends(verificar_rol(["admin"]))
+    datos_usuario: dict = Depends(solo_admin)
 ):
     """Elimina una zona fresca (solo administradores)."""
-    return ZonaFrescaModel.eliminar_zona(id_zona)
+    return await ZonaFrescaModel.eliminar_zona(id_zona)
 
 # Fin backend/app/routers/zonas_frescas.py
@@ -3,10 +3,22 @@
 # backend/app/security/hashing.py
 
 # Importaciones necesarias para el manejo de contraseñas
+import os
+from typing import Optional, Tuple
 from passlib.context import CryptContext
 
+# Costo (log2 de las rondas) de bcrypt para los hashes nuevos. Los hashes guardados
+# con otro costo se siguen aceptando y se recalculan al iniciar sesión
+COSTO_BCRYPT = int(os.getenv("CALORSOS_BCRYPT_COSTO", "12"))
+
 # Configuración del contexto de bcrypt para hashing seguro
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=COSTO_BCRYPT,
+    bcrypt__min_rounds=COSTO_BCRYPT,
+    bcrypt__max_rounds=COSTO_BCRYPT,
+)
 
 def hash_password(password: str) -> str:
     """
@@ -22,4 +34,18 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     return pwd_context.verify(plain_password, hashed_password)
 
+def cargar_backend():
+    """
+    Carga el backend de bcrypt de passlib; inicializador de los procesos del
+    servicio de contraseñas, para que el primer hash no pague la importación.
+    """
+    pwd_context.handler("bcrypt").get_backend()
+
+def verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica la contraseña y, si coincide pero el hash se generó con otro costo,
+    retorna también el hash recalculado con COSTO_BCRYPT (None si no hace falta).
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 # Fin hashing.py
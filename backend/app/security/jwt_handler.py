@@ -3,13 +3,26 @@
 # backend/app/security/jwt_handler.py
 
 # Importaciones necesarias para manejo de JWT
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from typing import Callable, Dict, FrozenSet, Optional, Tuple
 from jose import JWTError, jwt
 from fastapi import HTTPException, Depends, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-import os
 from dotenv import load_dotenv
 
+# PyJWT es opcional: verifica HS256 con menos sobrecarga que python-jose
+try:
+    import jwt as pyjwt
+except ImportError:
+    pyjwt = None
+
 # Cargar variables de entorno desde archivo .env
 load_dotenv("calorsos.env")
 
@@ -18,6 +31,21 @@ SECRET_KEY = os.getenv("VITE_JWT_SECRET", "super_secret_key_calorsos")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60  # 1 hora
 
+# Vigencia de los refresh tokens; cada renovación la extiende
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("CALORSOS_REFRESH_DIAS", "14"))
+
+# Segundos en que el refresh token recién rotado aún se acepta (renovaciones simultáneas de varias pestañas)
+REFRESH_TOKEN_GRACIA_SEGUNDOS = float(os.getenv("CALORSOS_REFRESH_GRACIA", "30"))
+
+# Biblioteca con la que se verifican los tokens: "pyjwt" (si está instalada) o "jose"
+JWT_BACKEND = os.getenv("CALORSOS_JWT_BACKEND", "pyjwt" if pyjwt is not None else "jose")
+if JWT_BACKEND == "pyjwt" and pyjwt is None:
+    print("CALORSOS_JWT_BACKEND=pyjwt pero PyJWT no está instalado; se usa python-jose")
+    JWT_BACKEND = "jose"
+
+# Tokens verificados que se recuerdan (0 desactiva la caché)
+CAPACIDAD_CACHE_TOKENS = int(os.getenv("CALORSOS_CACHE_TOKENS", "4096"))
+
 # Instancia de HTTPBearer para autenticación
 security = HTTPBearer()
 
@@ -31,37 +59,157 @@ def crear_token(datos: dict):
     token = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return token
 
-def verificar_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def hash_refresh_token(secreto: str) -> str:
+    return hashlib.sha256(secreto.encode()).hexdigest()
+
+def nuevo_refresh_token(id_sesion: Optional[str] = None) -> Tuple[str, str, str]:
     """
-    Verifica el token JWT recibido y devuelve los datos decodificados.
+    Genera un refresh token opaco '<id_sesion>.<secreto>' (con un id de sesión nuevo
+    si no se indica). Retorna (id_sesion, token, hash del secreto); en el servidor
+    solo se guarda el hash.
+    """
+    id_sesion = id_sesion or secrets.token_urlsafe(12)
+    secreto = secrets.token_urlsafe(32)
+    return id_sesion, f"{id_sesion}.{secreto}", hash_refresh_token(secreto)
+
+def siguiente_refresh_token(token: str) -> Tuple[str, str, str]:
+    """
+    Refresh token que reemplaza a 'token' en la misma sesión. Se deriva con HMAC
+    del token anterior, así que dos renovaciones con el mismo token obtienen el
+    mismo reemplazo sin que el servidor guarde tokens en claro.
+    Retorna (id_sesion, token, hash del secreto).
+    """
+    id_sesion, _ = separar_refresh_token(token)
+    digest = hmac.new(SECRET_KEY.encode(), token.encode(), hashlib.sha256).digest()
+    secreto = base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+    return id_sesion, f"{id_sesion}.{secreto}", hash_refresh_token(secreto)
+
+def separar_refresh_token(token: str) -> Tuple[str, str]:
+    """
+    Retorna (id_sesion, hash del secreto) de un refresh token.
+    Lanza excepción si el token no tiene el formato esperado.
+    """
+    id_sesion, _, secreto = (token or "").partition(".")
+    if not id_sesion or not secreto:
+        raise HTTPException(status_code=401, detail="Refresh token inválido")
+    return id_sesion, hash_refresh_token(secreto)
+
+def _verificar_firma(token: str) -> dict:
+    """
+    Verifica la firma y la expiración con la biblioteca configurada en JWT_BACKEND.
+    Lanza JWTError si el token no es válido.
+    """
+    if JWT_BACKEND == "pyjwt":
+        try:
+            return pyjwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except pyjwt.PyJWTError as e:
+            raise JWTError(str(e))
+    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+
+class CacheTokens:
+    """
+    LRU de los datos de tokens ya verificados, indexada por el SHA-256 del token
+    (el token mismo no se guarda). Cada entrada vale hasta el 'exp' del token, así
+    que un token vencido vuelve a verificarse y falla igual que sin caché. Los
+    tokens sin 'exp' o inválidos no se guardan.
+    """
+
+    def __init__(self, capacidad: int = CAPACIDAD_CACHE_TOKENS):
+        self.capacidad = capacidad
+        # digest -> (datos del token, exp)
+        self._entradas: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def decodificar(self, token: str) -> dict:
+        """
+        Retorna los datos del token, verificándolo solo si no está en la caché.
+        Lanza JWTError si el token es inválido o expirado.
+        """
+        if self.capacidad <= 0:
+            return _verificar_firma(token)
+
+        digest = hashlib.sha256(token.encode()).digest()
+        entrada = self._entradas.get(digest)
+        if entrada is not None:
+            if entrada[1] > time.time():
+                self._entradas.move_to_end(digest)
+                self.aciertos += 1
+                # Copia: quien lo recibe puede modificarlo sin alterar la caché
+                return dict(entrada[0])
+            del self._entradas[digest]
+
+        self.fallos += 1
+        datos = _verificar_firma(token)
+        exp = datos.get("exp")
+        if isinstance(exp, (int, float)):
+            self._entradas[digest] = (datos, float(exp))
+            while len(self._entradas) > self.capacidad:
+                self._entradas.popitem(last=False)
+        return dict(datos)
+
+    def limpiar(self):
+        self._entradas.clear()
+
+    def estadisticas(self) -> dict:
+        consultas = self.aciertos + self.fallos
+        return {
+            "backend": JWT_BACKEND,
+            "entradas": len(self._entradas),
+            "capacidad": self.capacidad,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": round(self.aciertos / consultas, 3) if consultas else 0.0,
+        }
+
+
+# Instancia compartida por todas las dependencias de autenticación
+cache_tokens = CacheTokens()
+
+def decodificar_token(token: str):
+    """
+    Decodifica un token JWT recibido fuera del header Authorization
+    (por ejemplo, en la query de EventSource, que no permite headers).
     Lanza excepción si el token es inválido o expirado.
     """
-    token = credentials.credentials
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        return cache_tokens.decodificar(token)
     except JWTError:
         raise HTTPException(status_code=401, detail="Token inválido o expirado")
 
+def verificar_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """
+    Verifica el token JWT recibido y devuelve los datos decodificados.
+    Lanza excepción si el token es inválido o expirado.
+    """
+    return decodificar_token(credentials.credentials)
+
+# Dependencias de rol ya creadas, una por conjunto de roles
+_dependencias_rol: Dict[FrozenSet[str], Callable[..., dict]] = {}
+
 def verificar_rol(roles_permitidos: list):
     """
     Dependencia que verifica si el usuario tiene uno de los roles autorizados.
     Retorna los datos del usuario si tiene permisos, lanza excepción si no.
+    Para los mismos roles retorna siempre la misma función, así que FastAPI la
+    resuelve una sola vez por petición aunque la usen varias dependencias.
     Ejemplo de uso: @router.get("/admin", dependencies=[Depends(verificar_rol(["admin"]))])
     """
-    def wrapper(credentials: HTTPAuthorizationCredentials = Security(security)):
-        token = credentials.credentials
-        try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            rol = payload.get("rol")
-            if rol not in roles_permitidos:
+    roles = frozenset(roles_permitidos)
+    dependencia = _dependencias_rol.get(roles)
+    if dependencia is None:
+        def dependencia(datos_usuario: dict = Security(verificar_token)):
+            if datos_usuario.get("rol") not in roles:
                 raise HTTPException(
                     status_code=403,
                     detail="No tienes permisos para acceder a esta ruta"
                 )
-            return payload  # devuelve datos del usuario autenticado
-        except JWTError:
-            raise HTTPException(status_code=401, detail="Token inválido o expirado")
-    return wrapper
+            return datos_usuario  # devuelve datos del usuario autenticado
+        _dependencias_rol[roles] = dependencia
+    return dependencia
+
+# Dependencia reutilizable para las rutas de administración
+solo_admin = verificar_rol(["admin"])
 
 # Fin jwt_handler.py
@@ -0,0 +1,187 @@
+# Inicio servicio_passwords.py
+
+# backend/app/security/servicio_passwords.py
+
+# Importaciones necesarias para el servicio asíncrono de contraseñas
+import asyncio
+import math
+import multiprocessing
+import os
+import statistics
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Deque, Dict, Optional, Tuple
+from fastapi import HTTPException
+from backend.app.security.hashing import COSTO_BCRYPT, cargar_backend, hash_password, verify_and_update
+
+# Procesos dedicados a bcrypt (por defecto, uno por núcleo)
+PROCESOS_BCRYPT = int(os.getenv("CALORSOS_BCRYPT_PROCESOS", str(os.cpu_count() or 1)))
+
+# Operaciones admitidas a la vez (en ejecución + en espera); las siguientes reciben 503
+COLA_MAXIMA_BCRYPT = int(os.getenv("CALORSOS_BCRYPT_COLA", str(PROCESOS_BCRYPT * 8)))
+
+# Duraciones recientes que se conservan por operación para los percentiles
+MUESTRAS_LATENCIA = 1024
+
+
+class MetricasOperacion:
+    """
+    Latencias recientes (espera en cola + bcrypt) de una operación del servicio.
+    """
+    __slots__ = ("total", "errores", "duraciones")
+
+    def __init__(self):
+        self.total = 0
+        self.errores = 0
+        self.duraciones: Deque[float] = deque(maxlen=MUESTRAS_LATENCIA)
+
+    def registrar(self, duracion: float, error: bool = False):
+        self.total += 1
+        self.duraciones.append(duracion)
+        if error:
+            self.errores += 1
+
+    def promedio(self) -> float:
+        return statistics.fmean(self.duraciones) if self.duraciones else 0.0
+
+    def resumen(self) -> dict:
+        ordenadas = sorted(self.duraciones)
+
+        def percentil(p: float) -> float:
+            return round(ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p))] * 1000, 1) if ordenadas else 0.0
+
+        return {
+            "total": self.total,
+            "errores": self.errores,
+            "promedio_ms": round(self.promedio() * 1000, 1),
+            "p50_ms": percentil(0.50),
+            "p95_ms": percentil(0.95),
+            "p99_ms": percentil(0.99),
+        }
+
+
+# Clase principal del servicio de contraseñas
+class ServicioPasswords:
+    """
+    Ejecuta bcrypt en un pool de procesos propio, fuera del event loop y del
+    threadpool de la API, así que una ráfaga de inicios de sesión ocupa a lo sumo
+    PROCESOS_BCRYPT núcleos y el resto de las peticiones sigue respondiendo.
+    Admite hasta COLA_MAXIMA_BCRYPT operaciones a la vez; por encima responde 503
+    con Retry-After estimado a partir de la latencia reciente.
+    """
+
+    _pool: Optional[ProcessPoolExecutor] = None
+    _en_curso = 0
+    _max_en_curso = 0
+    _rechazadas = 0
+    _rehashes = 0
+    _metricas: Dict[str, MetricasOperacion] = {"hash": MetricasOperacion(), "verificar": MetricasOperacion()}
+
+    @classmethod
+    def _obtener_pool(cls) -> ProcessPoolExecutor:
+        """
+        Crea el pool la primera vez que se necesita (o tras la caída de un proceso).
+        Usa 'spawn': los procesos no heredan el event loop ni los hilos de la API.
+        """
+        if cls._pool is None:
+            cls._pool = ProcessPoolExecutor(
+                max_workers=PROCESOS_BCRYPT,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=cargar_backend,
+            )
+        return cls._pool
+
+    @classmethod
+    def iniciar(cls):
+        """
+        Lanza los procesos al arrancar la aplicación para que el primer inicio
+        de sesión no espere su creación.
+        """
+        pool = cls._obtener_pool()
+        for _ in range(PROCESOS_BCRYPT):
+            pool.submit(os.getpid)
+
+    @classmethod
+    def _reintentar_en(cls) -> int:
+        """
+        Segundos estimados hasta que se desocupe la cola.
+        """
+        promedio = max(cls._metricas["hash"].promedio(), cls._metricas["verificar"].promedio())
+        return max(1, math.ceil(promedio * cls._en_curso / PROCESOS_BCRYPT))
+
+    @classmethod
+    async def _ejecutar(cls, operacion: str, funcion, *args):
+        """
+        Ejecuta 'funcion' en el pool si hay cupo; si no, lanza HTTPException 503.
+        """
+        if cls._en_curso >= COLA_MAXIMA_BCRYPT:
+            cls._rechazadas += 1
+            raise HTTPException(
+                status_code=503,
+                detail="El servidor está ocupado verificando contraseñas, intenta de nuevo en unos segundos",
+                headers={"Retry-After": str(cls._reintentar_en())},
+            )
+
+        cls._en_curso += 1
+        cls._max_en_curso = max(cls._max_en_curso, cls._en_curso)
+        inicio = time.perf_counter()
+        error = False
+        try:
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(cls._obtener_pool(), funcion, *args)
+            except BrokenProcessPool:
+                # Un proceso murió (por ejemplo, por falta de memoria): se recrea el pool y se reintenta una vez
+                print("Servicio de contraseñas: el pool de procesos se rompió, se recrea")
+                cls._pool = None
+                return await loop.run_in_executor(cls._obtener_pool(), funcion, *args)
+        except Exception:
+            error = True
+            raise
+        finally:
+            cls._en_curso -= 1
+            cls._metricas[operacion].registrar(time.perf_counter() - inicio, error)
+
+    @classmethod
+    async def hashear(cls, password: str) -> str:
+        """
+        Genera el hash bcrypt de la contraseña con el costo configurado.
+        """
+        return await cls._ejecutar("hash", hash_password, password)
+
+    @classmethod
+    async def verificar(cls, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verifica la contraseña contra el hash guardado. Retorna (coincide, nuevo_hash);
+        nuevo_hash no es None si el hash guardado usa otro costo y debe reemplazarse.
+        """
+        valido, nuevo_hash = await cls._ejecutar("verificar", verify_and_update, password, hashed_password)
+        if nuevo_hash is not None:
+            cls._rehashes += 1
+        return valido, nuevo_hash
+
+    @classmethod
+    def cerrar(cls):
+        """
+        Detiene los procesos del pool (se invoca al apagar la aplicación).
+        """
+        if cls._pool is not None:
+            cls._pool.shutdown(wait=False, cancel_futures=True)
+            cls._pool = None
+
+    @classmethod
+    def estadisticas(cls) -> dict:
+        return {
+            "procesos": PROCESOS_BCRYPT,
+            "cola_maxima": COLA_MAXIMA_BCRYPT,
+            "costo_bcrypt": COSTO_BCRYPT,
+            "en_curso": cls._en_curso,
+            "max_en_curso": cls._max_en_curso,
+            "rechazadas": cls._rechazadas,
+            "rehashes": cls._rehashes,
+            "operaciones": {nombre: metricas.resumen() for nombre, metricas in cls._metricas.items()},
+        }
+
+# Fin servicio_passwords.py
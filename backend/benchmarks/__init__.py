@@ -0,0 +1,7 @@
+# Inicio __init__.py
+
+# backend/benchmarks/__init__.py
+
+# Archivo de inicialización del módulo benchmarks
+
+# Fin __init__.py
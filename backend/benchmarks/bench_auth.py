@@ -0,0 +1,101 @@
+# Inicio bench_auth.py
+
+# backend/benchmarks/bench_auth.py
+
+# Benchmark: costo de la autenticación por petición. Compara la verificación de un
+# token HS256 con python-jose y con PyJWT, con y sin la caché de tokens verificados,
+# y la latencia (p50/p99) de peticiones completas a una app FastAPI mínima con
+# verificar_token y solo_admin.
+# Uso: python -m backend.benchmarks.bench_auth [peticiones]
+
+import statistics
+import sys
+import time
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from backend.app.security import jwt_handler
+from backend.app.security.jwt_handler import CacheTokens, crear_token, solo_admin, verificar_token
+
+PETICIONES = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+VERIFICACIONES = 20000
+
+
+def medir_verificacion(token: str):
+    """
+    Tiempo por verificación de cada combinación de biblioteca y caché.
+    """
+    print(f"\nVerificación de un token ({VERIFICACIONES} veces)")
+    backends = ["jose"] + (["pyjwt"] if jwt_handler.pyjwt is not None else [])
+    for backend in backends:
+        jwt_handler.JWT_BACKEND = backend
+        for capacidad in (0, 4096):
+            cache = CacheTokens(capacidad)
+            cache.decodificar(token)
+            inicio = time.perf_counter()
+            for _ in range(VERIFICACIONES):
+                cache.decodificar(token)
+            por_token = (time.perf_counter() - inicio) / VERIFICACIONES * 1e6
+            print(f"  {backend:<6} {'con caché' if capacidad else 'sin caché':<10} {por_token:8.2f} µs")
+
+
+def crear_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/publica")
+    async def publica():
+        return {"status": "success"}
+
+    @app.get("/token")
+    async def con_token(datos_usuario: dict = Depends(verificar_token)):
+        return {"status": "success"}
+
+    @app.get("/admin")
+    async def con_admin(datos_usuario: dict = Depends(solo_admin)):
+        return {"status": "success"}
+
+    return app
+
+
+def medir_latencia(token: str):
+    """
+    Latencia de peticiones completas; la diferencia con /publica es el costo de la autenticación.
+    """
+    cabeceras = {"Authorization": f"Bearer {token}"}
+    backends = ["jose"] + (["pyjwt"] if jwt_handler.pyjwt is not None else [])
+    with TestClient(crear_app()) as cliente:
+        for backend in backends:
+            jwt_handler.JWT_BACKEND = backend
+            for capacidad in (0, 4096):
+                jwt_handler.cache_tokens = CacheTokens(capacidad)
+                print(f"\nLatencia: {backend} {'con caché' if capacidad else 'sin caché'}, {PETICIONES} peticiones")
+                for ruta in ("/publica", "/token", "/admin"):
+                    cliente.get(ruta, headers=cabeceras)
+                    tiempos = []
+                    for _ in range(PETICIONES):
+                        inicio = time.perf_counter()
+                        cliente.get(ruta, headers=cabeceras)
+                        tiempos.append(time.perf_counter() - inicio)
+                    tiempos.sort()
+                    p50 = statistics.median(tiempos) * 1000
+                    p99 = tiempos[int(len(tiempos) * 0.99) - 1] * 1000
+                    print(f"  {ruta:<10} p50 {p50:6.3f} ms  p99 {p99:6.3f} ms")
+
+
+def main():
+    token = crear_token({"id_usuario": 1, "correo": "admin@calorsos.co", "rol": "admin"})
+
+    # Comprobación: ambas bibliotecas retornan los mismos datos
+    if jwt_handler.pyjwt is not None:
+        jwt_handler.JWT_BACKEND = "jose"
+        datos_jose = CacheTokens(0).decodificar(token)
+        jwt_handler.JWT_BACKEND = "pyjwt"
+        assert CacheTokens(0).decodificar(token) == datos_jose
+
+    medir_verificacion(token)
+    medir_latencia(token)
+
+
+if __name__ == "__main__":
+    main()
+
+# Fin bench_auth.py
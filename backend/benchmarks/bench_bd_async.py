@@ -0,0 +1,112 @@
+# Inicio bench_bd_async.py
+
+# backend/benchmarks/bench_bd_async.py
+
+# Benchmark: consultas concurrentes con el cliente síncrono en el threadpool
+# (como los handlers 'def' anteriores) vs. el cliente asíncrono compartido,
+# contra un servidor local que imita PostgREST con una latencia fija por petición.
+# Uso: python -m backend.benchmarks.bench_bd_async [consultas] [latencia_ms]
+
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+from urllib.request import urlopen
+
+CONSULTAS = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+LATENCIA = (float(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+CLAVE_FALSA = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.x"
+
+
+class ServidorPostgrest:
+    """
+    Servidor HTTP/1.1 keep-alive mínimo sobre asyncio (como PostgREST, atiende cientos
+    de conexiones a la vez): responde cualquier GET con una fila tras la latencia
+    indicada. GET /estado retorna (y reinicia) el máximo de peticiones atendidas a la vez.
+    """
+
+    def __init__(self):
+        self.en_curso = 0
+        self.maximo_en_curso = 0
+
+    @staticmethod
+    def _respuesta(cuerpo) -> bytes:
+        datos = json.dumps(cuerpo).encode()
+        cabeceras = f"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: {len(datos)}\r\n\r\n"
+        return cabeceras.encode() + datos
+
+    async def atender(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        try:
+            while True:
+                peticion = await lector.readuntil(b"\r\n\r\n")
+                ruta = peticion.split(b" ", 2)[1]
+                if ruta == b"/estado":
+                    maximo, self.maximo_en_curso = self.maximo_en_curso, 0
+                    escritor.write(self._respuesta({"maximo_en_curso": maximo}))
+                else:
+                    self.en_curso += 1
+                    self.maximo_en_curso = max(self.maximo_en_curso, self.en_curso)
+                    await asyncio.sleep(LATENCIA)
+                    self.en_curso -= 1
+                    escritor.write(self._respuesta([{"id_usuario": 1, "nombre": "usuario"}]))
+                await escritor.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            escritor.close()
+
+    async def servir(self, puertos: multiprocessing.Queue):
+        servidor = await asyncio.start_server(self.atender, "127.0.0.1", 0, backlog=1024)
+        puertos.put(servidor.sockets[0].getsockname()[1])
+        await servidor.serve_forever()
+
+
+def servir(puertos: multiprocessing.Queue):
+    """
+    Atiende en un proceso aparte para no competir por la CPU con el cliente medido.
+    """
+    asyncio.run(ServidorPostgrest().servir(puertos))
+
+
+def medir(nombre: str, url: str, ejecutar):
+    inicio = time.perf_counter()
+    ejecutar()
+    duracion = time.perf_counter() - inicio
+    maximo = json.loads(urlopen(f"{url}/estado").read())["maximo_en_curso"]
+    print(f"{nombre:<32} {duracion:8.2f} s  {CONSULTAS / duracion:9.0f} consultas/s  máx. en curso: {maximo}")
+
+
+def main():
+    puertos = multiprocessing.Queue()
+    proceso = multiprocessing.Process(target=servir, args=(puertos,), daemon=True)
+    proceso.start()
+    url = f"http://127.0.0.1:{puertos.get()}"
+
+    # Las credenciales se leen al importar la configuración
+    os.environ["VITE_SUPABASE_URL"] = url
+    os.environ["VITE_SUPABASE_KEY"] = CLAVE_FALSA
+    from fastapi.concurrency import run_in_threadpool
+    from backend.database.supabase_config import SupabaseAsync, supabase
+
+    print(f"{CONSULTAS} consultas, latencia {LATENCIA * 1000:.0f} ms")
+
+    async def con_threadpool():
+        # El threadpool de Starlette (40 hilos por defecto) limita las consultas en curso
+        consulta = lambda: supabase.table("usuarios").select("*").eq("id_usuario", 1).execute()
+        await asyncio.gather(*(run_in_threadpool(consulta) for _ in range(CONSULTAS)))
+
+    async def con_cliente_async():
+        await asyncio.gather(*(
+            SupabaseAsync.table("usuarios").select("*").eq("id_usuario", 1).execute() for _ in range(CONSULTAS)
+        ))
+        await SupabaseAsync.cerrar()
+
+    medir("cliente síncrono + threadpool", url, lambda: asyncio.run(con_threadpool()))
+    medir("cliente asíncrono", url, lambda: asyncio.run(con_cliente_async()))
+    proceso.terminate()
+
+
+if __name__ == "__main__":
+    main()
+
+# Fin bench_bd_async.py
@@ -0,0 +1,136 @@
+# Inicio bench_difusion.py
+
+# backend/benchmarks/bench_difusion.py
+
+# Benchmark: notificaciones globales fila por fila vs. motor de difusión por lotes,
+# contra un servidor local que imita la API REST de PostgREST/Supabase con una
+# latencia fija por petición (y fallos ocasionales para ejercitar los reintentos).
+# Uso: python -m backend.benchmarks.bench_difusion [usuarios] [latencia_ms]
+
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from supabase import create_client
+from backend.services.difusion_notificaciones import MotorDifusion
+
+USUARIOS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+LATENCIA = (float(sys.argv[2]) if len(sys.argv) > 2 else 20) / 1000
+TASA_FALLOS = 0.05  # fracción de inserciones por lote que responden 503
+CLAVE_FALSA = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.x"
+
+
+class ServidorPostgrest(ThreadingHTTPServer):
+    """
+    Servidor en memoria con las tablas usuarios y notificaciones.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), ManejadorPostgrest)
+        self.usuarios = [f"{i:08d}" for i in range(USUARIOS)]
+        self.notificaciones = []
+        self.peticiones = 0
+        self.lock = threading.Lock()
+
+
+class ManejadorPostgrest(BaseHTTPRequestHandler):
+    """
+    Implementa el subconjunto de PostgREST que usa el módulo de notificaciones.
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def _responder(self, codigo: int, cuerpo=None):
+        datos = json.dumps(cuerpo).encode() if cuerpo is not None else b""
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def do_GET(self):
+        time.sleep(LATENCIA)
+        self.server.peticiones += 1
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path.endswith("/usuarios"):
+            ids = self.server.usuarios
+            if "id_usuario" in params:
+                cursor = params["id_usuario"].split(".", 1)[1]
+                ids = [i for i in ids if i > cursor]
+            if "limit" in params:
+                ids = ids[: int(params["limit"])]
+            return self._responder(200, [{"id_usuario": i} for i in ids])
+        return self._responder(200, [])
+
+    def do_POST(self):
+        time.sleep(LATENCIA)
+        self.server.peticiones += 1
+        filas = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        filas = filas if isinstance(filas, list) else [filas]
+        if len(filas) > 1 and random.random() < TASA_FALLOS:
+            return self._responder(503, {"message": "Servicio no disponible", "code": "503"})
+        with self.server.lock:
+            self.server.notificaciones.extend(filas)
+        if "return=minimal" in self.headers.get("Prefer", ""):
+            return self._responder(201)
+        return self._responder(201, filas)
+
+
+def difusion_original(cliente, mensaje):
+    """
+    Ruta original: leer todos los usuarios e insertar una fila por petición.
+    """
+    usuarios = cliente.table("usuarios").select("id_usuario").execute().data
+    notifs = []
+    for u in usuarios:
+        item = {"id_usuario": u["id_usuario"], "mensaje": mensaje, "estado": "pendiente"}
+        res = cliente.table("notificaciones").insert(item).execute()
+        notifs.append(res.data[0])
+    return notifs
+
+
+def medir(servidor, funcion):
+    servidor.notificaciones.clear()
+    servidor.peticiones = 0
+    inicio = time.perf_counter()
+    funcion()
+    return time.perf_counter() - inicio, len(servidor.notificaciones), servidor.peticiones
+
+
+def main():
+    servidor = ServidorPostgrest()
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    cliente = create_client(f"http://127.0.0.1:{servidor.server_address[1]}", CLAVE_FALSA)
+    random.seed(7)
+
+    # La ruta original se mide sobre una muestra y se extrapola para no esperar minutos
+    muestra = min(USUARIOS, 500)
+    servidor.usuarios = servidor.usuarios[:muestra]
+    t_original, n_original, p_original = medir(servidor, lambda: difusion_original(cliente, "alerta"))
+    servidor.usuarios = [f"{i:08d}" for i in range(USUARIOS)]
+
+    motor = MotorDifusion(cliente)
+    resumen = {}
+    t_lotes, n_lotes, p_lotes = medir(servidor, lambda: resumen.update(motor.difundir("alerta")))
+    assert n_lotes == USUARIOS and resumen["insertadas"] == USUARIOS and resumen["fallidas"] == 0
+
+    estimado = t_original * USUARIOS / muestra
+    print(f"Usuarios:                 {USUARIOS} (latencia {LATENCIA * 1000:.0f} ms por petición)")
+    print(f"Fila por fila:            {t_original:8.2f} s para {n_original} ({p_original} peticiones)"
+          f" => ~{estimado:.1f} s estimados")
+    print(f"Motor por lotes:          {t_lotes:8.2f} s para {n_lotes} ({p_lotes} peticiones,"
+          f" {resumen['reintentos']} reintentos)")
+    print(f"Aceleración estimada:     {estimado / t_lotes:8.1f}x")
+    servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
+
+# Fin bench_difusion.py
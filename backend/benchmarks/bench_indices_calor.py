@@ -0,0 +1,99 @@
+# Inicio bench_indices_calor.py
+
+# backend/benchmarks/bench_indices_calor.py
+
+# Benchmark: índices de calor escalares (hora por hora) vs. motor vectorizado NumPy
+# sobre un año de datos horarios sintéticos.
+# Uso: python -m backend.benchmarks.bench_indices_calor
+
+import random
+import time
+import numpy as np
+from backend.services.indices_calor import calcular_indices
+
+HORAS_ANIO = 365 * 24
+REPETICIONES = 5
+
+
+def indices_escalares(temperatura, humedad, feels_like, uv):
+    """
+    Cálculo original de ClimaModel.obtener_clima y evaluar_alerta_climatica para una hora.
+    """
+    heat_level = min(100, max(0, (feels_like - 20) * 4))
+    hydration_level = round(1 + (humedad / 100) * 3 + (temperatura / 40) * 5)
+    hydration_level = min(10, max(1, hydration_level))
+
+    wbgt = (0.7 * feels_like) + (0.3 * (humedad / 10))
+    if wbgt < 24:
+        thermal_risk = 0
+    elif wbgt < 27:
+        thermal_risk = 1
+    elif wbgt < 30:
+        thermal_risk = 2
+    elif wbgt < 33:
+        thermal_risk = 3
+    elif wbgt < 36:
+        thermal_risk = 4
+    else:
+        thermal_risk = 5
+
+    if temperatura >= 36 or uv >= 9 or feels_like >= 40:
+        nivel = 2
+    elif temperatura >= 33:
+        nivel = 1
+    else:
+        nivel = 0
+
+    return heat_level, hydration_level, thermal_risk, nivel
+
+
+def generar_anio():
+    """
+    Genera un año de horas con valores típicos del Caribe colombiano.
+    """
+    rnd = random.Random(42)
+    temperatura = [rnd.uniform(24, 38) for _ in range(HORAS_ANIO)]
+    humedad = [rnd.uniform(55, 95) for _ in range(HORAS_ANIO)]
+    sensacion = [t + rnd.uniform(0, 8) for t in temperatura]
+    uv = [rnd.uniform(0, 12) for _ in range(HORAS_ANIO)]
+    return temperatura, humedad, sensacion, uv
+
+
+def medir(funcion):
+    """
+    Retorna el mejor tiempo (segundos) de varias repeticiones.
+    """
+    mejor = float("inf")
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main():
+    temperatura, humedad, sensacion, uv = generar_anio()
+
+    escalar = [indices_escalares(*fila) for fila in zip(temperatura, humedad, sensacion, uv)]
+    vectorizado = calcular_indices(temperatura, humedad, sensacion, uv)
+
+    # Verificar que ambos caminos producen los mismos resultados
+    assert np.allclose([e[0] for e in escalar], vectorizado["heat_level"])
+    assert [e[1] for e in escalar] == vectorizado["hydration_level"].astype(int).tolist()
+    assert [e[2] for e in escalar] == vectorizado["thermal_risk"].tolist()
+    assert [e[3] for e in escalar] == vectorizado["alerta"].tolist()
+
+    t_escalar = medir(lambda: [indices_escalares(*fila) for fila in zip(temperatura, humedad, sensacion, uv)])
+    arreglos = [np.asarray(x) for x in (temperatura, humedad, sensacion, uv)]
+    t_vectorizado = medir(lambda: calcular_indices(*arreglos))
+
+    print(f"Horas evaluadas:      {HORAS_ANIO}")
+    print(f"Escalar (Python):     {t_escalar * 1000:8.2f} ms")
+    print(f"Vectorizado (NumPy):  {t_vectorizado * 1000:8.2f} ms")
+    print(f"Aceleración:          {t_escalar / t_vectorizado:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
+
+# Fin bench_indices_calor.py
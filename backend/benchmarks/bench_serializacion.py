@@ -0,0 +1,148 @@
+# Inicio bench_serializacion.py
+
+# backend/benchmarks/bench_serializacion.py
+
+# Benchmark: serialización de respuestas con JSONResponse (json.dumps) vs. orjson
+# vs. cuerpo pre-codificado en caché, sobre cargas como las de los listados y la
+# línea de tiempo de riesgo horario. Mide el tiempo de codificación y la latencia
+# (p50/p99) de peticiones completas a una app FastAPI mínima.
+# Uso: python -m backend.benchmarks.bench_serializacion [peticiones]
+
+import json
+import random
+import statistics
+import sys
+import time
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from backend.services.cache_tablas import CacheTabla, respuesta_cacheada
+from backend.services.serializacion import RespuestaJSON, codificar
+
+PETICIONES = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+REPETICIONES = 20
+
+
+def carga_listado(filas: int = 500) -> dict:
+    """
+    Página de puntos de hidratación como la de GET /puntos_hidratacion.
+    """
+    return {
+        "status": "success",
+        "data": [{
+            "id_punto": i,
+            "nombre": f"Punto de hidratación {i} — Bocagrande",
+            "descripcion": "Fuente de agua potable junto al parque, abierta de 6:00 a 18:00",
+            "latitud": 10.39 + random.random() / 10,
+            "longitud": -75.51 + random.random() / 10,
+            "estado": "activa",
+            "validado_por": None,
+            "fecha_creacion": f"2025-10-{1 + i % 28:02d}T12:00:00+00:00",
+        } for i in range(filas)],
+        "next_cursor": "WzUwMCwgNTAwXQ",
+    }
+
+
+def carga_riesgo(dias: int = 7) -> dict:
+    """
+    Línea de tiempo columnar como la de GET /clima/riesgo-horario.
+    """
+    horas = dias * 24
+    return {
+        "timestamp": [f"2025-10-{1 + h // 24:02d}T{h % 24:02d}:00:00" for h in range(horas)],
+        "temperatura": [round(random.uniform(26, 36), 1) for _ in range(horas)],
+        "humedad": [round(random.uniform(60, 95), 1) for _ in range(horas)],
+        "sensacion_termica": [round(random.uniform(28, 44), 1) for _ in range(horas)],
+        "uv_index": [round(random.uniform(0, 11), 2) for _ in range(horas)],
+        "heat_level": [round(random.uniform(0, 100), 1) for _ in range(horas)],
+        "hydration_level": [random.randint(1, 10) for _ in range(horas)],
+        "thermal_risk": [random.randint(0, 5) for _ in range(horas)],
+        "nivel_alerta": [random.choice(["bajo", "medio", "alto"]) for _ in range(horas)],
+    }
+
+
+def medir_codificacion(nombre: str, carga: dict):
+    """
+    Tiempo por respuesta de cada forma de codificar (el mejor de REPETICIONES).
+    """
+    formas = {
+        "JSONResponse (json.dumps)": lambda: JSONResponse(jsonable_encoder(carga)).body,
+        "RespuestaJSON (orjson)": lambda: RespuestaJSON(jsonable_encoder(carga)).body,
+        "orjson sin jsonable_encoder": lambda: codificar(carga),
+    }
+    print(f"\nCodificación: {nombre} ({len(codificar(carga)) / 1024:.0f} KiB)")
+    for forma, ejecutar in formas.items():
+        tiempos = []
+        for _ in range(REPETICIONES):
+            inicio = time.perf_counter()
+            ejecutar()
+            tiempos.append(time.perf_counter() - inicio)
+        print(f"  {forma:<30} {min(tiempos) * 1000:8.3f} ms")
+
+
+def crear_app(carga: dict) -> FastAPI:
+    app = FastAPI()
+    cache = CacheTabla("bench")
+
+    @app.get("/json", response_class=JSONResponse)
+    async def con_json():
+        return carga
+
+    @app.get("/orjson", response_class=RespuestaJSON)
+    async def con_orjson():
+        return carga
+
+    @app.get("/precodificada")
+    async def precodificada(request: Request):
+        async def cargar():
+            return carga
+        return respuesta_cacheada(request, await cache.obtener("carga", cargar))
+
+    return app
+
+
+def medir_latencia(nombre: str, carga: dict):
+    """
+    Latencia de peticiones completas (enrutado, validación y serialización).
+    """
+    print(f"\nLatencia: {nombre}, {PETICIONES} peticiones")
+    with TestClient(crear_app(carga)) as cliente:
+        rutas = {
+            "JSONResponse (json.dumps)": ("/json", {}),
+            "RespuestaJSON (orjson)": ("/orjson", {}),
+            "pre-codificada": ("/precodificada", {"Accept-Encoding": "identity"}),
+            "pre-codificada + gzip": ("/precodificada", {"Accept-Encoding": "gzip"}),
+        }
+        for forma, (ruta, cabeceras) in rutas.items():
+            cliente.get(ruta, headers=cabeceras)
+            tiempos = []
+            for _ in range(PETICIONES):
+                inicio = time.perf_counter()
+                respuesta = cliente.get(ruta, headers=cabeceras)
+                tiempos.append(time.perf_counter() - inicio)
+            tiempos.sort()
+            p50 = statistics.median(tiempos) * 1000
+            p99 = tiempos[int(len(tiempos) * 0.99) - 1] * 1000
+            enviados = int(respuesta.headers.get("content-length", 0)) / 1024
+            print(f"  {forma:<30} p50 {p50:7.2f} ms  p99 {p99:7.2f} ms  {enviados:7.1f} KiB enviados")
+
+
+def main():
+    random.seed(7)
+    cargas = {"listado de 500 puntos": carga_listado(), "riesgo horario de 7 días": carga_riesgo()}
+
+    # Comprobación: orjson produce el mismo documento JSON que json.dumps
+    for carga in cargas.values():
+        assert json.loads(codificar(carga)) == json.loads(json.dumps(carga))
+
+    for nombre, carga in cargas.items():
+        medir_codificacion(nombre, carga)
+    for nombre, carga in cargas.items():
+        medir_latencia(nombre, carga)
+
+
+if __name__ == "__main__":
+    main()
+
+# Fin bench_serializacion.py
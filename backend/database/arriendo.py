@@ -0,0 +1,190 @@
+# Inicio arriendo.py
+
+# backend/database/arriendo.py
+
+# Importaciones necesarias para el arriendo (lease) de liderazgo
+import asyncio
+import json
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from postgrest.exceptions import APIError
+from backend.database.supabase_config import db
+
+# Bloqueo de archivos: fcntl en POSIX, msvcrt en Windows
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+def bloquear_archivo(archivo):
+    """
+    Toma un bloqueo exclusivo del SO sobre el archivo abierto (espera si otro proceso lo tiene).
+    """
+    if fcntl is not None:
+        fcntl.flock(archivo.fileno(), fcntl.LOCK_EX)
+    else:
+        archivo.seek(0)
+        msvcrt.locking(archivo.fileno(), msvcrt.LK_LOCK, 1)
+
+
+def desbloquear_archivo(archivo):
+    if fcntl is not None:
+        fcntl.flock(archivo.fileno(), fcntl.LOCK_UN)
+    else:
+        archivo.seek(0)
+        msvcrt.locking(archivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _identificador() -> str:
+    """
+    Identifica al proceso dueño del arriendo: host, pid y un sufijo aleatorio.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class ArriendoArchivo:
+    """
+    Arriendo de liderazgo guardado en un archivo local: sirve para varios procesos
+    del mismo host (workers de uvicorn y el worker de tareas). El archivo guarda
+    el dueño y el vencimiento; se lee y reescribe con un bloqueo exclusivo del SO,
+    así que solo un proceso lo toma mientras no venza. La espera por el bloqueo
+    corre en un hilo para no detener el event loop.
+    """
+
+    def __init__(self, ruta: str, duracion: float = 60, dueno: Optional[str] = None):
+        self.ruta = ruta
+        self.duracion = duracion
+        self.dueno = dueno or _identificador()
+        self._vence_en = 0.0
+
+    def _actualizar(self, tomar: bool) -> bool:
+        os.makedirs(os.path.dirname(self.ruta) or ".", exist_ok=True)
+        with open(self.ruta, "a+") as archivo:
+            bloquear_archivo(archivo)
+            try:
+                archivo.seek(0)
+                contenido = archivo.read()
+                try:
+                    actual = json.loads(contenido) if contenido else {}
+                except ValueError:
+                    actual = {}
+                ahora = time.time()
+                propio = actual.get("dueno") == self.dueno
+                libre = propio or actual.get("vence_en", 0) <= ahora
+                if tomar and libre:
+                    nuevo = {"dueno": self.dueno, "vence_en": ahora + self.duracion}
+                elif not tomar and propio:
+                    nuevo = {}
+                else:
+                    return False
+                archivo.seek(0)
+                archivo.truncate()
+                archivo.write(json.dumps(nuevo))
+                archivo.flush()
+                if tomar:
+                    self._vence_en = nuevo["vence_en"]
+                return True
+            finally:
+                desbloquear_archivo(archivo)
+
+    async def adquirir(self) -> bool:
+        """
+        Toma el arriendo si está libre o vencido, o lo renueva si ya es propio.
+        Retorna True si este proceso es el líder.
+        """
+        if not await asyncio.to_thread(self._actualizar, True):
+            self._vence_en = 0.0
+        return self.es_lider()
+
+    def es_lider(self) -> bool:
+        return time.time() < self._vence_en
+
+    async def liberar(self):
+        """
+        Deja el arriendo libre (al apagar) para que otro proceso lo tome sin esperar el vencimiento.
+        """
+        self._vence_en = 0.0
+        await asyncio.to_thread(self._actualizar, False)
+
+
+class ArriendoSupabase:
+    """
+    Arriendo de liderazgo guardado en la tabla 'arriendos_tareas' (nombre, dueno,
+    vence_en): sirve entre hosts. La fila se toma con un UPDATE condicionado a que
+    sea propia o esté vencida, que PostgreSQL aplica de forma atómica; si la fila no
+    existe se inserta y, de competir dos procesos, la clave primaria deja uno solo.
+    """
+
+    TABLA = "arriendos_tareas"
+
+    def __init__(self, nombre: str, duracion: float = 60, dueno: Optional[str] = None, cliente=None):
+        self.nombre = nombre
+        self.duracion = duracion
+        self.dueno = dueno or _identificador()
+        self.cliente = cliente or db
+        self._vence_en = 0.0
+
+    async def adquirir(self) -> bool:
+        """
+        Toma el arriendo si está libre o vencido, o lo renueva si ya es propio.
+        Retorna True si este proceso es el líder.
+        """
+        inicio = time.time()
+        ahora = datetime.now(timezone.utc)
+        fila = {"nombre": self.nombre, "dueno": self.dueno,
+                "vence_en": (ahora + timedelta(seconds=self.duracion)).isoformat()}
+        try:
+            tomadas = (await self.cliente.table(self.TABLA).update(fila)
+                       .eq("nombre", self.nombre)
+                       .or_(f'dueno.eq."{self.dueno}",vence_en.lt."{ahora.isoformat()}"')
+                       .execute()).data
+            if not tomadas:
+                existe = (await self.cliente.table(self.TABLA).select("nombre")
+                          .eq("nombre", self.nombre).execute()).data
+                if not existe:
+                    tomadas = (await self.cliente.table(self.TABLA).insert(fila).execute()).data
+        except APIError as e:
+            # Otro proceso insertó la fila primero (clave duplicada) u otro error de la API
+            print(f"No se pudo tomar el arriendo '{self.nombre}': {e}")
+            tomadas = []
+        except Exception as e:
+            print(f"Error al consultar el arriendo '{self.nombre}': {e}")
+            tomadas = []
+
+        # El vencimiento local se cuenta desde antes de la consulta, para no sobreestimarlo
+        self._vence_en = inicio + self.duracion if tomadas else 0.0
+        return self.es_lider()
+
+    def es_lider(self) -> bool:
+        return time.time() < self._vence_en
+
+    async def liberar(self):
+        """
+        Deja el arriendo vencido (al apagar) para que otro proceso lo tome sin esperar.
+        """
+        if not self._vence_en:
+            return
+        self._vence_en = 0.0
+        try:
+            await self.cliente.table(self.TABLA).update({"vence_en": datetime.now(timezone.utc).isoformat()}) \
+                .eq("nombre", self.nombre).eq("dueno", self.dueno).execute()
+        except Exception as e:
+            print(f"Error al liberar el arriendo '{self.nombre}': {e}")
+
+
+def crear_arriendo(nombre: str, duracion: float = 60):
+    """
+    Arriendo según CALORSOS_ARRIENDO: "archivo" (por defecto, un host) o "supabase" (varios hosts).
+    """
+    if os.getenv("CALORSOS_ARRIENDO", "archivo") == "supabase":
+        return ArriendoSupabase(nombre, duracion)
+    ruta = os.path.join(os.getenv("CALORSOS_DATA_DIR", "data"), f"arriendo_{nombre}.json")
+    return ArriendoArchivo(ruta, duracion)
+
+# Fin arriendo.py
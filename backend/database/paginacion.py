@@ -0,0 +1,194 @@
+# Inicio paginacion.py
+
+# backend/database/paginacion.py
+
+# Importaciones necesarias para la paginación de listados
+import base64
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+from fastapi import HTTPException, Query
+from backend.database.supabase_config import db
+
+# Límites de filas por página
+LIMITE_POR_DEFECTO = 500
+LIMITE_MAXIMO = 1000
+
+
+class ConfigPaginacion:
+    """
+    Describe cómo se pagina una tabla: su clave primaria, las columnas que se
+    pueden pedir con 'fields' (lista blanca, nunca incluye contraseñas) y las
+    columnas por las que se puede ordenar con 'order_by'.
+    """
+
+    def __init__(self, tabla: str, clave: str, campos: Iterable[str], orden: Iterable[str],
+                 orden_por_defecto: Optional[str] = None):
+        self.tabla = tabla
+        self.clave = clave
+        self.campos = tuple(campos)
+        self.orden = tuple(orden)
+        self.orden_por_defecto = orden_por_defecto or clave
+
+
+# ------------------------------ Parámetros ------------------------------
+
+def parametros_pagina(
+    limit: Optional[int] = Query(None, ge=1, le=LIMITE_MAXIMO, description=f"Filas por página (por defecto {LIMITE_POR_DEFECTO})"),
+    cursor: Optional[str] = Query(None, description="Valor next_cursor de la página anterior"),
+    fields: Optional[str] = Query(None, description="Columnas separadas por coma"),
+    order_by: Optional[str] = Query(None, description="Columna de orden; prefijo '-' para descendente")
+):
+    """
+    Dependencia común de los endpoints de listado: agrupa los parámetros de paginación
+    para pasarlos al modelo con **pagina.
+    """
+    return {"limit": limit, "cursor": cursor, "fields": fields, "order_by": order_by}
+
+
+def parsear_parametros(config: ConfigPaginacion, limit: Optional[int] = None, fields: Optional[str] = None,
+                       order_by: Optional[str] = None) -> Tuple[int, List[str], str, bool]:
+    """
+    Valida limit, fields y order_by ("campo" ascendente, "-campo" descendente).
+    Retorna (limite, columnas, campo_orden, descendente).
+    """
+    limite = LIMITE_POR_DEFECTO if limit is None else limit
+    if not 1 <= limite <= LIMITE_MAXIMO:
+        raise HTTPException(status_code=400, detail=f"limit debe estar entre 1 y {LIMITE_MAXIMO}")
+
+    orden = order_by or config.orden_por_defecto
+    descendente = orden.startswith("-")
+    campo_orden = orden.lstrip("-")
+    if campo_orden not in config.orden:
+        raise HTTPException(status_code=400, detail=f"order_by no válido. Opciones: {', '.join(config.orden)}")
+
+    if fields:
+        pedidos = [f.strip() for f in fields.split(",") if f.strip()]
+        invalidos = [f for f in pedidos if f not in config.campos]
+        if invalidos:
+            raise HTTPException(status_code=400, detail=f"Campos no válidos: {', '.join(invalidos)}")
+    else:
+        pedidos = list(config.campos)
+
+    # La clave y el campo de orden siempre se incluyen porque forman el cursor
+    columnas = list(dict.fromkeys([config.clave, campo_orden] + pedidos))
+    return limite, columnas, campo_orden, descendente
+
+
+def codificar_cursor(posicion) -> str:
+    return base64.urlsafe_b64encode(json.dumps(posicion, default=str).encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: Optional[str]):
+    if not cursor:
+        return None
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def _literal(valor) -> str:
+    """
+    Cita un valor para los filtros or() de PostgREST (fechas con ':' o '+', textos con comas).
+    """
+    texto = str(valor).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{texto}"'
+
+
+# ------------------------------ Consultas ------------------------------
+
+async def consultar_fuente(config: ConfigPaginacion, filtros: Optional[Dict] = None, limite: int = LIMITE_POR_DEFECTO,
+                           posicion: Optional[list] = None, columnas: Optional[List[str]] = None,
+                           campo_orden: Optional[str] = None, descendente: bool = False, cliente=None,
+                           desde=None, minimo=None) -> List[dict]:
+    """
+    Ejecuta una consulta keyset: filas posteriores a 'posicion' = [valor_orden, clave]
+    en el orden indicado, como máximo 'limite'. El desempate por clave primaria
+    hace que el recorrido sea estable aunque haya valores de orden repetidos.
+    'desde' restringe a filas con valor de orden estrictamente mayor y 'minimo'
+    a filas con valor de orden mayor o igual.
+    """
+    cliente = cliente or db
+    campo_orden = campo_orden or config.clave
+    query = cliente.table(config.tabla).select(",".join(columnas or config.campos))
+    for columna, valor in (filtros or {}).items():
+        if valor is not None:
+            query = query.eq(columna, valor)
+    if desde is not None:
+        query = query.gt(campo_orden, desde)
+    if minimo is not None:
+        query = query.gte(campo_orden, minimo)
+
+    if posicion is not None:
+        query = filtrar_posteriores(query, config, posicion, campo_orden, descendente)
+
+    query = query.order(campo_orden, desc=descendente)
+    if campo_orden != config.clave:
+        query = query.order(config.clave, desc=descendente)
+    return (await query.limit(limite).execute()).data
+
+
+def filtrar_posteriores(query, config: ConfigPaginacion, posicion: list, campo_orden: Optional[str] = None,
+                        descendente: bool = False):
+    """
+    Restringe la consulta a las filas que van después de 'posicion' = [valor_orden, clave].
+    """
+    campo_orden = campo_orden or config.clave
+    op = "lt" if descendente else "gt"
+    valor_orden, valor_clave = posicion
+    if campo_orden == config.clave:
+        return query.filter(config.clave, op, valor_clave)
+    return query.or_(
+        f"{campo_orden}.{op}.{_literal(valor_orden)},"
+        f"and({campo_orden}.eq.{_literal(valor_orden)},{config.clave}.{op}.{_literal(valor_clave)})"
+    )
+
+
+def posicion_de(fila: dict, config: ConfigPaginacion, campo_orden: str) -> list:
+    return [fila.get(campo_orden), fila.get(config.clave)]
+
+
+async def consultar(config: ConfigPaginacion, filtros: Optional[Dict] = None, limit: Optional[int] = None,
+                    cursor: Optional[str] = None, fields: Optional[str] = None, order_by: Optional[str] = None,
+                    cliente=None, desde=None) -> dict:
+    """
+    Retorna una página {"data": filas, "next_cursor": cursor o None}.
+    Se pide una fila de más para saber si existe una página siguiente.
+    """
+    limite, columnas, campo_orden, descendente = parsear_parametros(config, limit, fields, order_by)
+    posicion = decodificar_cursor(cursor)
+    if posicion is not None and not (isinstance(posicion, list) and len(posicion) == 2):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    filas = await consultar_fuente(config, filtros, limite + 1, posicion, columnas, campo_orden, descendente, cliente, desde)
+    siguiente = None
+    if len(filas) > limite:
+        filas = filas[:limite]
+        siguiente = codificar_cursor(posicion_de(filas[-1], config, campo_orden))
+    return {"data": filas, "next_cursor": siguiente}
+
+
+async def recorrer(config: ConfigPaginacion, filtros: Optional[Dict] = None, tamano: int = LIMITE_MAXIMO, cliente=None,
+                   campo_orden: Optional[str] = None, minimo=None):
+    """
+    Genera todas las filas de la tabla página a página, en memoria constante
+    (con 'minimo', solo las de valor de 'campo_orden' mayor o igual).
+    """
+    campo_orden = campo_orden or config.clave
+    posicion = None
+    while True:
+        filas = await consultar_fuente(config, filtros, tamano, posicion, cliente=cliente,
+                                       campo_orden=campo_orden, minimo=minimo)
+        for fila in filas:
+            yield fila
+        if len(filas) < tamano:
+            return
+        posicion = posicion_de(filas[-1], config, campo_orden)
+
+
+async def listar_todo(config: ConfigPaginacion, filtros: Optional[Dict] = None, cliente=None) -> List[dict]:
+    """
+    Retorna todas las filas de la tabla (por ejemplo, para cargar un índice en memoria).
+    """
+    return [fila async for fila in recorrer(config, filtros, cliente=cliente)]
+
+# Fin paginacion.py
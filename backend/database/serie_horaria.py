@@ -0,0 +1,223 @@
+# Inicio serie_horaria.py
+
+# backend/database/serie_horaria.py
+
+# Importaciones necesarias para el almacén local de series horarias
+import asyncio
+import json
+import math
+import os
+from array import array
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+from backend.database.arriendo import bloquear_archivo, desbloquear_archivo
+
+# Formato de hora usado por Open-Meteo con timezone=America/Bogota
+FORMATO_HORA = "%Y-%m-%dT%H:%M"
+UNA_HORA = timedelta(hours=1)
+
+# Horas recientes sin todos sus datos que se esperan antes de guardarlas con NaN:
+# Open-Meteo completa las últimas horas con retraso y la serie no se reescribe
+HORAS_ESPERA_DATOS = int(os.getenv("CALORSOS_SERIE_ESPERA_HORAS", "3"))
+
+
+# Clase principal del almacén de series horarias
+class SerieHoraria:
+    """
+    Almacén local, solo de anexado, para series horarias de una ubicación.
+    Cada variable se guarda como un arreglo columnar de float64 en su propio archivo
+    y las horas son contiguas desde 'inicio', por lo que la posición de cualquier hora
+    se calcula aritméticamente. Las horas cerradas se persisten una sola vez y solo
+    se descarga de Open-Meteo la cola que falta; las horas recientes que aún no
+    tienen todos sus datos se dejan para la siguiente actualización, salvo que
+    lleven más de HORAS_ESPERA_DATOS horas cerradas. Los anexados se hacen con un
+    bloqueo exclusivo del SO sobre el directorio, así que varios procesos (workers
+    de uvicorn y el worker de tareas) pueden compartir la misma serie.
+    """
+
+    def __init__(self, directorio: str, variables: tuple, horas_iniciales: int = 7 * 24):
+        self.directorio = directorio
+        self.variables = tuple(variables)
+        self.horas_iniciales = horas_iniciales
+        self._inicio: Optional[datetime] = None
+        self._columnas: Dict[str, array] = {v: array("d") for v in self.variables}
+        self._tiempos: List[str] = []
+        self._cargada = False
+        self._lock = asyncio.Lock()
+
+    # ------------------------------ Persistencia ------------------------------
+
+    def _ruta(self, nombre: str) -> str:
+        return os.path.join(self.directorio, nombre)
+
+    def _cargar(self):
+        """
+        Lee los archivos de disco a memoria. Si un anexado quedó a medias,
+        recorta todas las columnas a la longitud común más corta.
+        """
+        self._cargada = True
+        if not os.path.exists(self._ruta("meta.json")):
+            return
+
+        with open(self._ruta("meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if tuple(meta["variables"]) != self.variables:
+            # Esquema distinto: se descarta y se reconstruye desde la API
+            return
+
+        for v in self.variables:
+            columna = array("d")
+            ruta = self._ruta(f"{v}.f64")
+            if os.path.exists(ruta):
+                with open(ruta, "rb") as f:
+                    datos = f.read()
+                columna.frombytes(datos[: len(datos) - len(datos) % columna.itemsize])
+            self._columnas[v] = columna
+
+        n = min(len(c) for c in self._columnas.values())
+        for v in self.variables:
+            del self._columnas[v][n:]
+
+        self._inicio = datetime.strptime(meta["inicio"], FORMATO_HORA)
+        self._tiempos = [(self._inicio + i * UNA_HORA).strftime(FORMATO_HORA) for i in range(n)]
+
+    def _sincronizar_con_disco(self):
+        """
+        Relee los archivos si otro proceso anexó horas (o creó la serie) desde la
+        última lectura: la longitud en disco (tamaño / 8) manda sobre la de memoria.
+        """
+        if not os.path.exists(self._ruta("meta.json")):
+            return
+        ruta = self._ruta(f"{self.variables[0]}.f64")
+        en_disco = os.path.getsize(ruta) // 8 if os.path.exists(ruta) else 0
+        if self._inicio is None or en_disco != len(self._tiempos):
+            self._cargar()
+
+    def _anexar(self, inicio: datetime, filas: Dict[str, List[float]]):
+        """
+        Agrega filas contiguas al final de la serie, en memoria y en disco.
+        Se invoca con el bloqueo de la serie tomado.
+        """
+        os.makedirs(self.directorio, exist_ok=True)
+        if self._inicio is None:
+            self._inicio = inicio
+            with open(self._ruta("meta.json"), "w", encoding="utf-8") as f:
+                json.dump({"inicio": inicio.strftime(FORMATO_HORA), "variables": list(self.variables)}, f)
+            for v in self.variables:
+                open(self._ruta(f"{v}.f64"), "wb").close()
+
+        n = len(filas[self.variables[0]])
+        base = len(self._tiempos)
+        for v in self.variables:
+            bloque = array("d", filas[v])
+            with open(self._ruta(f"{v}.f64"), "ab") as f:
+                # Un anexado anterior que quedó a medias se recorta a la longitud común
+                f.truncate(base * bloque.itemsize)
+                bloque.tofile(f)
+            self._columnas[v].extend(bloque)
+
+        self._tiempos.extend(
+            (self._inicio + (base + i) * UNA_HORA).strftime(FORMATO_HORA) for i in range(n)
+        )
+
+    # ------------------------------ Actualización ------------------------------
+
+    def siguiente_hora(self) -> Optional[datetime]:
+        """
+        Retorna la primera hora que aún no está almacenada (None si la serie está vacía).
+        """
+        if not self._cargada:
+            self._cargar()
+        if self._inicio is None:
+            return None
+        return self._inicio + len(self._tiempos) * UNA_HORA
+
+    async def actualizar(self, ahora: datetime, descargar: Callable[[int], Awaitable[dict]]):
+        """
+        Completa la serie hasta la última hora cerrada antes de 'ahora' (hora local sin tz).
+        'descargar(past_days)' debe retornar el bloque 'hourly' de Open-Meteo.
+        Solo consulta la API cuando se ha cerrado al menos una hora nueva.
+        """
+        hora_actual = ahora.replace(minute=0, second=0, microsecond=0)
+        siguiente = self.siguiente_hora()
+        if siguiente is not None and siguiente >= hora_actual:
+            return
+
+        async with self._lock:
+            # Bloqueo entre procesos; se espera en un hilo para no detener el event loop
+            os.makedirs(self.directorio, exist_ok=True)
+            archivo = open(self._ruta(".lock"), "a+")
+            try:
+                await asyncio.to_thread(bloquear_archivo, archivo)
+                try:
+                    await self._completar(hora_actual, descargar)
+                finally:
+                    desbloquear_archivo(archivo)
+            finally:
+                archivo.close()
+
+    async def _completar(self, hora_actual: datetime, descargar: Callable[[int], Awaitable[dict]]):
+        """
+        Descarga y anexa las horas que faltan; se invoca con el bloqueo de la serie tomado.
+        """
+        # Otro proceso pudo anexar mientras se esperaba el bloqueo
+        self._sincronizar_con_disco()
+        siguiente = self.siguiente_hora()
+        if siguiente is not None and siguiente >= hora_actual:
+            return
+
+        desde = siguiente or hora_actual - self.horas_iniciales * UNA_HORA
+        # La API de pronóstico admite como máximo 92 días hacia atrás
+        past_days = min(92, math.ceil((hora_actual - desde) / timedelta(days=1)) + 1)
+        hourly = await descargar(past_days)
+
+        valores = {t: i for i, t in enumerate(hourly["time"])}
+        filas = {v: [] for v in self.variables}
+        hora = desde
+        while hora < hora_actual:
+            i = valores.get(hora.strftime(FORMATO_HORA))
+            for v in self.variables:
+                valor = hourly[v][i] if i is not None else None
+                filas[v].append(float("nan") if valor is None else float(valor))
+            hora += UNA_HORA
+
+        # No guardar aún la cola de horas recientes incompletas: se volverán a pedir
+        limite = hora_actual - HORAS_ESPERA_DATOS * UNA_HORA
+        n = len(filas[self.variables[0]])
+        while n and desde + (n - 1) * UNA_HORA >= limite \
+                and any(math.isnan(filas[v][n - 1]) for v in self.variables):
+            n -= 1
+        if n:
+            self._anexar(desde, {v: filas[v][:n] for v in self.variables})
+
+    # ------------------------------ Lectura ------------------------------
+
+    def ultimas_horas(self, horas: int) -> range:
+        """
+        Retorna el rango de posiciones de las últimas 'horas' horas almacenadas.
+        """
+        if not self._cargada:
+            self._cargar()
+        n = len(self._tiempos)
+        return range(max(0, n - horas), n)
+
+    def tiempo(self, i: int) -> str:
+        return self._tiempos[i]
+
+    def tiempos(self, rango: range) -> List[str]:
+        return self._tiempos[rango.start:rango.stop]
+
+    def valor(self, variable: str, i: int) -> Optional[float]:
+        """
+        Retorna el valor almacenado o None si el dato no estaba disponible.
+        """
+        x = self._columnas[variable][i]
+        return None if x != x else x
+
+    def columna(self, variable: str, rango: range) -> array:
+        """
+        Retorna una copia de la columna para el rango indicado (NaN para datos ausentes).
+        """
+        return self._columnas[variable][rango.start:rango.stop]
+
+# Fin serie_horaria.py
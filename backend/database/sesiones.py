@@ -0,0 +1,162 @@
+# Inicio sesiones.py
+
+# backend/database/sesiones.py
+
+# Importaciones necesarias para el almacén de sesiones (refresh tokens)
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Set
+from backend.database.supabase_config import db
+
+
+class Sesion:
+    """
+    Sesión guardada en memoria: solo el usuario, el hash del refresh token vigente,
+    su vencimiento y el momento de la última rotación.
+    """
+    __slots__ = ("id_usuario", "hash_token", "vence_en", "rotada_en")
+
+    def __init__(self, id_usuario: str, hash_token: str, vence_en: float):
+        self.id_usuario = id_usuario
+        self.hash_token = hash_token
+        self.vence_en = vence_en
+        self.rotada_en = 0.0
+
+
+class AlmacenSesionesMemoria:
+    """
+    Sesiones en la memoria del proceso: sirve con un solo worker. Las vencidas se
+    descartan al rotarlas y, en bloque, cada 'purgar_cada' sesiones creadas.
+    """
+
+    def __init__(self, purgar_cada: int = 1024):
+        self.purgar_cada = purgar_cada
+        self._sesiones: Dict[str, Sesion] = {}
+        self._por_usuario: Dict[str, Set[str]] = {}
+        self._creadas = 0
+
+    async def crear(self, id_sesion: str, id_usuario, hash_token: str, vence_en: float):
+        self._sesiones[id_sesion] = Sesion(str(id_usuario), hash_token, vence_en)
+        self._por_usuario.setdefault(str(id_usuario), set()).add(id_sesion)
+        self._creadas += 1
+        if self._creadas % self.purgar_cada == 0:
+            self._purgar()
+
+    async def rotar(self, id_sesion: str, hash_anterior: str, hash_nuevo: str, vence_en: float,
+                    gracia: float = 0) -> Optional[str]:
+        """
+        Reemplaza el hash del refresh token si 'hash_anterior' es el vigente y la
+        sesión no venció. Si la sesión ya se rotó a 'hash_nuevo' hace menos de
+        'gracia' segundos (otra renovación con el mismo token), la acepta sin
+        cambios. Retorna el id del usuario, o None si no se rotó.
+        """
+        sesion = self._sesiones.get(id_sesion)
+        if sesion is None:
+            return None
+        ahora = time.time()
+        if sesion.vence_en <= ahora:
+            await self.revocar(id_sesion)
+            return None
+        if sesion.hash_token == hash_anterior:
+            sesion.hash_token = hash_nuevo
+            sesion.vence_en = vence_en
+            sesion.rotada_en = ahora
+            return sesion.id_usuario
+        if sesion.hash_token == hash_nuevo and ahora - sesion.rotada_en <= gracia:
+            return sesion.id_usuario
+        return None
+
+    async def revocar(self, id_sesion: str):
+        sesion = self._sesiones.pop(id_sesion, None)
+        if sesion is not None:
+            ids = self._por_usuario.get(sesion.id_usuario)
+            if ids is not None:
+                ids.discard(id_sesion)
+                if not ids:
+                    del self._por_usuario[sesion.id_usuario]
+
+    async def revocar_usuario(self, id_usuario):
+        for id_sesion in list(self._por_usuario.get(str(id_usuario), ())):
+            await self.revocar(id_sesion)
+
+    def _purgar(self):
+        ahora = time.time()
+        for id_sesion in [i for i, s in self._sesiones.items() if s.vence_en <= ahora]:
+            sesion = self._sesiones.pop(id_sesion)
+            ids = self._por_usuario.get(sesion.id_usuario)
+            if ids is not None:
+                ids.discard(id_sesion)
+                if not ids:
+                    del self._por_usuario[sesion.id_usuario]
+
+    def estadisticas(self) -> dict:
+        return {"almacen": "memoria", "sesiones": len(self._sesiones), "usuarios": len(self._por_usuario)}
+
+
+class AlmacenSesionesSupabase:
+    """
+    Sesiones en la tabla 'sesiones' (id_sesion, id_usuario, hash_token, vence_en,
+    rotada_en): las comparten todos los workers y réplicas. La rotación es un
+    UPDATE condicionado al hash vigente, así que de dos renovaciones con el mismo
+    refresh token solo una rota; la otra se acepta si encuentra la sesión ya
+    rotada al mismo reemplazo dentro del periodo de gracia.
+    """
+
+    TABLA = "sesiones"
+
+    def __init__(self, cliente=None):
+        self.cliente = cliente or db
+
+    @staticmethod
+    def _fecha(epoch: float) -> str:
+        return datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+
+    async def crear(self, id_sesion: str, id_usuario, hash_token: str, vence_en: float):
+        await self.cliente.table(self.TABLA).insert({
+            "id_sesion": id_sesion,
+            "id_usuario": id_usuario,
+            "hash_token": hash_token,
+            "vence_en": self._fecha(vence_en),
+        }).execute()
+
+    async def rotar(self, id_sesion: str, hash_anterior: str, hash_nuevo: str, vence_en: float,
+                    gracia: float = 0) -> Optional[str]:
+        ahora = time.time()
+        rotadas = (await self.cliente.table(self.TABLA)
+                   .update({"hash_token": hash_nuevo, "vence_en": self._fecha(vence_en),
+                            "rotada_en": self._fecha(ahora)})
+                   .eq("id_sesion", id_sesion).eq("hash_token", hash_anterior)
+                   .gt("vence_en", self._fecha(ahora))
+                   .execute()).data
+        if not rotadas and gracia > 0:
+            rotadas = (await self.cliente.table(self.TABLA).select("id_usuario")
+                       .eq("id_sesion", id_sesion).eq("hash_token", hash_nuevo)
+                       .gt("vence_en", self._fecha(ahora))
+                       .gte("rotada_en", self._fecha(ahora - gracia))
+                       .execute()).data
+        return str(rotadas[0]["id_usuario"]) if rotadas else None
+
+    async def revocar(self, id_sesion: str):
+        await self.cliente.table(self.TABLA).delete().eq("id_sesion", id_sesion).execute()
+
+    async def revocar_usuario(self, id_usuario):
+        await self.cliente.table(self.TABLA).delete().eq("id_usuario", id_usuario).execute()
+
+    def estadisticas(self) -> dict:
+        return {"almacen": "supabase"}
+
+
+def crear_almacen_sesiones():
+    """
+    Almacén según CALORSOS_SESIONES: "supabase" (por defecto) o "memoria" (desarrollo,
+    un solo worker). La memoria se rechaza con WEB_CONCURRENCY > 1: cada worker
+    tendría sus propias sesiones y las renovaciones fallarían al azar.
+    """
+    if os.getenv("CALORSOS_SESIONES", "supabase") != "memoria":
+        return AlmacenSesionesSupabase()
+    if int(os.getenv("WEB_CONCURRENCY", "1")) > 1:
+        raise RuntimeError("CALORSOS_SESIONES=memoria requiere un solo worker; use CALORSOS_SESIONES=supabase")
+    return AlmacenSesionesMemoria()
+
+# Fin sesiones.py
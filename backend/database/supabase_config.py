@@ -4,7 +4,12 @@
 
 # Importaciones necesarias para configuración de Supabase
 from supabase import create_client, Client
+from postgrest import AsyncPostgrestClient
 from dotenv import load_dotenv
+from typing import List
+import asyncio
+import itertools
+import httpx
 import os
 
 # Cargar variables de entorno desde archivo específico
@@ -18,7 +23,122 @@ VITE_SUPABASE_KEY = os.getenv("VITE_SUPABASE_KEY")
 if not VITE_SUPABASE_URL or not VITE_SUPABASE_KEY:
     raise EnvironmentError("No se encontraron las variables VITE_SUPABASE_URL o VITE_SUPABASE_KEY en calorsos.env")
 
-# Crear cliente global de Supabase para toda la aplicación
+# Cliente síncrono de Supabase: solo para tareas que ya corren en hilos propios
+# (difusión masiva de notificaciones, scripts y benchmarks)
 supabase: Client = create_client(VITE_SUPABASE_URL, VITE_SUPABASE_KEY)
 
+# Pool de conexiones del cliente asíncrono: total de consultas en curso,
+# cantidad de sub-pools entre los que se reparten y timeout por consulta
+DB_CONEXIONES = int(os.getenv("CALORSOS_DB_CONEXIONES", "100"))
+DB_SUBPOOLS = max(1, int(os.getenv("CALORSOS_DB_SUBPOOLS", "20")))
+DB_TIMEOUT = float(os.getenv("CALORSOS_DB_TIMEOUT", "10"))
+
+
+class _CuerpoAcotado(httpx.AsyncByteStream):
+    """
+    Cuerpo de respuesta que libera el cupo del transporte al cerrarse.
+    """
+
+    def __init__(self, cuerpo: httpx.AsyncByteStream, semaforo: asyncio.Semaphore):
+        self._cuerpo = cuerpo
+        self._semaforo = semaforo
+        self._liberado = False
+
+    async def __aiter__(self):
+        async for fragmento in self._cuerpo:
+            yield fragmento
+
+    async def aclose(self):
+        try:
+            await self._cuerpo.aclose()
+        finally:
+            if not self._liberado:
+                self._liberado = True
+                self._semaforo.release()
+
+
+class _TransporteAcotado(httpx.AsyncHTTPTransport):
+    """
+    Transporte httpx que deja entrar al pool como máximo 'limite' peticiones a la vez;
+    las demás esperan en un semáforo. El pool de httpcore revisa todas sus peticiones
+    en espera contra todas sus conexiones cada vez que una termina, así que una cola
+    larga dentro del pool consume CPU en proporción cuadrática.
+    """
+
+    def __init__(self, limite: int, **kwargs):
+        super().__init__(**kwargs)
+        self._semaforo = asyncio.Semaphore(limite)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await self._semaforo.acquire()
+        try:
+            response = await super().handle_async_request(request)
+        except BaseException:
+            self._semaforo.release()
+            raise
+        response.stream = _CuerpoAcotado(response.stream, self._semaforo)
+        return response
+
+
+# Clase del cliente asíncrono de la base de datos
+class SupabaseAsync:
+    """
+    Cliente PostgREST asíncrono compartido por todo el proceso.
+    Las consultas se construyen igual que con el cliente síncrono
+    (db.table("usuarios").select("*").eq(...)) y se ejecutan con
+    'await ... .execute()', de modo que un solo worker mantiene cientos de
+    consultas en curso sin ocupar un hilo por cada una.
+    Las conexiones se reparten en varios sub-pools pequeños atendidos por turnos:
+    el costo de administrar un pool de httpcore crece con conexiones x peticiones,
+    y varios pools chicos sostienen mucha más concurrencia que uno grande.
+    Se ajusta con CALORSOS_DB_CONEXIONES, CALORSOS_DB_SUBPOOLS y CALORSOS_DB_TIMEOUT.
+    """
+
+    _clientes: List[AsyncPostgrestClient] = []
+    _turno = itertools.count()
+
+    @classmethod
+    def _crear_clientes(cls) -> List[AsyncPostgrestClient]:
+        url = f"{VITE_SUPABASE_URL.rstrip('/')}/rest/v1"
+        headers = {
+            "apiKey": VITE_SUPABASE_KEY,
+            "Authorization": f"Bearer {VITE_SUPABASE_KEY}",
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+        }
+        por_pool = max(1, DB_CONEXIONES // DB_SUBPOOLS)
+        limites = httpx.Limits(max_connections=por_pool, max_keepalive_connections=por_pool, keepalive_expiry=60)
+        return [
+            AsyncPostgrestClient(url, headers=headers, http_client=httpx.AsyncClient(
+                base_url=url,
+                headers=headers,
+                timeout=DB_TIMEOUT,
+                transport=_TransporteAcotado(por_pool, http2=True, limits=limites),
+            ))
+            for _ in range(DB_SUBPOOLS)
+        ]
+
+    @classmethod
+    def table(cls, nombre: str):
+        """
+        Inicia una consulta sobre la tabla usando el siguiente sub-pool.
+        Los clientes se crean la primera vez que se necesitan.
+        """
+        if not cls._clientes:
+            cls._clientes = cls._crear_clientes()
+        return cls._clientes[next(cls._turno) % len(cls._clientes)].from_(nombre)
+
+    @classmethod
+    async def cerrar(cls):
+        """
+        Cierra los pools de conexiones (se invoca al apagar la aplicación).
+        """
+        clientes, cls._clientes = cls._clientes, []
+        for cliente in clientes:
+            await cliente.aclose()
+
+
+# Cliente asíncrono global para los modelos
+db = SupabaseAsync
+
 # Fin supabase_config.py
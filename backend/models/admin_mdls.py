@@ -3,12 +3,17 @@
 # backend/models/admin_mdls.py
 
 # Importaciones necesarias para el modelo administrativo
-from backend.database.supabase_config import supabase
+import asyncio
+from typing import Dict, List, Tuple
+from backend.database.supabase_config import db
 from fastapi import HTTPException
 from backend.models.punto_hidratacion_mdls import PuntoHidratacionModel
 from backend.models.zonas_frescas_mdls import ZonaFrescaModel
 from backend.models.reportes_mdls import ReporteModel
 
+# Reportes que se aceptan en una sola moderación por lote
+MAXIMO_REPORTES_LOTE = 1000
+
 # Clase principal para operaciones administrativas
 class AdminModel:
     """
@@ -17,70 +22,63 @@ class AdminModel:
     """
 
     @staticmethod
-    def validar_reporte(id_reporte: str, admin_id: str):
+    def _entidad_de(reporte: dict, admin_id: str) -> Tuple[str, dict]:
+        """
+        Datos de la zona fresca o del punto de hidratación que crea un reporte validado.
+        Retorna (tipo, datos); lanza HTTPException 400 si el tipo no está soportado.
+        """
+        if reporte["tipo"] == "zona_fresca":
+            return "zona_fresca", {
+                "nombre": reporte.get("nombre", "Zona Fresca Reportada"),
+                "descripcion": reporte.get("descripcion"),
+                "latitud": reporte["latitud"],
+                "longitud": reporte["longitud"],
+                "tipo": reporte.get("tipo_zona_fresca", "urbana"),
+                "estado": "activa",
+                "validado_por": admin_id
+            }
+        if reporte["tipo"] == "hidratacion":
+            return "hidratacion", {
+                "nombre": reporte.get("nombre", "Punto de Hidratación Reportado"),
+                "descripcion": reporte.get("descripcion"),
+                "latitud": reporte["latitud"],
+                "longitud": reporte["longitud"],
+                "estado": "activa",
+                "validado_por": admin_id
+            }
+        # Tipo de reporte no soportado
+        raise HTTPException(status_code=400, detail=f"Tipo de reporte '{reporte['tipo']}' no soportado")
+
+    @staticmethod
+    async def validar_reporte(id_reporte: str, admin_id: str):
         """
         Valida un reporte y lo convierte en zona fresca o punto de hidratación según su tipo.
         Obtiene el reporte, verifica su estado y crea la entidad correspondiente.
         """
         try:
             # Obtener el reporte completo desde la base de datos
-            reporte = ReporteModel.obtener_reporte_por_id(id_reporte)
+            reporte = await ReporteModel.obtener_reporte_por_id(id_reporte)
 
             # Verificar que el reporte esté pendiente de validación
             if reporte["estado"] != "pendiente":
                 raise HTTPException(status_code=400, detail="El reporte ya ha sido procesado")
 
-            # Procesar según el tipo de reporte
-            if reporte["tipo"] == "zona_fresca":
-                # Preparar datos para crear zona fresca
-                zona_data = {
-                    "nombre": reporte.get("nombre", "Zona Fresca Reportada"),
-                    "descripcion": reporte.get("descripcion"),
-                    "latitud": reporte["latitud"],
-                    "longitud": reporte["longitud"],
-                    "tipo": reporte.get("tipo_zona_fresca", "urbana"),
-                    "estado": "activa",
-                    "validado_por": admin_id
-                }
-                # Crear la nueva zona fresca
-                nueva_zona = ZonaFrescaModel.crear_zona(**zona_data)
-
-                # Eliminar el reporte después de crear la zona
-                ReporteModel.eliminar_reporte(id_reporte)
-
-                # Retornar resultado de la validación
-                return {
-                    "tipo": "zona_fresca",
-                    "entidad_creada": nueva_zona,
-                    "reporte_eliminado": reporte
-                }
-
-            elif reporte["tipo"] == "hidratacion":
-                # Preparar datos para crear punto de hidratación
-                punto_data = {
-                    "nombre": reporte.get("nombre", "Punto de Hidratación Reportado"),
-                    "descripcion": reporte.get("descripcion"),
-                    "latitud": reporte["latitud"],
-                    "longitud": reporte["longitud"],
-                    "estado": "activa",
-                    "validado_por": admin_id
-                }
-                # Crear el nuevo punto de hidratación
-                nuevo_punto = PuntoHidratacionModel.crear_punto(**punto_data)
-
-                # Eliminar el reporte después de crear el punto
-                ReporteModel.eliminar_reporte(id_reporte)
-
-                # Retornar resultado de la validación
-                return {
-                    "tipo": "hidratacion",
-                    "entidad_creada": nuevo_punto,
-                    "reporte_eliminado": reporte
-                }
-
+            # Crear la zona fresca o el punto de hidratación según el tipo de reporte
+            tipo, datos = AdminModel._entidad_de(reporte, admin_id)
+            if tipo == "zona_fresca":
+                entidad = await ZonaFrescaModel.crear_zona(**datos)
             else:
-                # Tipo de reporte no soportado
-                raise HTTPException(status_code=400, detail=f"Tipo de reporte '{reporte['tipo']}' no soportado")
+                entidad = await PuntoHidratacionModel.crear_punto(**datos)
+
+            # Eliminar el reporte después de crear la entidad
+            await ReporteModel.eliminar_reporte(id_reporte)
+
+            # Retornar resultado de la validación
+            return {
+                "tipo": tipo,
+                "entidad_creada": entidad,
+                "reporte_eliminado": reporte
+            }
 
         except HTTPException as e:
             # Re-lanzar excepciones HTTP conocidas
@@ -90,17 +88,17 @@ class AdminModel:
             raise HTTPException(status_code=500, detail=f"Error al validar reporte: {str(e)}")
 
     @staticmethod
-    def rechazar_reporte(id_reporte: str):
+    async def rechazar_reporte(id_reporte: str):
         """
         Rechaza un reporte eliminándolo completamente de la base de datos.
         Obtiene el reporte antes de eliminarlo para devolver información.
         """
         try:
             # Obtener el reporte antes de eliminarlo
-            reporte = ReporteModel.obtener_reporte_por_id(id_reporte)
+            reporte = await ReporteModel.obtener_reporte_por_id(id_reporte)
 
             # Eliminar el reporte de la base de datos
-            ReporteModel.eliminar_reporte(id_reporte)
+            await ReporteModel.eliminar_reporte(id_reporte)
 
             # Retornar confirmación del rechazo
             return {
@@ -115,4 +113,114 @@ class AdminModel:
             # Manejar errores generales
             raise HTTPException(status_code=500, detail=f"Error al rechazar reporte: {str(e)}")
 
+    @staticmethod
+    async def moderar_lote(validar: List[str], rechazar: List[str], admin_id: str) -> List[dict]:
+        """
+        Valida y rechaza muchos reportes a la vez, con pocas consultas: una lectura
+        de todos los reportes, un INSERT por tipo de entidad (zonas frescas y puntos
+        de hidratación) y un DELETE de los reportes procesados (las lecturas y los
+        DELETE se dividen en tandas de hasta 200 ids que se ejecutan a la vez).
+        Retorna un resultado por reporte, en el orden recibido; un reporte con error
+        no impide procesar los demás, y solo se eliminan los reportes cuya entidad se creó.
+        """
+        validar = [str(i) for i in dict.fromkeys(validar)]
+        rechazar = [str(i) for i in dict.fromkeys(rechazar)]
+        if not validar and not rechazar:
+            raise HTTPException(status_code=400, detail="No se indicaron reportes para moderar")
+        if len(validar) + len(rechazar) > MAXIMO_REPORTES_LOTE:
+            raise HTTPException(status_code=400, detail=f"Se pueden moderar hasta {MAXIMO_REPORTES_LOTE} reportes por lote")
+
+        try:
+            resultados: Dict[str, dict] = {}
+
+            def error(id_reporte: str, accion: str, codigo: int, detalle: str, **extra):
+                resultados[id_reporte] = {"id_reporte": id_reporte, "accion": accion, "status": "error",
+                                          "status_code": codigo, "detail": detalle, **extra}
+
+            # Un reporte no puede validarse y rechazarse a la vez
+            en_ambas = set(validar) & set(rechazar)
+            for id_reporte in en_ambas:
+                error(id_reporte, "validar", 400, "El reporte aparece para validar y para rechazar")
+
+            # 1. Leer todos los reportes del lote
+            reportes = await ReporteModel.obtener_reportes_por_ids(
+                [i for i in validar + rechazar if i not in en_ambas]
+            )
+
+            # 2. Preparar las entidades de los reportes a validar, agrupadas por tipo
+            grupos: Dict[str, List[Tuple[str, dict]]] = {"zona_fresca": [], "hidratacion": []}
+            for id_reporte in validar:
+                if id_reporte in en_ambas:
+                    continue
+                reporte = reportes.get(id_reporte)
+                if reporte is None:
+                    error(id_reporte, "validar", 404, "Reporte no encontrado")
+                elif reporte["estado"] != "pendiente":
+                    error(id_reporte, "validar", 400, "El reporte ya ha sido procesado")
+                else:
+                    try:
+                        tipo, datos = AdminModel._entidad_de(reporte, admin_id)
+                    except HTTPException as e:
+                        error(id_reporte, "validar", e.status_code, e.detail)
+                        continue
+                    grupos[tipo].append((id_reporte, datos))
+
+            a_eliminar = []
+            for id_reporte in rechazar:
+                if id_reporte in en_ambas:
+                    continue
+                if id_reporte not in reportes:
+                    error(id_reporte, "rechazar", 404, "Reporte no encontrado")
+                else:
+                    a_eliminar.append(id_reporte)
+
+            # 3. Un INSERT por tipo, ambos a la vez
+            creadas = await asyncio.gather(
+                ZonaFrescaModel.crear_zonas([datos for _, datos in grupos["zona_fresca"]]),
+                PuntoHidratacionModel.crear_puntos([datos for _, datos in grupos["hidratacion"]]),
+                return_exceptions=True,
+            )
+            entidades: Dict[str, Tuple[str, dict]] = {}
+            for (tipo, grupo), entidades_tipo in zip(grupos.items(), creadas):
+                for posicion, (id_reporte, _) in enumerate(grupo):
+                    if isinstance(entidades_tipo, Exception):
+                        detalle = entidades_tipo.detail if isinstance(entidades_tipo, HTTPException) else str(entidades_tipo)
+                        error(id_reporte, "validar", 500, detalle, tipo=tipo)
+                    else:
+                        entidades[id_reporte] = (tipo, entidades_tipo[posicion])
+                        a_eliminar.append(id_reporte)
+
+            # 4. Un DELETE de los reportes rechazados y de los validados con su entidad creada
+            try:
+                eliminados, fallidos = await ReporteModel.eliminar_reportes(a_eliminar) if a_eliminar else (set(), {})
+            except HTTPException as e:
+                eliminados, fallidos = set(), {id_reporte: e.detail for id_reporte in a_eliminar}
+
+            for id_reporte in a_eliminar:
+                extra = {}
+                accion = "rechazar"
+                if id_reporte in entidades:
+                    accion = "validar"
+                    extra = {"tipo": entidades[id_reporte][0], "entidad_creada": entidades[id_reporte][1]}
+                if id_reporte in fallidos:
+                    # Falló la tanda de este reporte. Si se validó, la entidad ya existe:
+                    # el reporte queda pendiente y no debe validarse de nuevo
+                    error(id_reporte, accion, 500, fallidos[id_reporte], **extra)
+                elif accion == "rechazar" and id_reporte not in eliminados:
+                    # Otro administrador lo eliminó entre la lectura y el DELETE
+                    error(id_reporte, accion, 404, "Reporte no encontrado")
+                else:
+                    resultados[id_reporte] = {"id_reporte": id_reporte, "accion": accion, "status": "success",
+                                              "reporte_eliminado": reportes[id_reporte], **extra}
+
+            # Resultados en el orden recibido
+            return [resultados[i] for i in dict.fromkeys(validar + rechazar)]
+
+        except HTTPException as e:
+            # Re-lanzar excepciones HTTP conocidas
+            raise e
+        except Exception as e:
+            # Manejar errores generales
+            raise HTTPException(status_code=500, detail=f"Error al moderar reportes: {str(e)}")
+
 # Fin admin_mdls.py
@@ -3,9 +3,25 @@
 # backend/models/alertas_calor_mdls.py
 
 # Importaciones necesarias para el modelo de alertas de calor
-from backend.database.supabase_config import supabase
+from backend.database.supabase_config import db
 from fastapi import HTTPException
 from datetime import datetime, timedelta
+from backend.services.hub_eventos import hub_eventos
+from backend.database import paginacion
+from backend.database.paginacion import ConfigPaginacion
+from typing import Optional
+from backend.services.alerta_vigente import AlertaVigente
+
+# Columnas consultables y ordenables de alertas_calor
+PAGINACION_ALERTAS = ConfigPaginacion(
+    "alertas_calor", "id_alerta",
+    campos=("id_alerta", "temperatura", "humedad", "indice_uv", "nivel_riesgo", "fuente", "estado", "fecha_alerta"),
+    orden=("id_alerta", "fecha_alerta", "temperatura", "indice_uv"),
+    orden_por_defecto="-fecha_alerta",
+)
+
+# Alerta activa más reciente, mantenida en memoria para /alertas_calor/actual
+alerta_vigente = AlertaVigente()
 
 # Clase principal para manejar alertas de calor
 class AlertaCalorModel:
@@ -16,7 +32,7 @@ class AlertaCalorModel:
 
     # Método para crear una nueva alerta de calor
     @staticmethod
-    def crear_alerta(temperatura: float, humedad: float, indice_uv: float,
+    async def crear_alerta(temperatura: float, humedad: float, indice_uv: float,
                         nivel_riesgo: str, fuente: str = "OpenMeteo", estado: str = "activa"):
         try:
             data = {
@@ -28,7 +44,11 @@ class AlertaCalorModel:
                 "estado": estado,
             }
 
-            response = supabase.table("alertas_calor").insert(data).execute()
+            response = await db.table("alertas_calor").insert(data).execute()
+            if response.data:
+                # Empujar la nueva alerta a todos los clientes conectados
+                hub_eventos.publicar("alerta", response.data[0])
+                alerta_vigente.registrar(response.data[0])
             return response.data[0] if response.data else None
 
         except Exception as e:
@@ -36,7 +56,7 @@ class AlertaCalorModel:
 
     # Método para crear una alerta basada en datos climáticos
     @staticmethod
-    def crear_alerta_desde_clima(clima: dict):
+    async def crear_alerta_desde_clima(clima: dict):
         """
         Previene alertas duplicadas: si ya existe una alerta igual en la última hora, no crea otra.
         """
@@ -49,7 +69,7 @@ class AlertaCalorModel:
         # Buscar alertas similares en la última hora
         hace_una_hora = (datetime.utcnow() - timedelta(hours=1)).isoformat()
 
-        existing = supabase.table("alertas_calor") \
+        existing = await db.table("alertas_calor") \
             .select("*") \
             .eq("nivel_riesgo", nivel) \
             .gte("fecha_alerta", hace_una_hora) \
@@ -59,7 +79,7 @@ class AlertaCalorModel:
             return existing.data[0]  # ya existe alerta reciente → no duplicar
 
         # Crear nueva alerta
-        nueva = AlertaCalorModel.crear_alerta(
+        nueva = await AlertaCalorModel.crear_alerta(
             temperatura=temperatura,
             humedad=humedad,
             indice_uv=indice_uv,
@@ -70,28 +90,50 @@ class AlertaCalorModel:
         return nueva
     
     @staticmethod
-    def listar_alertas():
+    async def listar_alertas(limit: Optional[int] = None, cursor: Optional[str] = None,
+                             fields: Optional[str] = None, order_by: Optional[str] = None):
         """
-        Obtiene todas las alertas de calor registradas.
-        Retorna una lista de todas las alertas en la base de datos.
+        Obtiene una página de alertas de calor, por defecto de la más reciente a la más antigua.
+        Retorna {"data": alertas, "next_cursor": cursor de la página siguiente o None}.
         """
         try:
-            # Consultar todas las alertas
-            response = supabase.table("alertas_calor").select("*").execute()
-            return response.data
+            return await paginacion.consultar(PAGINACION_ALERTAS, None, limit, cursor, fields, order_by)
+        except HTTPException as e:
+            # Re-lanzar excepciones HTTP conocidas
+            raise e
         except Exception as e:
             # Manejar errores en la consulta
             raise HTTPException(status_code=500, detail=f"Error al listar alertas: {str(e)}")
 
     @staticmethod
-    def obtener_alerta_por_id(id_alerta: str):
+    async def obtener_alerta_actual():
+        """
+        Retorna (alerta, etag) de la alerta activa más reciente, o (None, etag) si no hay.
+        Se sirve desde memoria; la base de datos solo se consulta (una fila) en frío.
+        """
+        async def cargar():
+            response = await db.table("alertas_calor").select("*") \
+                .eq("estado", "activa") \
+                .order("fecha_alerta", desc=True) \
+                .limit(1) \
+                .execute()
+            return response.data[0] if response.data else None
+
+        try:
+            return await alerta_vigente.obtener(cargar)
+        except Exception as e:
+            # Manejar errores en la consulta
+            raise HTTPException(status_code=500, detail=f"Error al obtener alerta actual: {str(e)}")
+
+    @staticmethod
+    async def obtener_alerta_por_id(id_alerta: str):
         """
         Obtiene una alerta específica por su ID.
         Busca la alerta en la base de datos y la retorna si existe.
         """
         try:
             # Consultar alerta por ID
-            response = supabase.table("alertas_calor").select("*").eq("id_alerta", id_alerta).execute()
+            response = await db.table("alertas_calor").select("*").eq("id_alerta", id_alerta).execute()
             if not response.data:
                 raise HTTPException(status_code=404, detail="Alerta no encontrada")
             return response.data[0]
@@ -100,14 +142,15 @@ class AlertaCalorModel:
             raise HTTPException(status_code=500, detail=f"Error al obtener alerta: {str(e)}")
 
     @staticmethod
-    def eliminar_alerta(id_alerta: str):
+    async def eliminar_alerta(id_alerta: str):
         """
         Elimina una alerta de calor existente.
         Remueve la alerta de la base de datos por su ID.
         """
         try:
             # Ejecutar eliminación
-            response = supabase.table("alertas_calor").delete().eq("id_alerta", id_alerta).execute()
+            response = await db.table("alertas_calor").delete().eq("id_alerta", id_alerta).execute()
+            alerta_vigente.retirar(id_alerta)
             # Retornar mensaje de confirmación
             return {"message": "Alerta eliminada correctamente"} if response.data else {"message": "No se encontró la alerta"}
         except Exception as e:
@@ -4,14 +4,47 @@
 
 # Importaciones necesarias para el modelo climático
 from fastapi import HTTPException
-import requests
+import httpx
 from datetime import datetime, date, timedelta, timezone
+import os
+from typing import List, Optional
+import numpy as np
 import pytz
-from backend.database.supabase_config import supabase
+from backend.database.supabase_config import db
+from backend.database.serie_horaria import SerieHoraria
+from backend.services.cache_pronostico import CachePronostico
+from backend.services.cache_tablas import CacheTabla
+from backend.services.cliente_clima import ClienteClima
+from backend.services.ubicaciones import celda, celdas_registradas, listar_ubicaciones, resolver_ubicacion
+from backend.services.indices_calor import a_lista, calcular_indices, nivel_alerta, nombres_alerta, ventanas_riesgo
+
+# Variables horarias que se descargan del pronóstico de Open-Meteo
+VARIABLES_PRONOSTICO = ("temperature_2m", "relativehumidity_2m", "apparent_temperature", "uv_index", "weathercode")
+
+# Variables horarias que se guardan en la serie histórica local de Cartagena
+VARIABLES_SERIE = ("temperature_2m", "relativehumidity_2m", "apparent_temperature", "uv_index")
+
+# Serie histórica local: las horas cerradas se guardan una vez en disco
+serie_cartagena = SerieHoraria(
+    os.path.join(os.getenv("CALORSOS_DATA_DIR", "data"), "serie_cartagena"), VARIABLES_SERIE
+)
+
+# Caché compartida del pronóstico: se refresca cada 10 minutos y sirve datos
+# obsoletos hasta 30 minutos más mientras se recarga en segundo plano
+cache_pronostico = CachePronostico(ttl=600, gracia=1800)
+
+# Respuestas de la serie histórica ya serializadas (y comprimidas): la serie solo
+# cambia al cerrarse cada hora, así que las claves incluyen la hora actual
+cache_series = CacheTabla("serie_cartagena", capacidad=64, vigencia=3600)
+
+# Ventanas de riesgo pronosticadas, ya serializadas: las claves incluyen la hora
+# actual y la descarga del pronóstico, así que se recalculan solo al refrescarse este
+cache_ventanas = CacheTabla("ventanas_riesgo", capacidad=128, vigencia=3600)
+
 # Clase principal para manejar datos climáticos
 class ClimaModel:
     """
-    Modelo para obtener y procesar datos climáticos de Cartagena.
+    Modelo para obtener y procesar datos climáticos de Cartagena y sus alrededores.
     Utiliza APIs externas para datos actuales e históricos.
     """
     # Coordenadas fijas de Cartagena
@@ -19,194 +52,225 @@ class ClimaModel:
     LON = -75.4794
 
     @staticmethod
-    def obtener_clima(ciudad: str = "Cartagena"):
+    async def _descargar_pronosticos(celdas: list, variables: tuple):
+        """
+        Descarga en una sola petición multi-coordenada el pronóstico horario completo
+        de varias celdas de la grilla. Retorna un diccionario (celda, variables) -> pronóstico
+        con los arreglos horarios y un índice de posición por hora.
+        """
+        response = await ClienteClima.consultar("forecast", {
+            "latitude": ",".join(str(lat) for lat, _ in celdas),
+            "longitude": ",".join(str(lon) for _, lon in celdas),
+            "hourly": ",".join(variables),
+            "timezone": "America/Bogota",
+        })
+        if response.status_code != 200:
+            raise HTTPException(status_code=response.status_code, detail="Error al consultar API climática")
+
+        # Open-Meteo retorna un objeto para una coordenada y una lista para varias
+        data = response.json()
+        if isinstance(data, dict):
+            data = [data]
+
+        descargado_en = datetime.now(pytz.timezone("America/Bogota")).isoformat(timespec="seconds")
+        pronosticos = {}
+        for c, item in zip(celdas, data):
+            hourly = item["hourly"]
+            pronosticos[(c, variables)] = {
+                "hourly": hourly,
+                "indice": {t: i for i, t in enumerate(hourly["time"])},
+                "descargado_en": descargado_en,
+            }
+        return pronosticos
+
+    @staticmethod
+    async def obtener_pronosticos(celdas: list, variables: tuple = VARIABLES_PRONOSTICO):
+        """
+        Retorna el pronóstico horario completo de cada celda desde la caché compartida.
+        Las celdas ausentes, junto con las demás celdas registradas que estén vencidas,
+        se descargan en una única petición por lote.
+        """
+        variables = tuple(variables)
+        resultados = await cache_pronostico.obtener_lote(
+            [(c, variables) for c in celdas],
+            lambda claves: ClimaModel._descargar_pronosticos([c for c, _ in claves], variables),
+            precarga=[(c, variables) for c in celdas_registradas()],
+        )
+        faltantes = [c for c in celdas if (c, variables) not in resultados]
+        if faltantes:
+            raise HTTPException(status_code=502, detail="La API climática no retornó datos para todas las ubicaciones")
+        return {c: resultados[(c, variables)] for c in celdas}
+
+    @staticmethod
+    async def obtener_pronostico(lat: float = LAT, lon: float = LON, variables: tuple = VARIABLES_PRONOSTICO):
+        """
+        Retorna el pronóstico horario completo de la celda que contiene la coordenada.
+        Solo se consulta Open-Meteo cuando la entrada no existe o venció su periodo de gracia.
+        """
+        c = celda(lat, lon)
+        pronosticos = await ClimaModel.obtener_pronosticos([c], variables)
+        return pronosticos[c]
+
+    @staticmethod
+    def estadisticas_cache():
+        """
+        Retorna los contadores de aciertos y fallos de la caché de pronósticos.
+        """
+        return cache_pronostico.estadisticas()
+
+    @staticmethod
+    def _clima_actual(pronostico: dict, ubicacion: dict, hora: str):
+        """
+        Construye la respuesta climática de una ubicación para la hora indicada
+        ('YYYY-MM-DDTHH:00') a partir de su pronóstico en caché.
+        """
+        hourly = pronostico["hourly"]
+        hora_actual = pronostico["indice"].get(hora)
+        if hora_actual is None:
+            raise HTTPException(status_code=503, detail="El pronóstico no contiene la hora actual")
+
+        # Extraer datos de la hora actual
+        temperatura = hourly["temperature_2m"][hora_actual]
+        humedad = hourly["relativehumidity_2m"][hora_actual]
+        feels_like = hourly["apparent_temperature"][hora_actual]
+        uv_index = hourly["uv_index"][hora_actual]
+        weather_code = hourly["weathercode"][hora_actual]
+
+        # Validar y convertir datos
+        temperatura = float(temperatura) if temperatura is not None else 0.0
+        humedad = float(humedad) if humedad is not None else 0.0
+        feels_like = float(feels_like) if feels_like is not None else temperatura
+        uv_index = float(uv_index) if uv_index is not None else 0.0
+
+        # Mapear código de clima a descripción
+        weather_dict = {
+            0: "Despejado",
+            1: "Principalmente despejado",
+            2: "Parcialmente nublado",
+            3: "Nublado",
+            45: "Niebla",
+            48: "Escarcha",
+            51: "Lluvia ligera",
+            53: "Lluvia moderada",
+            55: "Lluvia intensa",
+            61: "Lluvia",
+            63: "Lluvia intensa",
+            65: "Lluvia muy intensa",
+            71: "Nieve ligera",
+            73: "Nieve moderada",
+            75: "Nieve intensa",
+            80: "Lluvias dispersas",
+            81: "Lluvias continuas",
+            82: "Lluvias intensas",
+            95: "Tormenta eléctrica",
+            99: "Tormenta con granizo"
+        }
+        condicion = weather_dict.get(weather_code, "Desconocido")
+
+        # Calcular niveles personalizados y riesgo térmico (WBGT) con el motor vectorizado
+        indices = calcular_indices([temperatura], [humedad], [feels_like], [uv_index])
+        heat_level = float(indices["heat_level"][0])
+        hydration_level = int(indices["hydration_level"][0])
+        thermal_risk = int(indices["thermal_risk"][0])
+
+        # Construir respuesta con todos los datos
+        clima = {
+            "ciudad": ubicacion["nombre"],
+            "ubicacion": ubicacion["clave"],
+            "latitud": ubicacion["latitud"],
+            "longitud": ubicacion["longitud"],
+            "temperatura": temperatura,
+            "humedad": humedad,
+            "sensacion_termica": feels_like,
+            "condicion": condicion,
+            "uv_index": uv_index,
+            "heat_level": heat_level,
+            "hydration_level": hydration_level,
+            "thermal_risk": thermal_risk,
+        }
+
+        return clima
+
+    @staticmethod
+    def _resolver(ciudad: str):
+        """
+        Resuelve el nombre recibido a una ubicación registrada o lanza 404.
+        """
+        ubicacion = resolver_ubicacion(ciudad)
+        if ubicacion is None:
+            raise HTTPException(status_code=404, detail=f"Ubicación '{ciudad}' no registrada")
+        return ubicacion
+
+    @staticmethod
+    async def obtener_clima(ciudad: str = "Cartagena"):
         """
         Obtiene la información climática actual incluyendo temperatura, humedad,
         sensación térmica, condición, UV, niveles de calor e hidratación, y riesgo térmico.
-        Consulta la API de Open-Meteo para datos horarios.
+        Consulta la API de Open-Meteo para datos horarios de la celda de la ubicación.
         """
         try:
-            # Construir URL para consulta de pronóstico
-            url = (
-                f"https://api.open-meteo.com/v1/forecast?"
-                f"latitude={ClimaModel.LAT}&longitude={ClimaModel.LON}&"
-                f"hourly=temperature_2m,relativehumidity_2m,apparent_temperature,uv_index,weathercode&"
-                f"timezone=America/Bogota"
-            )
-
-            # Realizar petición a la API
-            response = requests.get(url, timeout=10)
-            if response.status_code != 200:
-                raise HTTPException(status_code=response.status_code, detail="Error al consultar API climática")
+            ubicacion = ClimaModel._resolver(ciudad)
 
-            data = response.json()
+            # Obtener pronóstico completo desde la caché (una descarga por ventana de refresco)
+            pronostico = await ClimaModel.obtener_pronostico(ubicacion["latitud"], ubicacion["longitud"])
 
             # Obtener hora actual en Cartagena
             tz = pytz.timezone("America/Bogota")
             now = datetime.now(tz)
-            hora_actual = now.hour
-
-            # Extraer datos de la hora actual
-            temperatura = data["hourly"]["temperature_2m"][hora_actual]
-            humedad = data["hourly"]["relativehumidity_2m"][hora_actual]
-            feels_like = data["hourly"]["apparent_temperature"][hora_actual]
-            uv_index = data["hourly"]["uv_index"][hora_actual]
-            weather_code = data["hourly"]["weathercode"][hora_actual]
-
-            # Validar y convertir datos
-            temperatura = float(temperatura) if temperatura is not None else 0.0
-            humedad = float(humedad) if humedad is not None else 0.0
-            feels_like = float(feels_like) if feels_like is not None else temperatura
-            uv_index = float(uv_index) if uv_index is not None else 0.0
-
-            # Mapear código de clima a descripción
-            weather_dict = {
-                0: "Despejado",
-                1: "Principalmente despejado",
-                2: "Parcialmente nublado",
-                3: "Nublado",
-                45: "Niebla",
-                48: "Escarcha",
-                51: "Lluvia ligera",
-                53: "Lluvia moderada",
-                55: "Lluvia intensa",
-                61: "Lluvia",
-                63: "Lluvia intensa",
-                65: "Lluvia muy intensa",
-                71: "Nieve ligera",
-                73: "Nieve moderada",
-                75: "Nieve intensa",
-                80: "Lluvias dispersas",
-                81: "Lluvias continuas",
-                82: "Lluvias intensas",
-                95: "Tormenta eléctrica",
-                99: "Tormenta con granizo"
-            }
-            condicion = weather_dict.get(weather_code, "Desconocido")
-
-            # Calcular niveles personalizados
-            heat_level = min(100, max(0, (feels_like - 20) * 4))
-            hydration_level = round(1 + (humedad / 100) * 3 + (temperatura / 40) * 5)
-            hydration_level = min(10, max(1, hydration_level))
-
-            # Calcular riesgo térmico usando WBGT
-            wbgt = (0.7 * feels_like) + (0.3 * (humedad / 10))
-            if wbgt < 24:
-                thermal_risk = 0
-            elif wbgt < 27:
-                thermal_risk = 1
-            elif wbgt < 30:
-                thermal_risk = 2
-            elif wbgt < 33:
-                thermal_risk = 3
-            elif wbgt < 36:
-                thermal_risk = 4
-            else:
-                thermal_risk = 5
-
-            # Construir respuesta con todos los datos
-            clima = {
-                "ciudad": ciudad,
-                "temperatura": temperatura,
-                "humedad": humedad,
-                "sensacion_termica": feels_like,
-                "condicion": condicion,
-                "uv_index": uv_index,
-                "heat_level": heat_level,
-                "hydration_level": hydration_level,
-                "thermal_risk": thermal_risk,
-            }
 
-            return clima
+            return ClimaModel._clima_actual(pronostico, ubicacion, now.strftime("%Y-%m-%dT%H:00"))
 
-        except requests.Timeout:
+        except HTTPException as e:
+            # Re-lanzar excepciones HTTP conocidas
+            raise e
+        except httpx.TimeoutException:
             raise HTTPException(status_code=504, detail="Timeout al consultar API climática")
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error al obtener clima: {str(e)}")
 
     @staticmethod
-    def obtener_historico_sensacion(dias: int = 1):
+    async def obtener_clima_multiple(ciudades: Optional[List[str]] = None):
         """
-        Devuelve la sensación térmica horaria de los últimos días especificados.
-        Utiliza la API de archive para datos históricos.
-        Retorna lista de diccionarios con hora y sensación.
+        Obtiene la información climática actual de varias ubicaciones registradas
+        (todas si no se especifican) con una sola petición por lote a Open-Meteo.
         """
         try:
-            # Definir rango de fechas
-            end = date.today()
-            start = end - timedelta(days=dias)
-
-            # Construir URL para datos históricos
-            url = (
-                f"https://archive-api.open-meteo.com/v1/archive?"
-                f"latitude={ClimaModel.LAT}&longitude={ClimaModel.LON}&"
-                f"start_date={start}&end_date={end}&"
-                f"hourly=apparent_temperature&timezone=America/Bogota"
-            )
-
-            # Realizar petición
-            resp = requests.get(url, timeout=10)
-            if resp.status_code != 200:
-                raise HTTPException(
-                    status_code=resp.status_code,
-                    detail="Error al consultar datos históricos del clima"
-                )
-
-            data = resp.json()
-            horas = data.get("hourly", {}).get("time", [])
-            sensaciones = data.get("hourly", {}).get("apparent_temperature", [])
-
-            # Validar datos obtenidos
-            if not horas or not sensaciones or len(horas) != len(sensaciones):
-                raise HTTPException(status_code=500, detail="Datos históricos incompletos")
-
-            # Procesar datos en lista de diccionarios
-            historico = [
-                {"hora": h.split("T")[1][:5], "sensacion": float(s)}
-                for h, s in zip(horas, sensaciones)
-            ]
-
-            return historico
-
-        except requests.Timeout:
-            raise HTTPException(status_code=504, detail="Timeout al consultar API histórica")
+            if ciudades:
+                ubicaciones = [ClimaModel._resolver(c) for c in ciudades]
+            else:
+                ubicaciones = [resolver_ubicacion(u["clave"]) for u in listar_ubicaciones()]
+
+            celdas = [celda(u["latitud"], u["longitud"]) for u in ubicaciones]
+            pronosticos = await ClimaModel.obtener_pronosticos(list(dict.fromkeys(celdas)))
+
+            hora = datetime.now(pytz.timezone("America/Bogota")).strftime("%Y-%m-%dT%H:00")
+            return [ClimaModel._clima_actual(pronosticos[c], u, hora) for u, c in zip(ubicaciones, celdas)]
+
+        except HTTPException as e:
+            # Re-lanzar excepciones HTTP conocidas
+            raise e
+        except httpx.TimeoutException:
+            raise HTTPException(status_code=504, detail="Timeout al consultar API climática")
         except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error al obtener histórico: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Error al obtener clima: {str(e)}")
 
     @staticmethod
-    def obtener_historico_temp_humedad(dias: int = 1):
+    async def _descargar_historico_reciente(past_days: int):
         """
-        Devuelve temperatura y humedad con timestamp completo para los días especificados.
-        Para 1 día usa forecast con past_days, para más días usa archive API.
-        Retorna lista con timestamp, hora, fecha, temperatura y humedad.
+        Descarga las horas pasadas de la serie de Cartagena (pronóstico con past_days).
+        Retorna el bloque 'hourly' de la respuesta.
         """
-        lat = ClimaModel.LAT
-        lon = ClimaModel.LON
-        tz = pytz.timezone("America/Bogota")
-        now = datetime.now(tz)
-
-        # Seleccionar API según número de días
-        if dias == 1:
-            # Usar forecast API para 1 día con datos pasados
-            url = (
-                f"https://api.open-meteo.com/v1/forecast?"
-                f"latitude={lat}&longitude={lon}&"
-                f"hourly=temperature_2m,relativehumidity_2m&"
-                f"past_days=1&timezone=America/Bogota"
-            )
-        else:
-            # Usar archive API para más días
-            end_date = now.date()
-            start_date = end_date - timedelta(days=dias)
-            url = (
-                f"https://archive-api.open-meteo.com/v1/archive?"
-                f"latitude={lat}&longitude={lon}&"
-                f"start_date={start_date}&end_date={end_date}&"
-                f"hourly=temperature_2m,relativehumidity_2m&timezone=America/Bogota"
-            )
-
-        # Realizar petición
-        resp = requests.get(url, timeout=10)
+        try:
+            resp = await ClienteClima.consultar("forecast", {
+                "latitude": ClimaModel.LAT,
+                "longitude": ClimaModel.LON,
+                "hourly": ",".join(VARIABLES_SERIE),
+                "past_days": past_days,
+                "forecast_days": 1,
+                "timezone": "America/Bogota",
+            })
+        except httpx.TimeoutException:
+            raise HTTPException(status_code=504, detail="Timeout al consultar API climática histórica")
         if resp.status_code != 200:
             raise HTTPException(status_code=resp.status_code, detail="Error al consultar API climática histórica")
         data = resp.json()
@@ -214,34 +278,108 @@ class ClimaModel:
         # Verificar errores en respuesta
         if "error" in data:
             raise HTTPException(status_code=500, detail=data.get("reason", "Error en API climática histórica"))
+        return data["hourly"]
 
-        # Extraer datos
-        times = data["hourly"]["time"]
-        temps = data["hourly"]["temperature_2m"]
-        hums = data["hourly"]["relativehumidity_2m"]
+    @staticmethod
+    def hora_serie() -> str:
+        """
+        Hora local actual ('YYYY-MM-DDTHH'): mientras no cambie, la serie no suma horas cerradas.
+        """
+        return datetime.now(pytz.timezone("America/Bogota")).strftime("%Y-%m-%dT%H")
+
+    @staticmethod
+    async def _serie_actualizada(dias: int):
+        """
+        Completa la serie local con las horas cerradas que falten y retorna
+        el rango de posiciones de los últimos 'dias' días.
+        """
+        ahora = datetime.now(pytz.timezone("America/Bogota")).replace(tzinfo=None)
+        await serie_cartagena.actualizar(ahora, ClimaModel._descargar_historico_reciente)
+        return serie_cartagena.ultimas_horas(dias * 24)
+
+    @staticmethod
+    async def obtener_historico_sensacion(dias: int = 1):
+        """
+        Devuelve la sensación térmica horaria de los últimos días especificados.
+        Lee la serie local; solo se descargan las horas cerradas desde la última consulta.
+        Retorna lista de diccionarios con hora y sensación.
+        """
+        rango = await ClimaModel._serie_actualizada(dias)
+        return [
+            {"hora": serie_cartagena.tiempo(i)[11:16], "sensacion": serie_cartagena.valor("apparent_temperature", i)}
+            for i in rango
+        ]
 
-        # Validar consistencia de datos
-        if len(times) != len(temps) or len(times) != len(hums):
-            raise HTTPException(status_code=500, detail="Datos históricos inconsistentes")
+    @staticmethod
+    async def obtener_historico_temp_humedad(dias: int = 1):
+        """
+        Devuelve temperatura y humedad con timestamp completo para los días especificados.
+        Lee la serie local; solo se descargan las horas cerradas desde la última consulta.
+        Retorna lista con timestamp, hora, fecha, temperatura y humedad.
+        """
+        rango = await ClimaModel._serie_actualizada(dias)
 
-        # Procesar datos históricos
+        # Las horas ya vienen en formato 'YYYY-MM-DDTHH:MM', se recortan sin parsear
         historico = []
-        for t, temp, hum in zip(times, temps, hums):
-            dt_obj = datetime.fromisoformat(t)
+        for i in rango:
+            t = serie_cartagena.tiempo(i)
             historico.append({
-                "timestamp": dt_obj.isoformat(),
-                "hora": dt_obj.strftime("%H:%M"),
-                "fecha": dt_obj.strftime("%m-%d"),
-                "temperatura": temp,
-                "humedad": hum
+                "timestamp": t + ":00",
+                "hora": t[11:16],
+                "fecha": t[5:10],
+                "temperatura": serie_cartagena.valor("temperature_2m", i),
+                "humedad": serie_cartagena.valor("relativehumidity_2m", i)
             })
 
-        # Para 1 día, filtrar últimas 24 horas
-        if dias == 1:
-            historico = historico[-24:]
-
         return historico
 
+    @staticmethod
+    async def obtener_ventanas_riesgo(ciudad: str = "Cartagena", horas: int = 48):
+        """
+        Aplica las reglas de evaluar_alerta_climatica a las próximas 'horas' horas del
+        pronóstico en caché (sin consultas adicionales a Open-Meteo) y retorna las
+        ventanas de riesgo medio o alto, ya serializadas. El resultado se reutiliza
+        hasta que cambia la hora o se refresca el pronóstico.
+        """
+        try:
+            ubicacion = ClimaModel._resolver(ciudad)
+            pronostico = await ClimaModel.obtener_pronostico(ubicacion["latitud"], ubicacion["longitud"])
+            hora = datetime.now(pytz.timezone("America/Bogota")).strftime("%Y-%m-%dT%H:00")
+
+            async def cargar():
+                inicio = pronostico["indice"].get(hora)
+                if inicio is None:
+                    raise HTTPException(status_code=503, detail="El pronóstico no contiene la hora actual")
+                hourly = pronostico["hourly"]
+                fin = inicio + horas
+                tiempos = hourly["time"][inicio:fin]
+                columnas = {v: np.array(hourly[v][inicio:fin], dtype=np.float64) for v in VARIABLES_SERIE}
+                return {
+                    "status": "success",
+                    "data": {
+                        "ciudad": ubicacion["nombre"],
+                        "ubicacion": ubicacion["clave"],
+                        "desde": hora,
+                        "horas": len(tiempos),
+                        "pronostico_actualizado": pronostico.get("descargado_en"),
+                        "ventanas": ventanas_riesgo(
+                            tiempos, columnas["temperature_2m"], columnas["relativehumidity_2m"],
+                            columnas["apparent_temperature"], columnas["uv_index"]
+                        ),
+                    }
+                }
+
+            clave = (ubicacion["clave"], horas, hora, pronostico.get("descargado_en"))
+            return await cache_ventanas.obtener(clave, cargar)
+
+        except HTTPException as e:
+            # Re-lanzar excepciones HTTP conocidas
+            raise e
+        except httpx.TimeoutException:
+            raise HTTPException(status_code=504, detail="Timeout al consultar API climática")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error al obtener pronóstico de alertas: {str(e)}")
+
     # Método para evaluar nivel de alerta climática
     @staticmethod
     def evaluar_alerta_climatica(datos): # datos: dict con 'temperatura', 'uv_index', 'sensacion_termica'
@@ -249,20 +387,41 @@ class ClimaModel:
         Evalúa el nivel de alerta climática basado en temperatura, índice UV y sensación térmica.
         Retorna "alto", "medio" o "bajo".
         """
-        temp = datos["temperatura"]
-        uv = datos["uv_index"]
-        humedad = datos["humedad"]
+        indices = calcular_indices(
+            [datos["temperatura"]], [datos["humedad"]], [datos["sensacion_termica"]], [datos["uv_index"]]
+        )
+        return nivel_alerta(indices["alerta"][0])
 
-        # reglas reales y simples
-        if temp >= 36 or uv >= 9 or datos["sensacion_termica"] >= 40:
-            return "alto"
-        if temp >= 33:
-            return "medio"
-        return "bajo"
+    @staticmethod
+    async def obtener_riesgo_horario(dias: int = 1):
+        """
+        Devuelve la línea de tiempo horaria de riesgo térmico de los últimos días.
+        Los índices se calculan en una sola pasada vectorizada sobre la serie local.
+        Retorna un objeto columnar: cada clave es una lista alineada con 'timestamp'.
+        """
+        rango = await ClimaModel._serie_actualizada(dias)
+        columnas = {v: np.frombuffer(serie_cartagena.columna(v, rango), dtype=np.float64) for v in VARIABLES_SERIE}
+        indices = calcular_indices(
+            columnas["temperature_2m"], columnas["relativehumidity_2m"],
+            columnas["apparent_temperature"], columnas["uv_index"]
+        )
+        valido = indices["valido"]
+
+        return {
+            "timestamp": [t + ":00" for t in serie_cartagena.tiempos(rango)],
+            "temperatura": a_lista(columnas["temperature_2m"], valido),
+            "humedad": a_lista(columnas["relativehumidity_2m"], valido),
+            "sensacion_termica": a_lista(columnas["apparent_temperature"], valido),
+            "uv_index": a_lista(columnas["uv_index"], valido),
+            "heat_level": a_lista(indices["heat_level"], valido),
+            "hydration_level": a_lista(indices["hydration_level"], valido, int),
+            "thermal_risk": a_lista(indices["thermal_risk"], valido, int),
+            "nivel_alerta": nombres_alerta(indices["alerta"], valido),
+        }
 
     # Método para crear alerta en la base de datos
     @staticmethod
-    def crear_alerta_desde_clima(clima):
+    async def crear_alerta_desde_clima(clima):
         """
         Crea una alerta de calor en la base de datos basada en los datos climáticos proporcionados.
         Usa Supabase para insertar los datos en la tabla 'alertas_calor'.
@@ -275,7 +434,7 @@ class ClimaModel:
             "nivel_riesgo": nivel,
             "fuente": "Open-Meteo"
         }
-        response = supabase.table("alertas_calor").insert(datos_insert).execute()
+        response = await db.table("alertas_calor").insert(datos_insert).execute()
         return response.data[0]
 
 # Fin clima_mdls.py
\ No newline at end of file
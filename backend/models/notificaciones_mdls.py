@@ -3,10 +3,156 @@
 # backend/models/notificaciones_mdls.py
 
 # Importaciones necesarias para el modelo de notificaciones
-from backend.database.supabase_config import supabase
+from backend.database.supabase_config import db, supabase
+from fastapi.concurrency import run_in_threadpool
 from fastapi import HTTPException
-from typing import Optional
-from datetime import datetime, timedelta
+from typing import List, Optional
+from datetime import datetime, timedelta, timezone
+import os
+from backend.services.difusion_notificaciones import MotorDifusion
+from backend.services.hub_eventos import hub_eventos
+from backend.services.contador_no_leidas import ContadorNoLeidas
+from backend.database import paginacion
+from backend.database.paginacion import ConfigPaginacion
+from backend.models.usuarios_mdls import UsuarioModel
+
+# Modo de las notificaciones globales:
+#   "copias" -> una fila en notificaciones por usuario (por defecto)
+#   "tabla"  -> un solo registro en notificaciones_globales, un cursor de lectura
+#               por usuario y lecturas solo de las excepciones (requiere crear
+#               esas tres tablas, ver README)
+MODO_GLOBALES = os.getenv("CALORSOS_NOTIF_GLOBALES", "copias")
+
+# Prefijo con el que se exponen los ids de las notificaciones globales
+PREFIJO_GLOBAL = "global-"
+
+# Motor de difusión por lotes para el modo "copias"
+motor_difusion = MotorDifusion(supabase)
+
+# Contadores en memoria de notificaciones no leídas por usuario
+contador_no_leidas = ContadorNoLeidas()
+
+# Estado que marca una notificación como leída
+ESTADO_LEIDA = "leida"
+
+# Columnas consultables y ordenables de notificaciones personales y globales
+PAGINACION_NOTIFICACIONES = ConfigPaginacion(
+    "notificaciones", "id_notificacion",
+    campos=("id_notificacion", "id_usuario", "mensaje", "estado", "fecha_envio"),
+    orden=("fecha_envio",),
+    orden_por_defecto="-fecha_envio",
+)
+PAGINACION_GLOBALES = ConfigPaginacion(
+    "notificaciones_globales", "id_notificacion_global",
+    campos=("id_notificacion_global", "mensaje", "fecha_envio"),
+    orden=("fecha_envio",),
+)
+
+
+def _id_global(id_notificacion: str) -> Optional[str]:
+    """
+    Retorna el id de la notificación global si el id recibido tiene el prefijo 'global-'.
+    """
+    id_notificacion = str(id_notificacion)
+    return id_notificacion[len(PREFIJO_GLOBAL):] if id_notificacion.startswith(PREFIJO_GLOBAL) else None
+
+
+def _como_notificacion(global_: dict, id_usuario: Optional[str] = None, estado: str = "pendiente"):
+    """
+    Presenta una notificación global con la misma forma que una personal.
+    """
+    return {
+        "id_notificacion": f"{PREFIJO_GLOBAL}{global_['id_notificacion_global']}",
+        "id_usuario": id_usuario,
+        "mensaje": global_["mensaje"],
+        "estado": estado,
+        "fecha_envio": global_["fecha_envio"],
+        "global": True,
+    }
+
+async def _fecha_registro(id_usuario: Optional[str]) -> Optional[str]:
+    """
+    Fecha de registro del usuario (del perfil en caché): las notificaciones
+    globales enviadas antes no le corresponden.
+    """
+    if not id_usuario:
+        return None
+    perfil = (await UsuarioModel.obtener_perfil(id_usuario)).datos["usuario_actual"]
+    return perfil.get("fecha_registro")
+
+def _instante(fecha: str) -> datetime:
+    valor = datetime.fromisoformat(str(fecha).replace("Z", "+00:00"))
+    return valor if valor.tzinfo else valor.replace(tzinfo=timezone.utc)
+
+def _fecha_mayor(a: Optional[str], b: Optional[str]) -> Optional[str]:
+    """
+    Retorna la más reciente de dos fechas ISO (None si ambas faltan).
+    """
+    if a is None or b is None:
+        return a or b
+    return a if _instante(a) >= _instante(b) else b
+
+def _hasta_cursor(global_: dict, cursor: Optional[list]) -> bool:
+    """
+    True si la notificación global va en o antes del cursor de lectura [fecha_envio, id].
+    """
+    if cursor is None:
+        return False
+    return (_instante(global_["fecha_envio"]), int(global_["id_notificacion_global"])) <= \
+        (_instante(cursor[0]), int(cursor[1]))
+
+async def _cursor_lectura(id_usuario: Optional[str]) -> Optional[list]:
+    """
+    Posición [fecha_envio, id] hasta la que el usuario marcó todas las globales como leídas.
+    """
+    if not id_usuario:
+        return None
+    filas = (await db.table("cursores_lectura_globales").select("fecha_envio, id_notificacion_global")
+             .eq("id_usuario", id_usuario).execute()).data
+    return paginacion.posicion_de(filas[0], PAGINACION_GLOBALES, "fecha_envio") if filas else None
+
+async def _lecturas_globales(id_usuario: str) -> List[dict]:
+    """
+    Estados registrados por el usuario (las excepciones al cursor), con la fecha
+    de envío de su notificación global.
+    """
+    lecturas = (await db.table("lecturas_notificaciones_globales").select("id_notificacion_global, estado")
+                .eq("id_usuario", id_usuario).execute()).data
+    if not lecturas:
+        return []
+    fechas = {
+        str(g["id_notificacion_global"]): g["fecha_envio"]
+        for g in (await db.table("notificaciones_globales").select("id_notificacion_global, fecha_envio")
+                  .in_("id_notificacion_global", [l["id_notificacion_global"] for l in lecturas]).execute()).data
+    }
+    return [dict(l, fecha_envio=fechas[str(l["id_notificacion_global"])])
+            for l in lecturas if str(l["id_notificacion_global"]) in fechas]
+
+async def _globales_pendientes(id_usuario: str):
+    """
+    Cuenta las globales que el usuario no ha leído: las enviadas desde su registro
+    y después de su cursor, corregidas por sus lecturas registradas.
+    Retorna (pendientes, cursor, lecturas).
+    """
+    registro = await _fecha_registro(id_usuario)
+    cursor = await _cursor_lectura(id_usuario)
+    query = db.table("notificaciones_globales").select("id_notificacion_global", count="exact", head=True)
+    if registro:
+        query = query.gte("fecha_envio", registro)
+    if cursor:
+        query = paginacion.filtrar_posteriores(query, PAGINACION_GLOBALES, cursor, "fecha_envio")
+    pendientes = (await query.execute()).count or 0
+
+    lecturas = await _lecturas_globales(id_usuario)
+    for lectura in lecturas:
+        if registro and _instante(lectura["fecha_envio"]) < _instante(registro):
+            continue
+        leida_por_cursor = _hasta_cursor(lectura, cursor)
+        if lectura["estado"] == ESTADO_LEIDA and not leida_por_cursor:
+            pendientes -= 1
+        elif lectura["estado"] != ESTADO_LEIDA and leida_por_cursor:
+            pendientes += 1
+    return pendientes, cursor, lecturas
 
 # Clase principal para manejar notificaciones
 class NotificacionModel:
@@ -16,7 +162,7 @@ class NotificacionModel:
     """
     # Crear una nueva notificación
     @staticmethod
-    def crear_notificacion(id_usuario: str, mensaje: str, estado: str = "pendiente"):
+    async def crear_notificacion(id_usuario: str, mensaje: str, estado: str = "pendiente"):
         """
         Crea una nueva notificación para un usuario específico.
         Args:
@@ -29,7 +175,12 @@ class NotificacionModel:
                 "estado": estado,
             }
 
-            response = supabase.table("notificaciones").insert(data).execute()
+            response = await db.table("notificaciones").insert(data).execute()
+            if response.data:
+                # Empujar la notificación al usuario conectado
+                hub_eventos.publicar("notificacion", response.data[0], id_usuario=id_usuario)
+                if estado != ESTADO_LEIDA:
+                    contador_no_leidas.sumar_personales(id_usuario, 1)
             return response.data[0] if response.data else None
 
         except Exception as e:
@@ -37,99 +188,336 @@ class NotificacionModel:
 
     # Crear notificaciones globales sin spam
     @staticmethod
-    def crear_notificaciones_globales(mensaje):
+    async def crear_notificaciones_globales(mensaje, deduplicar: bool = True):
         """
-        Evita spam: no genera la misma notificación más de 1 vez por hora.
+        Evita spam: no genera la misma notificación más de 1 vez por hora
+        (deduplicar=False omite esa consulta, para quien ya decide cuándo notificar).
+        En modo "tabla" guarda un único registro en notificaciones_globales;
+        en modo "copias" inserta una fila por usuario con el motor de difusión.
+        Retorna un resumen con la cantidad de registros insertados.
         """
 
         hace_una_hora = (datetime.utcnow() - timedelta(hours=1)).isoformat()
+        tabla = "notificaciones_globales" if MODO_GLOBALES == "tabla" else "notificaciones"
 
-        # ¿Ya se envió este mensaje recientemente?
-        ya_existe = supabase.table("notificaciones") \
-            .select("*") \
-            .eq("mensaje", mensaje) \
-            .gte("fecha_envio", hace_una_hora) \
-            .execute()
-
-        if ya_existe.data:
-            return ya_existe.data # no repetir si ya existe
-
-        # Enviar a todos
-        usuarios = supabase.table("usuarios").select("id_usuario").execute().data
-        notifs = []
+        # ¿Ya se envió este mensaje recientemente? (basta con una fila)
+        if deduplicar:
+            ya_existe = await db.table(tabla) \
+                .select("fecha_envio") \
+                .eq("mensaje", mensaje) \
+                .gte("fecha_envio", hace_una_hora) \
+                .limit(1) \
+                .execute()
 
-        for u in usuarios:
-            item = {
-                "id_usuario": u["id_usuario"],
-                "mensaje": mensaje,
-                "estado": "pendiente",
-            }
+            if ya_existe.data:
+                return {"omitida": True, "insertadas": 0} # no repetir si ya existe
 
-            res = supabase.table("notificaciones").insert(item).execute()
-            notifs.append(res.data[0])
+        if MODO_GLOBALES == "tabla":
+            # Un solo registro visible para todos los usuarios
+            response = await db.table("notificaciones_globales").insert({"mensaje": mensaje}).execute()
+            if response.data:
+                # Empujar la notificación a todos los clientes conectados
+                hub_eventos.publicar("notificacion_global", _como_notificacion(response.data[0]))
+                contador_no_leidas.sumar_globales(1)
+            return {"omitida": False, "insertadas": 1, "notificacion": response.data[0] if response.data else None}
 
-        return notifs
+        # Enviar a todos (el motor inserta los lotes en su propio pool de hilos)
+        resumen = await run_in_threadpool(motor_difusion.difundir, mensaje)
+        contador_no_leidas.invalidar()
+        hub_eventos.publicar("notificacion_global", {"mensaje": mensaje, "estado": "pendiente", "global": True})
+        return resumen
     
     @staticmethod
-    def listar_notificaciones(id_usuario: Optional[str] = None):
+    async def listar_notificaciones(id_usuario: Optional[str] = None, limit: Optional[int] = None,
+                                    cursor: Optional[str] = None, fields: Optional[str] = None,
+                                    order_by: Optional[str] = None, since: Optional[str] = None):
         """
-        Lista todas las notificaciones o filtra por usuario específico.
-        Si se proporciona id_usuario, retorna solo sus notificaciones.
+        Lista una página de notificaciones, todas o las de un usuario específico.
+        En modo "tabla" las notificaciones globales enviadas desde el registro del
+        usuario se combinan con las personales (con su estado de lectura) por fecha de envío. El cursor guarda
+        la posición de cada fuente por separado, así que ninguna se repite ni se pierde.
+        Con 'since' (id de notificación o fecha ISO) solo retorna las posteriores,
+        de la más antigua a la más nueva.
+        Retorna {"data": notificaciones, "next_cursor": cursor de la página siguiente o None}.
         """
         try:
-            # Construir consulta base
-            query = supabase.table("notificaciones").select("*")
-            # Aplicar filtro si se especifica usuario
-            if id_usuario:
-                query = query.eq("id_usuario", id_usuario)
-            # Ejecutar consulta
-            response = query.execute()
-            return response.data
+            inicio, limites = {}, {"p": {}, "g": {}}
+            if since:
+                inicio, limites = await NotificacionModel._inicio_desde(since, id_usuario)
+                order_by = "fecha_envio"
+
+            if MODO_GLOBALES != "tabla":
+                if not cursor and "p" in inicio:
+                    cursor = paginacion.codificar_cursor(inicio["p"])
+                return await paginacion.consultar(PAGINACION_NOTIFICACIONES, {"id_usuario": id_usuario or None},
+                                            limit, cursor, fields, order_by, desde=limites["p"].get("desde"))
+
+            limite, columnas, campo, descendente = paginacion.parsear_parametros(
+                PAGINACION_NOTIFICACIONES, limit, fields, order_by)
+            posiciones = paginacion.decodificar_cursor(cursor) or inicio
+            if not isinstance(posiciones, dict):
+                raise HTTPException(status_code=400, detail="Cursor inválido")
+
+            personales = await paginacion.consultar_fuente(
+                PAGINACION_NOTIFICACIONES, {"id_usuario": id_usuario or None}, limite + 1,
+                posiciones.get("p"), columnas, campo, descendente, desde=limites["p"].get("desde"))
+            globales = await paginacion.consultar_fuente(
+                PAGINACION_GLOBALES, None, limite + 1, posiciones.get("g"), None, campo, descendente,
+                desde=limites["g"].get("desde"),
+                minimo=_fecha_mayor(await _fecha_registro(id_usuario), limites["g"].get("minimo")))
+
+            # Combinar ambas fuentes por fecha y cortar en el límite
+            candidatas = [("p", n) for n in personales] + [("g", g) for g in globales]
+            candidatas.sort(key=lambda c: c[1].get(campo) or "", reverse=descendente)
+            pagina = candidatas[:limite]
+
+            # Estado de lectura solo de las globales de esta página: el registrado
+            # por el usuario o, si no hay, el que indica su cursor
+            lecturas, cursor_lectura = {}, None
+            ids_globales = [g["id_notificacion_global"] for fuente, g in pagina if fuente == "g"]
+            if id_usuario and ids_globales:
+                cursor_lectura = await _cursor_lectura(id_usuario)
+                lecturas = {
+                    str(l["id_notificacion_global"]): l["estado"]
+                    for l in (await db.table("lecturas_notificaciones_globales")
+                        .select("id_notificacion_global, estado")
+                        .eq("id_usuario", id_usuario)
+                        .in_("id_notificacion_global", ids_globales).execute()).data
+                }
+
+            notificaciones = []
+            for fuente, fila in pagina:
+                if fuente == "p":
+                    posiciones["p"] = paginacion.posicion_de(fila, PAGINACION_NOTIFICACIONES, campo)
+                    notificaciones.append(fila)
+                else:
+                    posiciones["g"] = paginacion.posicion_de(fila, PAGINACION_GLOBALES, campo)
+                    estado = lecturas.get(str(fila["id_notificacion_global"]),
+                                          ESTADO_LEIDA if _hasta_cursor(fila, cursor_lectura) else "pendiente")
+                    n = _como_notificacion(fila, id_usuario, estado)
+                    notificaciones.append({k: v for k, v in n.items() if k in columnas or k == "global"})
+
+            siguiente = paginacion.codificar_cursor(posiciones) if len(candidatas) > limite else None
+            return {"data": notificaciones, "next_cursor": siguiente}
+        except HTTPException as e:
+            # Re-lanzar excepciones HTTP conocidas
+            raise e
         except Exception as e:
             # Manejar errores en la consulta
             raise HTTPException(status_code=500, detail=f"Error al listar notificaciones: {str(e)}")
 
     @staticmethod
-    def obtener_notificacion_por_id(id_notificacion: str):
+    async def _inicio_desde(since: str, id_usuario: Optional[str] = None):
+        """
+        Convierte el parámetro 'since' en el punto de partida de cada fuente.
+        Con un id de notificación (personal o 'global-N') su fuente parte de la
+        posición (fecha_envio, id), así que las de la misma fecha no se pierden; a
+        igual fecha, las personales van antes que las globales. Con una fecha ISO
+        ambas fuentes parten de las posteriores a ella.
+        Retorna (posiciones por fuente, límites 'desde'/'minimo' por fuente).
+        """
+        id_global = _id_global(since)
+        if id_global is not None:
+            if MODO_GLOBALES != "tabla":
+                # En modo "copias" las globales son filas personales con id numérico
+                raise HTTPException(status_code=400, detail="since no acepta ids 'global-N' con notificaciones globales en modo copias")
+            filas = (await db.table("notificaciones_globales").select("id_notificacion_global, fecha_envio")
+                     .eq("id_notificacion_global", id_global).execute()).data
+            if filas:
+                return ({"g": paginacion.posicion_de(filas[0], PAGINACION_GLOBALES, "fecha_envio")},
+                        {"p": {"desde": filas[0]["fecha_envio"]}, "g": {}})
+        elif since.isdigit():
+            query = db.table("notificaciones").select("id_notificacion, fecha_envio").eq("id_notificacion", since)
+            if id_usuario:
+                query = query.eq("id_usuario", id_usuario)
+            filas = (await query.execute()).data
+            if filas:
+                return ({"p": paginacion.posicion_de(filas[0], PAGINACION_NOTIFICACIONES, "fecha_envio")},
+                        {"p": {}, "g": {"minimo": filas[0]["fecha_envio"]}})
+        else:
+            try:
+                fecha = datetime.fromisoformat(since.replace("Z", "+00:00")).isoformat()
+            except ValueError:
+                raise HTTPException(status_code=400, detail="since debe ser un id de notificación o una fecha ISO")
+            return {}, {"p": {"desde": fecha}, "g": {"desde": fecha}}
+        # La notificación de referencia ya no existe: el cliente debe volver a empezar sin 'since'
+        raise HTTPException(status_code=404, detail="Notificación de referencia para 'since' no encontrada")
+
+    @staticmethod
+    async def contar_no_leidas(id_usuario: str) -> int:
+        """
+        Retorna cuántas notificaciones (personales y globales) no ha leído el usuario.
+        Se sirve desde un contador en memoria; solo se consulta la base de datos
+        (consultas count, sin traer filas) cuando el contador no está vigente.
+        """
+        async def contar_usuario():
+            personales = (await db.table("notificaciones").select("id_notificacion", count="exact", head=True)
+                          .eq("id_usuario", id_usuario).neq("estado", ESTADO_LEIDA).execute()).count or 0
+            if MODO_GLOBALES != "tabla":
+                return personales, 0
+            # Se descuentan del total de globales las leídas y las enviadas antes del registro
+            total = await contar_globales()
+            pendientes, _, _ = await _globales_pendientes(id_usuario)
+            return personales, total - pendientes
+
+        async def contar_globales():
+            if MODO_GLOBALES != "tabla":
+                return 0
+            return (await db.table("notificaciones_globales").select("id_notificacion_global", count="exact", head=True)
+                    .execute()).count or 0
+
+        try:
+            return await contador_no_leidas.obtener(id_usuario, contar_usuario, contar_globales)
+        except Exception as e:
+            # Manejar errores en el conteo
+            raise HTTPException(status_code=500, detail=f"Error al contar notificaciones no leídas: {str(e)}")
+
+    @staticmethod
+    async def marcar_leidas(id_usuario: str, ids: Optional[List[str]] = None):
+        """
+        Marca como leídas varias notificaciones del usuario con una sola escritura por tabla.
+        Sin 'ids' marca todas: las globales adelantando el cursor de lectura del
+        usuario hasta la más reciente (y borrando las lecturas que quedan atrás),
+        sin escribir una fila por notificación.
+        Retorna cuántas personales y globales se marcaron.
+        """
+        try:
+            ids_personales = None if ids is None else [i for i in ids if _id_global(i) is None]
+            ids_globales = None if ids is None else [_id_global(i) for i in ids if _id_global(i) is not None]
+
+            personales = []
+            if ids_personales is None or ids_personales:
+                query = db.table("notificaciones").update({"estado": ESTADO_LEIDA}) \
+                    .eq("id_usuario", id_usuario).neq("estado", ESTADO_LEIDA)
+                if ids_personales:
+                    query = query.in_("id_notificacion", ids_personales)
+                personales = (await query.execute()).data
+
+            globales = 0
+            if MODO_GLOBALES == "tabla" and ids_globales is None:
+                ultima = (await db.table("notificaciones_globales").select("id_notificacion_global, fecha_envio")
+                          .order("fecha_envio", desc=True).order("id_notificacion_global", desc=True)
+                          .limit(1).execute()).data
+                if ultima:
+                    globales, _, lecturas = await _globales_pendientes(id_usuario)
+                    cursor = paginacion.posicion_de(ultima[0], PAGINACION_GLOBALES, "fecha_envio")
+                    await db.table("cursores_lectura_globales").upsert(
+                        {"id_usuario": id_usuario, "fecha_envio": cursor[0], "id_notificacion_global": cursor[1]},
+                        on_conflict="id_usuario"
+                    ).execute()
+                    # Las lecturas que quedan detrás del cursor ya no aportan nada
+                    atras = [l["id_notificacion_global"] for l in lecturas if _hasta_cursor(l, cursor)]
+                    if atras:
+                        await db.table("lecturas_notificaciones_globales").delete() \
+                            .eq("id_usuario", id_usuario).in_("id_notificacion_global", atras).execute()
+            elif MODO_GLOBALES == "tabla" and ids_globales:
+                globales = len((await db.table("lecturas_notificaciones_globales").upsert(
+                    [{"id_notificacion_global": g, "id_usuario": id_usuario, "estado": ESTADO_LEIDA} for g in ids_globales],
+                    on_conflict="id_notificacion_global,id_usuario"
+                ).execute()).data)
+
+            if ids is None:
+                contador_no_leidas.marcar_todo_leido(id_usuario)
+            else:
+                contador_no_leidas.invalidar(id_usuario)
+            return {"personales": len(personales), "globales": max(globales, 0)}
+        except Exception as e:
+            # Manejar errores en la actualización
+            raise HTTPException(status_code=500, detail=f"Error al marcar notificaciones como leídas: {str(e)}")
+
+    @staticmethod
+    async def obtener_notificacion_por_id(id_notificacion: str):
         """
         Obtiene una notificación específica por su ID.
         Busca en la base de datos y retorna la notificación si existe.
         """
         try:
+            id_global = _id_global(id_notificacion)
+            if id_global is not None:
+                response = await db.table("notificaciones_globales").select("*").eq("id_notificacion_global", id_global).execute()
+                if not response.data:
+                    raise HTTPException(status_code=404, detail="Notificación no encontrada")
+                return _como_notificacion(response.data[0])
+
             # Consultar notificación por ID
-            response = supabase.table("notificaciones").select("*").eq("id_notificacion", id_notificacion).execute()
+            response = await db.table("notificaciones").select("*").eq("id_notificacion", id_notificacion).execute()
             if not response.data:
                 raise HTTPException(status_code=404, detail="Notificación no encontrada")
             return response.data[0]
+        except HTTPException as e:
+            # Re-lanzar excepciones HTTP conocidas
+            raise e
         except Exception as e:
             # Manejar errores en la consulta
             raise HTTPException(status_code=500, detail=f"Error al obtener notificación: {str(e)}")
 
     @staticmethod
-    def actualizar_estado(id_notificacion: str, estado: str):
+    async def actualizar_estado(id_notificacion: str, estado: str):
         """
         Actualiza el estado de una notificación.
         Cambia el estado (ej. pendiente a enviada) por ID.
         """
         try:
+            if _id_global(id_notificacion) is not None:
+                # El estado de una notificación global es propio de cada usuario
+                raise HTTPException(status_code=400, detail="El estado de una notificación global se actualiza por usuario en /notificaciones/global/{id}/estado")
             # Ejecutar actualización de estado
-            response = supabase.table("notificaciones").update({"estado": estado}).eq("id_notificacion", id_notificacion).execute()
+            response = await db.table("notificaciones").update({"estado": estado}).eq("id_notificacion", id_notificacion).execute()
             if not response.data:
                 raise HTTPException(status_code=404, detail="Notificación no encontrada para actualizar")
+            # El estado anterior no se conoce: el contador del usuario se recalcula al consultarlo
+            contador_no_leidas.invalidar(response.data[0]["id_usuario"])
             return response.data[0]
+        except HTTPException as e:
+            # Re-lanzar excepciones HTTP conocidas
+            raise e
         except Exception as e:
             # Manejar errores en la actualización
             raise HTTPException(status_code=500, detail=f"Error al actualizar notificación: {str(e)}")
 
     @staticmethod
-    def eliminar_notificacion(id_notificacion: str):
+    async def actualizar_estado_global(id_notificacion: str, id_usuario: str, estado: str = "leida"):
+        """
+        Registra el estado de una notificación global para un usuario
+        (una fila por usuario y notificación en lecturas_notificaciones_globales).
+        """
+        try:
+            id_global = _id_global(id_notificacion) or str(id_notificacion)
+            response = await db.table("lecturas_notificaciones_globales").upsert(
+                {"id_notificacion_global": id_global, "id_usuario": id_usuario, "estado": estado},
+                on_conflict="id_notificacion_global,id_usuario"
+            ).execute()
+            if not response.data:
+                raise HTTPException(status_code=404, detail="Notificación global no encontrada para actualizar")
+            contador_no_leidas.invalidar(id_usuario)
+            return response.data[0]
+        except HTTPException as e:
+            # Re-lanzar excepciones HTTP conocidas
+            raise e
+        except Exception as e:
+            # Manejar errores en la actualización
+            raise HTTPException(status_code=500, detail=f"Error al actualizar notificación global: {str(e)}")
+
+    @staticmethod
+    async def eliminar_notificacion(id_notificacion: str):
         """
         Elimina una notificación por su ID.
         Remueve el registro de la base de datos.
         """
         try:
+            id_global = _id_global(id_notificacion)
+            if id_global is not None:
+                # Las lecturas asociadas se eliminan junto con la notificación global
+                # (los cursores de lectura guardan la posición, no dependen de ella)
+                await db.table("lecturas_notificaciones_globales").delete().eq("id_notificacion_global", id_global).execute()
+                response = await db.table("notificaciones_globales").delete().eq("id_notificacion_global", id_global).execute()
+                contador_no_leidas.invalidar()
+                return {"message": "Notificación eliminada correctamente"} if response.data else {"message": "No se encontró la notificación"}
+
             # Ejecutar eliminación
-            response = supabase.table("notificaciones").delete().eq("id_notificacion", id_notificacion).execute()
+            response = await db.table("notificaciones").delete().eq("id_notificacion", id_notificacion).execute()
+            if response.data:
+                contador_no_leidas.invalidar(response.data[0]["id_usuario"])
             # Retornar mensaje de confirmación
             return {"message": "Notificación eliminada correctamente"} if response.data else {"message": "No se encontró la notificación"}
         except Exception as e:
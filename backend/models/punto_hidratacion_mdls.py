@@ -3,9 +3,32 @@
 # backend/models/punto_hidratacion_mdls.py
 
 # Importaciones necesarias para el modelo de puntos de hidratación
-from backend.database.supabase_config import supabase
+from backend.database.supabase_config import db
 from fastapi import HTTPException
-from typing import Optional
+from typing import List, Optional
+from backend.services.indice_espacial import IndiceEspacial
+from backend.services.clusters_mapa import PiramideClusters
+from backend.services.cache_tablas import CacheTabla
+from backend.database import paginacion
+from backend.database.paginacion import ConfigPaginacion
+
+# Columnas consultables y ordenables de puntos_hidratacion
+PAGINACION_PUNTOS = ConfigPaginacion(
+    "puntos_hidratacion", "id_punto",
+    campos=("id_punto", "nombre", "descripcion", "latitud", "longitud", "estado", "validado_por", "fecha_registro"),
+    orden=("id_punto", "nombre", "fecha_registro"),
+)
+
+# Índice espacial en memoria de los puntos de hidratación activos
+indice_puntos = IndiceEspacial("id_punto")
+
+# Pirámide de clusters del mapa, alimentada por los cambios del índice
+piramide_puntos = PiramideClusters("id_punto")
+indice_puntos.suscribir(piramide_puntos)
+
+# Caché de las respuestas públicas de puntos de hidratación (listados y consultas por id);
+# se invalida con cada creación, actualización o eliminación
+cache_puntos = CacheTabla("puntos_hidratacion")
 
 # Clase principal para manejar puntos de hidratación
 class PuntoHidratacionModel:
@@ -15,8 +38,8 @@ class PuntoHidratacionModel:
     """
 
     @staticmethod
-    def crear_punto(nombre: str, descripcion: Optional[str], latitud: float, longitud: float,
-                    estado: str = "activa", validado_por: Optional[str] = None):
+    async def crear_punto(nombre: str, descripcion: Optional[str], latitud: float, longitud: float,
+                          estado: str = "activa", validado_por: Optional[str] = None):
         """
         Inserta un nuevo punto de hidratación en la base de datos.
         Crea el registro con los datos proporcionados.
@@ -34,7 +57,10 @@ class PuntoHidratacionModel:
             }
 
             # Ejecutar inserción en Supabase
-            response = supabase.table("puntos_hidratacion").insert(data).execute()
+            response = await db.table("puntos_hidratacion").insert(data).execute()
+            # Mantener el índice espacial y la caché al día
+            indice_puntos.sincronizar(response.data[0] if response.data else None)
+            cache_puntos.invalidar()
             # Retornar el punto creado
             return response.data[0] if response.data else None
 
@@ -43,36 +69,51 @@ class PuntoHidratacionModel:
             raise HTTPException(status_code=500, detail=f"Error al crear punto de hidratación: {str(e)}")
 
     @staticmethod
-    def listar_puntos(estado: Optional[str] = None):
+    async def crear_puntos(puntos: List[dict]) -> List[dict]:
         """
-        Obtiene todos los puntos de hidratación, con opción de filtrar por estado.
-        Si estado es None, retorna todos los puntos.
+        Crea varios puntos de hidratación con un solo INSERT (por ejemplo, al validar reportes por lote).
+        Retorna los puntos creados en el mismo orden.
         """
+        if not puntos:
+            return []
         try:
-            # Construir consulta base
-            query = supabase.table("puntos_hidratacion").select("*")
-
-            # Aplicar filtro de estado si se especifica
-            if estado is not None:
-                query = query.eq("estado", estado)
-
-            # Ejecutar consulta
-            response = query.execute()
+            response = await db.table("puntos_hidratacion").insert(puntos).execute()
+            # Mantener el índice espacial y la caché al día
+            for punto in response.data:
+                indice_puntos.sincronizar(punto)
+            cache_puntos.invalidar()
             return response.data
+        except Exception as e:
+            # Manejar errores en la creación
+            raise HTTPException(status_code=500, detail=f"Error al crear puntos de hidratación: {str(e)}")
 
+    @staticmethod
+    async def listar_puntos(estado: Optional[str] = None, limit: Optional[int] = None, cursor: Optional[str] = None,
+                            fields: Optional[str] = None, order_by: Optional[str] = None):
+        """
+        Obtiene una página de puntos de hidratación, con opción de filtrar por estado.
+        Si estado es None, incluye todos los puntos.
+        Retorna {"data": puntos, "next_cursor": cursor de la página siguiente o None}.
+        """
+        try:
+            return await paginacion.consultar(PAGINACION_PUNTOS, {"estado": estado}, limit, cursor, fields, order_by)
+
+        except HTTPException as e:
+            # Re-lanzar excepciones HTTP conocidas
+            raise e
         except Exception as e:
             # Manejar errores en la consulta
             raise HTTPException(status_code=500, detail=f"Error al listar puntos: {str(e)}")
 
     @staticmethod
-    def obtener_punto_por_id(id_punto: str):
+    async def obtener_punto_por_id(id_punto: str):
         """
         Obtiene un punto de hidratación específico por su ID.
         Busca en la base de datos y retorna el punto si existe.
         """
         try:
             # Consultar punto por ID
-            response = supabase.table("puntos_hidratacion")\
+            response = await db.table("puntos_hidratacion")\
                 .select("*").eq("id_punto", id_punto).execute()
 
             if not response.data:
@@ -85,18 +126,21 @@ class PuntoHidratacionModel:
             raise HTTPException(status_code=500, detail=f"Error al obtener punto: {str(e)}")
 
     @staticmethod
-    def actualizar_punto(id_punto: str, data: dict):
+    async def actualizar_punto(id_punto: str, data: dict):
         """
         Actualiza la información de un punto de hidratación.
         Modifica los campos especificados en el diccionario data.
         """
         try:
             # Ejecutar actualización
-            response = supabase.table("puntos_hidratacion")\
+            response = await db.table("puntos_hidratacion")\
                 .update(data).eq("id_punto", id_punto).execute()
 
             if not response.data:
                 raise HTTPException(status_code=404, detail="Punto no encontrado para actualizar")
+            # Mantener el índice espacial y la caché al día
+            indice_puntos.sincronizar(response.data[0])
+            cache_puntos.invalidar()
 
             return response.data[0]
 
@@ -105,14 +149,17 @@ class PuntoHidratacionModel:
             raise HTTPException(status_code=500, detail=f"Error al actualizar punto: {str(e)}")
 
     @staticmethod
-    def eliminar_punto(id_punto: str):
+    async def eliminar_punto(id_punto: str):
         """
         Elimina un punto de hidratación por su ID.
         Remueve el registro de la base de datos.
         """
         try:
             # Ejecutar eliminación
-            supabase.table("puntos_hidratacion").delete().eq("id_punto", id_punto).execute()
+            await db.table("puntos_hidratacion").delete().eq("id_punto", id_punto).execute()
+            # Mantener el índice espacial y la caché al día
+            indice_puntos.eliminar(id_punto)
+            cache_puntos.invalidar()
             # Retornar mensaje de confirmación
             return {"message": "Punto eliminado correctamente"}
 
@@ -120,4 +167,36 @@ class PuntoHidratacionModel:
             # Manejar errores en la eliminación
             raise HTTPException(status_code=500, detail=f"Error al eliminar punto: {str(e)}")
 
+    @staticmethod
+    async def buscar_cercanos(latitud: float, longitud: float, radio_km: float = 5.0, k: int = 10):
+        """
+        Retorna los k puntos de hidratación activos más cercanos dentro del radio indicado.
+        Usa el índice espacial en memoria; la tabla solo se consulta al cargarlo.
+        """
+        try:
+            await indice_puntos.asegurar_cargado(lambda: paginacion.listar_todo(PAGINACION_PUNTOS, {"estado": "activa"}))
+            return indice_puntos.cercanos(latitud, longitud, radio_km, k)
+        except HTTPException as e:
+            # Re-lanzar excepciones HTTP conocidas
+            raise e
+        except Exception as e:
+            # Manejar errores en la búsqueda
+            raise HTTPException(status_code=500, detail=f"Error al buscar puntos de hidratación cercanos: {str(e)}")
+
+    @staticmethod
+    async def marcadores_viewport(sur: float, oeste: float, norte: float, este: float, zoom: int):
+        """
+        Retorna los marcadores de los puntos de hidratación activos visibles en el viewport,
+        agrupados en clusters según el zoom.
+        """
+        try:
+            await indice_puntos.asegurar_cargado(lambda: paginacion.listar_todo(PAGINACION_PUNTOS, {"estado": "activa"}))
+            return piramide_puntos.viewport(sur, oeste, norte, este, zoom)
+        except HTTPException as e:
+            # Re-lanzar excepciones HTTP conocidas
+            raise e
+        except Exception as e:
+            # Manejar errores en la consulta
+            raise HTTPException(status_code=500, detail=f"Error al obtener marcadores de puntos de hidratación: {str(e)}")
+
 # Fin punto_hidratacion_mdls.py
@@ -3,9 +3,27 @@
 # backend/models/reportes_mdls.py
 
 # Importaciones necesarias para el modelo de reportes
-from backend.database.supabase_config import supabase
+import asyncio
+from backend.database.supabase_config import db
 from fastapi import HTTPException
-from typing import Optional
+from typing import Dict, List, Optional, Set, Tuple
+from backend.database import paginacion
+from backend.database.paginacion import ConfigPaginacion
+
+# Columnas consultables y ordenables de reportes
+PAGINACION_REPORTES = ConfigPaginacion(
+    "reportes", "id_reporte",
+    campos=("id_reporte", "id_usuario", "tipo", "nombre", "descripcion", "latitud", "longitud",
+            "tipo_zona_fresca", "estado", "fecha_reporte"),
+    orden=("id_reporte", "tipo", "estado", "fecha_reporte"),
+    orden_por_defecto="-fecha_reporte",
+)
+
+# Ids por consulta en las operaciones por lote (el filtro in.(...) viaja en la URL)
+TAMANO_LOTE_IDS = 200
+
+def _tandas(ids: List[str]) -> List[List[str]]:
+    return [ids[i:i + TAMANO_LOTE_IDS] for i in range(0, len(ids), TAMANO_LOTE_IDS)]
 
 # Clase principal para manejar reportes
 class ReporteModel:
@@ -15,7 +33,7 @@ class ReporteModel:
     """
 
     @staticmethod
-    def crear_reporte(
+    async def crear_reporte(
         id_usuario: str,
         tipo: str,
         nombre: Optional[str] = None,
@@ -54,7 +72,7 @@ class ReporteModel:
                 data["tipo_zona_fresca"] = None
 
             # Ejecutar inserción en Supabase
-            response = supabase.table("reportes").insert(data).execute()
+            response = await db.table("reportes").insert(data).execute()
             # Retornar el reporte creado
             return response.data[0] if response.data else None
 
@@ -63,44 +81,40 @@ class ReporteModel:
             raise HTTPException(status_code=500, detail=f"Error al crear reporte: {str(e)}")
 
     @staticmethod
-    def listar_reportes(
+    async def listar_reportes(
         id_usuario: Optional[str] = None,
         tipo: Optional[str] = None,
-        estado: Optional[str] = None
+        estado: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None,
+        order_by: Optional[str] = None
     ):
         """
-        Lista reportes con filtros opcionales por usuario, tipo y estado.
-        Permite filtrar la lista de reportes según criterios específicos.
+        Lista una página de reportes con filtros opcionales por usuario, tipo y estado.
+        Retorna {"data": reportes, "next_cursor": cursor de la página siguiente o None}.
         """
         try:
-            # Construir consulta base
-            query = supabase.table("reportes").select("*")
-
             # Aplicar filtros opcionales
-            if id_usuario:
-                query = query.eq("id_usuario", id_usuario)
-            if tipo:
-                query = query.eq("tipo", tipo)
-            if estado:
-                query = query.eq("estado", estado)
-
-            # Ejecutar consulta
-            response = query.execute()
-            return response.data
+            filtros = {"id_usuario": id_usuario or None, "tipo": tipo or None, "estado": estado or None}
+            return await paginacion.consultar(PAGINACION_REPORTES, filtros, limit, cursor, fields, order_by)
 
+        except HTTPException as e:
+            # Re-lanzar excepciones HTTP conocidas
+            raise e
         except Exception as e:
             # Manejar errores en la consulta
             raise HTTPException(status_code=500, detail=f"Error al listar reportes: {str(e)}")
 
     @staticmethod
-    def obtener_reporte_por_id(id_reporte: str):
+    async def obtener_reporte_por_id(id_reporte: str):
         """
         Obtiene un reporte específico por su ID.
         Busca en la base de datos y retorna el reporte si existe.
         """
         try:
             # Consultar reporte por ID
-            response = supabase.table("reportes").select("*").eq("id_reporte", id_reporte).execute()
+            response = await db.table("reportes").select("*").eq("id_reporte", id_reporte).execute()
 
             if not response.data:
                 raise HTTPException(status_code=404, detail="Reporte no encontrado")
@@ -112,14 +126,14 @@ class ReporteModel:
             raise HTTPException(status_code=500, detail=f"Error al obtener reporte: {str(e)}")
 
     @staticmethod
-    def actualizar_reporte(id_reporte: str, data: dict):
+    async def actualizar_reporte(id_reporte: str, data: dict):
         """
         Actualiza un reporte existente con los datos proporcionados.
         Solo los campos incluidos en 'data' serán actualizados.
         """
         try:
             # Ejecutar actualización
-            response = supabase.table("reportes").update(data).eq("id_reporte", id_reporte).execute()
+            response = await db.table("reportes").update(data).eq("id_reporte", id_reporte).execute()
 
             if not response.data:
                 raise HTTPException(status_code=404, detail="Reporte no encontrado para actualizar")
@@ -131,14 +145,14 @@ class ReporteModel:
             raise HTTPException(status_code=500, detail=f"Error al actualizar reporte: {str(e)}")
 
     @staticmethod
-    def eliminar_reporte(id_reporte: str):
+    async def eliminar_reporte(id_reporte: str):
         """
         Elimina un reporte por su ID.
         Remueve el registro de la base de datos.
         """
         try:
             # Ejecutar eliminación
-            response = supabase.table("reportes").delete().eq("id_reporte", id_reporte).execute()
+            response = await db.table("reportes").delete().eq("id_reporte", id_reporte).execute()
             # Retornar mensaje de confirmación
             return {"message": "Reporte eliminado correctamente"} if response.data else {"message": "No se encontró el reporte"}
 
@@ -146,4 +160,43 @@ class ReporteModel:
             # Manejar errores en la eliminación
             raise HTTPException(status_code=500, detail=f"Error al eliminar reporte: {str(e)}")
 
+    @staticmethod
+    async def obtener_reportes_por_ids(ids: List[str]) -> Dict[str, dict]:
+        """
+        Obtiene varios reportes por id, en consultas de hasta TAMANO_LOTE_IDS ids
+        que se ejecutan a la vez. Retorna {id_reporte: reporte}; los que no existen no aparecen.
+        """
+        try:
+            respuestas = await asyncio.gather(*(
+                db.table("reportes").select("*").in_("id_reporte", tanda).execute() for tanda in _tandas(ids)
+            ))
+            return {str(r["id_reporte"]): r for respuesta in respuestas for r in respuesta.data}
+        except Exception as e:
+            # Manejar errores en la consulta
+            raise HTTPException(status_code=500, detail=f"Error al obtener reportes: {str(e)}")
+
+    @staticmethod
+    async def eliminar_reportes(ids: List[str]) -> Tuple[Set[str], Dict[str, str]]:
+        """
+        Elimina varios reportes por id, en tandas de hasta TAMANO_LOTE_IDS ids.
+        Una tanda que falla no afecta a las demás.
+        Retorna (ids eliminados, {id: error} de los ids de las tandas que fallaron).
+        """
+        try:
+            tandas = _tandas(ids)
+            respuestas = await asyncio.gather(*(
+                db.table("reportes").delete().in_("id_reporte", tanda).execute() for tanda in tandas
+            ), return_exceptions=True)
+            eliminados, fallidos = set(), {}
+            for tanda, respuesta in zip(tandas, respuestas):
+                if isinstance(respuesta, Exception):
+                    detalle = f"Error al eliminar reportes: {str(respuesta)}"
+                    fallidos.update((str(i), detalle) for i in tanda)
+                else:
+                    eliminados.update(str(r["id_reporte"]) for r in respuesta.data)
+            return eliminados, fallidos
+        except Exception as e:
+            # Manejar errores en la eliminación
+            raise HTTPException(status_code=500, detail=f"Error al eliminar reportes: {str(e)}")
+
 # Fin reportes_mdls.py
@@ -3,11 +3,58 @@
 # backend/models/usuarios_mdls.py
 
 # Importaciones necesarias para el modelo de usuarios
-from backend.app.security.hashing import verify_password
-from backend.app.security.jwt_handler import crear_token
-from backend.database.supabase_config import supabase
+from backend.app.security.servicio_passwords import ServicioPasswords
+from backend.app.security.jwt_handler import (
+    ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS, REFRESH_TOKEN_GRACIA_SEGUNDOS, crear_token,
+    nuevo_refresh_token, separar_refresh_token, siguiente_refresh_token,
+)
+from backend.database.supabase_config import db
 from fastapi import HTTPException
+from postgrest.exceptions import APIError
 from typing import Optional
+import os
+import time
+from backend.database import paginacion
+from backend.database.paginacion import ConfigPaginacion
+from backend.database.sesiones import crear_almacen_sesiones
+from backend.services.cache_tablas import CacheTabla, RespuestaCacheada
+from backend.services.directorio_correos import DirectorioCorreos
+
+# Columnas consultables y ordenables de usuarios (la contraseña nunca se expone)
+PAGINACION_USUARIOS = ConfigPaginacion(
+    "usuarios", "id_usuario",
+    campos=("id_usuario", "nombre", "correo", "telefono", "rol", "fecha_registro"),
+    orden=("id_usuario", "nombre", "correo", "rol", "fecha_registro"),
+)
+
+# Columnas que se leen para iniciar sesión y verificar si un correo está registrado
+CAMPOS_CREDENCIALES = "id_usuario, correo, rol, password"
+
+# Columnas con las que se carga el filtro de correos registrados
+PAGINACION_CORREOS = ConfigPaginacion(
+    "usuarios", "id_usuario",
+    campos=("id_usuario", "correo", "fecha_registro"),
+    orden=("id_usuario",),
+)
+
+async def _cargar_correos():
+    return await paginacion.listar_todo(PAGINACION_CORREOS, cliente=db)
+
+async def _cargar_correos_desde(fecha_registro: str):
+    response = await db.table("usuarios").select("correo, fecha_registro").gte("fecha_registro", fecha_registro).execute()
+    return response.data
+
+# Credenciales en caché y filtro de Bloom de los correos registrados
+directorio_correos = DirectorioCorreos(
+    _cargar_correos, _cargar_correos_desde,
+    ttl=float(os.getenv("CALORSOS_TTL_CREDENCIALES", "5")),
+)
+
+# Perfiles ya serializados por usuario (se descartan al actualizar o eliminar el usuario)
+cache_perfiles = CacheTabla("perfiles_usuarios", capacidad=4096, vigencia=60)
+
+# Sesiones de los refresh tokens (memoria o Supabase, según CALORSOS_SESIONES)
+almacen_sesiones = crear_almacen_sesiones()
 
 # Clase principal para manejar usuarios
 class UsuarioModel:
@@ -17,7 +64,7 @@ class UsuarioModel:
     """
 
     @staticmethod
-    def crear_usuario(nombre: str, correo: str, password: str, telefono: Optional[str] = None, rol: str = "usuario"):
+    async def crear_usuario(nombre: str, correo: str, password: str, telefono: Optional[str] = None, rol: str = "usuario"):
         """
         Crea un nuevo usuario en la base de datos.
         Almacena la contraseña cifrada y otros datos del usuario.
@@ -32,83 +79,134 @@ class UsuarioModel:
                 "password": password  # Se almacena el hash, no el texto plano
             }
             # Ejecutar inserción en Supabase
-            response = supabase.table("usuarios").insert(data).execute()
+            response = await db.table("usuarios").insert(data).execute()
             if not response.data:
                 raise HTTPException(status_code=400, detail="No se pudo crear el usuario")
+            directorio_correos.registrar(response.data[0])
             return response.data[0]
+        except HTTPException as e:
+            # Re-lanzar excepciones HTTP conocidas
+            raise e
+        except APIError as e:
+            # Otro registro con el mismo correo se insertó primero (índice único en correo)
+            if e.code == "23505":
+                raise HTTPException(status_code=400, detail="El correo ya está registrado")
+            raise HTTPException(status_code=500, detail=f"Error al crear usuario: {str(e)}")
         except Exception as e:
             # Manejar errores en la creación
             raise HTTPException(status_code=500, detail=f"Error al crear usuario: {str(e)}")
 
     @staticmethod
-    def obtener_usuario_por_id(id_usuario: str):
+    async def obtener_usuario_por_id(id_usuario: str):
         """
         Obtiene un usuario específico por su ID.
         Busca en la base de datos y retorna el usuario si existe.
         """
         try:
             # Consultar usuario por ID
-            response = supabase.table("usuarios").select("*").eq("id_usuario", id_usuario).execute()
+            response = await db.table("usuarios").select("*").eq("id_usuario", id_usuario).execute()
             if not response.data:
                 raise HTTPException(status_code=404, detail="Usuario no encontrado")
             return response.data[0]
+        except HTTPException as e:
+            # Re-lanzar excepciones HTTP conocidas
+            raise e
         except Exception as e:
             # Manejar errores en la consulta
             raise HTTPException(status_code=500, detail=f"Error al obtener usuario: {str(e)}")
 
     @staticmethod
-    def obtener_usuario_por_correo(correo: str):
+    async def obtener_usuario_por_correo(correo: str):
         """
         Busca un usuario por su correo electrónico.
         Útil para procesos de login y verificación de existencia.
         """
         try:
             # Consultar usuario por correo
-            response = supabase.table("usuarios").select("*").eq("correo", correo).execute()
+            response = await db.table("usuarios").select("*").eq("correo", correo).execute()
             return response.data[0] if response.data else None
         except Exception as e:
             # Manejar errores en la consulta
             raise HTTPException(status_code=500, detail=f"Error al obtener usuario por correo: {str(e)}")
 
     @staticmethod
-    def listar_usuarios():
+    async def obtener_credenciales(correo: str, fresco: bool = False):
         """
-        Lista todos los usuarios registrados en la base de datos.
-        Retorna una lista completa de usuarios.
+        Obtiene id_usuario, correo, rol y password del usuario con ese correo, o None.
+        Los correos que el filtro descarta no consultan la base de datos y los
+        encontrados se guardan unos segundos (ver DirectorioCorreos); con fresco=True
+        no se usa lo guardado.
         """
+        async def consultar(correo: str):
+            response = await db.table("usuarios").select(CAMPOS_CREDENCIALES).eq("correo", correo).limit(1).execute()
+            return response.data[0] if response.data else None
+
         try:
-            # Consultar todos los usuarios
-            response = supabase.table("usuarios").select("*").execute()
-            return response.data
+            return await directorio_correos.obtener(correo, consultar, usar_cache=not fresco)
+        except Exception as e:
+            # Manejar errores en la consulta
+            raise HTTPException(status_code=500, detail=f"Error al obtener credenciales: {str(e)}")
+
+    @staticmethod
+    async def listar_usuarios(limit: Optional[int] = None, cursor: Optional[str] = None,
+                              fields: Optional[str] = None, order_by: Optional[str] = None):
+        """
+        Lista una página de usuarios registrados, sin contraseñas.
+        Retorna {"data": usuarios, "next_cursor": cursor de la página siguiente o None}.
+        """
+        try:
+            return await paginacion.consultar(PAGINACION_USUARIOS, None, limit, cursor, fields, order_by)
+        except HTTPException as e:
+            # Re-lanzar excepciones HTTP conocidas
+            raise e
         except Exception as e:
             # Manejar errores en la consulta
             raise HTTPException(status_code=500, detail=f"Error al listar usuarios: {str(e)}")
 
     @staticmethod
-    def actualizar_usuario(id_usuario: str, data: dict):
+    async def actualizar_usuario(id_usuario: str, data: dict):
         """
         Actualiza la información de un usuario existente.
         Modifica los campos especificados en el diccionario data.
         """
         try:
             # Ejecutar actualización
-            response = supabase.table("usuarios").update(data).eq("id_usuario", id_usuario).execute()
+            response = await db.table("usuarios").update(data).eq("id_usuario", id_usuario).execute()
             if not response.data:
                 raise HTTPException(status_code=404, detail="Usuario no encontrado para actualizar")
+            directorio_correos.registrar(response.data[0])
+            cache_perfiles.descartar(str(id_usuario))
             return response.data[0]
         except Exception as e:
             # Manejar errores en la actualización
             raise HTTPException(status_code=500, detail=f"Error al actualizar usuario: {str(e)}")
 
     @staticmethod
-    def eliminar_usuario(id_usuario: str):
+    async def reemplazar_hash_password(id_usuario: str, hash_anterior: str, hash_nuevo: str):
+        """
+        Reemplaza el hash de la contraseña recalculado con el costo actual de bcrypt.
+        Solo actualiza si el hash guardado sigue siendo 'hash_anterior', para no
+        pisar un cambio de contraseña concurrente. Un fallo no interrumpe el inicio de sesión.
+        """
+        try:
+            await db.table("usuarios").update({"password": hash_nuevo}) \
+                .eq("id_usuario", id_usuario).eq("password", hash_anterior).execute()
+            directorio_correos.olvidar(id_usuario)
+        except Exception as e:
+            print(f"No se pudo actualizar el hash de la contraseña del usuario {id_usuario}: {e}")
+
+    @staticmethod
+    async def eliminar_usuario(id_usuario: str):
         """
         Elimina un usuario por su ID.
         Remueve el registro de la base de datos.
         """
         try:
             # Ejecutar eliminación
-            response = supabase.table("usuarios").delete().eq("id_usuario", id_usuario).execute()
+            response = await db.table("usuarios").delete().eq("id_usuario", id_usuario).execute()
+            directorio_correos.olvidar(id_usuario)
+            cache_perfiles.descartar(str(id_usuario))
+            await almacen_sesiones.revocar_usuario(id_usuario)
             if not response.data:
                 return {"message": "No se encontró el usuario"}
             return {"message": "Usuario eliminado correctamente"}
@@ -117,23 +215,125 @@ class UsuarioModel:
             raise HTTPException(status_code=500, detail=f"Error al eliminar usuario: {str(e)}")
 
     @staticmethod
-    def autenticar_usuario(correo: str, password: str):
+    async def obtener_perfil(id_usuario: str) -> RespuestaCacheada:
+        """
+        Perfil del usuario (sin contraseña) como respuesta de GET /usuarios/perfil,
+        ya serializado. Se lee de la base de datos solo la primera vez y tras
+        actualizar el usuario.
+        """
+        async def cargar():
+            usuario = await UsuarioModel.obtener_usuario_por_id(id_usuario)
+            return {
+                "status": "success",
+                "usuario_actual": {
+                    "id_usuario": usuario["id_usuario"],
+                    "nombre": usuario["nombre"],
+                    "correo": usuario["correo"],
+                    "telefono": usuario.get("telefono"),
+                    "rol": usuario["rol"],
+                    "fecha_registro": usuario.get("fecha_registro"),
+                },
+            }
+
+        return await cache_perfiles.obtener(str(id_usuario), cargar)
+
+    @staticmethod
+    def _tokens(usuario: dict, refresh_token: str) -> dict:
+        token = crear_token({"id_usuario": usuario["id_usuario"], "correo": usuario["correo"], "rol": usuario["rol"]})
+        return {
+            "access_token": token,
+            "refresh_token": refresh_token,
+            "token_type": "bearer",
+            "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        }
+
+    @staticmethod
+    async def iniciar_sesion(usuario: dict) -> dict:
+        """
+        Crea una sesión para el usuario ya autenticado y retorna su access token y refresh token.
+        """
+        try:
+            id_sesion, refresh_token, hash_token = nuevo_refresh_token()
+            await almacen_sesiones.crear(id_sesion, usuario["id_usuario"], hash_token,
+                                         time.time() + REFRESH_TOKEN_EXPIRE_DAYS * 86400)
+            return UsuarioModel._tokens(usuario, refresh_token)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error al iniciar sesión: {str(e)}")
+
+    @staticmethod
+    async def renovar_sesion(refresh_token: str) -> dict:
+        """
+        Cambia un refresh token vigente por uno nuevo y un access token nuevo, sin
+        bcrypt ni lecturas de la tabla de usuarios (los datos salen del perfil en caché).
+        Un refresh token ya usado invalida la sesión completa: si se filtró, quien lo
+        robó y el usuario legítimo deben volver a iniciar sesión. La excepción son las
+        renovaciones simultáneas (varias pestañas): durante unos segundos tras la
+        rotación, el token anterior vuelve a recibir el mismo reemplazo.
+        """
+        id_sesion, hash_token = separar_refresh_token(refresh_token)
+        try:
+            _, nuevo_token, nuevo_hash = siguiente_refresh_token(refresh_token)
+            id_usuario = await almacen_sesiones.rotar(id_sesion, hash_token, nuevo_hash,
+                                                      time.time() + REFRESH_TOKEN_EXPIRE_DAYS * 86400,
+                                                      REFRESH_TOKEN_GRACIA_SEGUNDOS)
+            if id_usuario is None:
+                await almacen_sesiones.revocar(id_sesion)
+                raise HTTPException(status_code=401, detail="Refresh token inválido o expirado")
+            try:
+                perfil = (await UsuarioModel.obtener_perfil(id_usuario)).datos["usuario_actual"]
+            except HTTPException as e:
+                if e.status_code != 404:
+                    raise e
+                # El usuario ya no existe: la sesión no continúa
+                await almacen_sesiones.revocar(id_sesion)
+                raise HTTPException(status_code=401, detail="Refresh token inválido o expirado")
+            return UsuarioModel._tokens(perfil, nuevo_token)
+        except HTTPException as e:
+            raise e
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error al renovar la sesión: {str(e)}")
+
+    @staticmethod
+    async def cerrar_sesion(refresh_token: str):
+        """
+        Revoca la sesión de un refresh token (cierre de sesión en un dispositivo).
+        """
+        id_sesion, _ = separar_refresh_token(refresh_token)
+        try:
+            await almacen_sesiones.revocar(id_sesion)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error al cerrar sesión: {str(e)}")
+
+    @staticmethod
+    async def cerrar_sesiones_usuario(id_usuario: str):
+        """
+        Revoca todas las sesiones del usuario (por ejemplo, al cambiar la contraseña).
+        """
+        try:
+            await almacen_sesiones.revocar_usuario(id_usuario)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error al cerrar las sesiones: {str(e)}")
+
+    @staticmethod
+    async def autenticar_usuario(correo: str, password: str):
         """
         Verifica las credenciales del usuario y genera un token JWT si son válidas.
         Compara la contraseña proporcionada con el hash almacenado.
         """
         try:
-            # Buscar usuario por correo
-            response = supabase.table("usuarios").select("*").eq("correo", correo).execute()
-            if not response.data:
+            # Buscar las credenciales del usuario por correo
+            usuario = await UsuarioModel.obtener_credenciales(correo)
+            if not usuario:
                 raise HTTPException(status_code=404, detail="Usuario no encontrado")
 
-            usuario = response.data[0]
             hashed_password = usuario.get("password")
 
-            # Verificar contraseña
-            if not verify_password(password, hashed_password):
+            # Verificar contraseña (bcrypt es costoso: se ejecuta en el pool de procesos)
+            valido, nuevo_hash = await ServicioPasswords.verificar(password, hashed_password)
+            if not valido:
                 raise HTTPException(status_code=401, detail="Contraseña incorrecta")
+            if nuevo_hash is not None:
+                await UsuarioModel.reemplazar_hash_password(usuario["id_usuario"], hashed_password, nuevo_hash)
 
             # Generar token JWT
             token = crear_token({"id_usuario": usuario["id_usuario"], "correo": usuario["correo"], "rol": usuario["rol"]})
@@ -141,6 +341,9 @@ class UsuarioModel:
             # Retornar token y datos del usuario
             return {"access_token": token, "token_type": "bearer", "usuario": usuario}
 
+        except HTTPException as e:
+            # Re-lanzar excepciones HTTP conocidas (401, 404, 503)
+            raise e
         except Exception as e:
             # Manejar errores en la autenticación
             raise HTTPException(status_code=500, detail=f"Error en autenticación: {str(e)}")
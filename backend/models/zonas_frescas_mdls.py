@@ -3,9 +3,32 @@
 # backend/models/zonas_frescas_mdls.py
 
 # Importaciones necesarias para el modelo de zonas frescas
-from backend.database.supabase_config import supabase
+from backend.database.supabase_config import db
 from fastapi import HTTPException
-from typing import Optional
+from typing import List, Optional
+from backend.services.indice_espacial import IndiceEspacial
+from backend.services.clusters_mapa import PiramideClusters
+from backend.services.cache_tablas import CacheTabla
+from backend.database import paginacion
+from backend.database.paginacion import ConfigPaginacion
+
+# Columnas consultables y ordenables de zonas_frescas
+PAGINACION_ZONAS = ConfigPaginacion(
+    "zonas_frescas", "id_zona",
+    campos=("id_zona", "nombre", "descripcion", "latitud", "longitud", "tipo", "estado", "validado_por", "fecha_registro"),
+    orden=("id_zona", "nombre", "tipo", "fecha_registro"),
+)
+
+# Índice espacial en memoria de las zonas frescas activas
+indice_zonas = IndiceEspacial("id_zona")
+
+# Pirámide de clusters del mapa, alimentada por los cambios del índice
+piramide_zonas = PiramideClusters("id_zona")
+indice_zonas.suscribir(piramide_zonas)
+
+# Caché de las respuestas públicas de zonas frescas (listados y consultas por id);
+# se invalida con cada creación, actualización o eliminación
+cache_zonas = CacheTabla("zonas_frescas")
 
 # Clase principal para manejar zonas frescas
 class ZonaFrescaModel:
@@ -15,7 +38,7 @@ class ZonaFrescaModel:
     """
 
     @staticmethod
-    def crear_zona(nombre: str, descripcion: Optional[str], latitud: float, longitud: float, tipo: str = "urbana", estado: str = "activa", validado_por: Optional[str] = None):
+    async def crear_zona(nombre: str, descripcion: Optional[str], latitud: float, longitud: float, tipo: str = "urbana", estado: str = "activa", validado_por: Optional[str] = None):
         """
         Crea una nueva zona fresca en la base de datos.
         Inserta los datos de la zona con coordenadas y tipo especificado.
@@ -32,7 +55,10 @@ class ZonaFrescaModel:
                 "validado_por": validado_por
             }
             # Ejecutar inserción en Supabase
-            response = supabase.table("zonas_frescas").insert(data).execute()
+            response = await db.table("zonas_frescas").insert(data).execute()
+            # Mantener el índice espacial y la caché al día
+            indice_zonas.sincronizar(response.data[0] if response.data else None)
+            cache_zonas.invalidar()
             # Retornar la zona creada
             return response.data[0] if response.data else None
         except Exception as e:
@@ -40,33 +66,50 @@ class ZonaFrescaModel:
             raise HTTPException(status_code=500, detail=f"Error al crear zona fresca: {str(e)}")
 
     @staticmethod
-    def listar_zonas(estado: Optional[str] = None):
+    async def crear_zonas(zonas: List[dict]) -> List[dict]:
         """
-        Lista todas las zonas frescas, con opción de filtrar por estado.
-        Si estado es None, retorna todas las zonas.
+        Crea varias zonas frescas con un solo INSERT (por ejemplo, al validar reportes por lote).
+        Retorna las zonas creadas en el mismo orden.
         """
+        if not zonas:
+            return []
         try:
-            # Construir consulta base
-            query = supabase.table("zonas_frescas").select("*")
-            # Aplicar filtro de estado si se especifica
-            if estado is not None:
-                query = query.eq("estado", estado)
-            # Ejecutar consulta
-            response = query.execute()
+            response = await db.table("zonas_frescas").insert(zonas).execute()
+            # Mantener el índice espacial y la caché al día
+            for zona in response.data:
+                indice_zonas.sincronizar(zona)
+            cache_zonas.invalidar()
             return response.data
+        except Exception as e:
+            # Manejar errores en la creación
+            raise HTTPException(status_code=500, detail=f"Error al crear zonas frescas: {str(e)}")
+
+    @staticmethod
+    async def listar_zonas(estado: Optional[str] = None, limit: Optional[int] = None, cursor: Optional[str] = None,
+                           fields: Optional[str] = None, order_by: Optional[str] = None):
+        """
+        Lista una página de zonas frescas, con opción de filtrar por estado.
+        Si estado es None, incluye todas las zonas.
+        Retorna {"data": zonas, "next_cursor": cursor de la página siguiente o None}.
+        """
+        try:
+            return await paginacion.consultar(PAGINACION_ZONAS, {"estado": estado}, limit, cursor, fields, order_by)
+        except HTTPException as e:
+            # Re-lanzar excepciones HTTP conocidas
+            raise e
         except Exception as e:
             # Manejar errores en la consulta
             raise HTTPException(status_code=500, detail=f"Error al listar zonas: {str(e)}")
 
     @staticmethod
-    def obtener_zona_por_id(id_zona: str):
+    async def obtener_zona_por_id(id_zona: str):
         """
         Obtiene una zona fresca específica por su ID.
         Busca en la base de datos y retorna la zona si existe.
         """
         try:
             # Consultar zona por ID
-            response = supabase.table("zonas_frescas").select("*").eq("id_zona", id_zona).execute()
+            response = await db.table("zonas_frescas").select("*").eq("id_zona", id_zona).execute()
             if not response.data:
                 raise HTTPException(status_code=404, detail="Zona fresca no encontrada")
             return response.data[0]
@@ -75,34 +118,72 @@ class ZonaFrescaModel:
             raise HTTPException(status_code=500, detail=f"Error al obtener zona: {str(e)}")
 
     @staticmethod
-    def actualizar_zona(id_zona: str, data: dict):
+    async def actualizar_zona(id_zona: str, data: dict):
         """
         Actualiza la información de una zona fresca.
         Modifica los campos especificados en el diccionario data.
         """
         try:
             # Ejecutar actualización
-            response = supabase.table("zonas_frescas").update(data).eq("id_zona", id_zona).execute()
+            response = await db.table("zonas_frescas").update(data).eq("id_zona", id_zona).execute()
             if not response.data:
                 raise HTTPException(status_code=404, detail="Zona no encontrada para actualizar")
+            # Mantener el índice espacial y la caché al día
+            indice_zonas.sincronizar(response.data[0])
+            cache_zonas.invalidar()
             return response.data[0]
         except Exception as e:
             # Manejar errores en la actualización
             raise HTTPException(status_code=500, detail=f"Error al actualizar zona: {str(e)}")
 
     @staticmethod
-    def eliminar_zona(id_zona: str):
+    async def eliminar_zona(id_zona: str):
         """
         Elimina una zona fresca por su ID.
         Remueve el registro de la base de datos.
         """
         try:
             # Ejecutar eliminación
-            response = supabase.table("zonas_frescas").delete().eq("id_zona", id_zona).execute()
+            response = await db.table("zonas_frescas").delete().eq("id_zona", id_zona).execute()
+            # Mantener el índice espacial y la caché al día
+            indice_zonas.eliminar(id_zona)
+            cache_zonas.invalidar()
             # Retornar mensaje de confirmación
             return {"message": "Zona eliminada correctamente"} if response.data else {"message": "No se encontró la zona"}
         except Exception as e:
             # Manejar errores en la eliminación
             raise HTTPException(status_code=500, detail=f"Error al eliminar zona: {str(e)}")
 
+    @staticmethod
+    async def buscar_cercanas(latitud: float, longitud: float, radio_km: float = 5.0, k: int = 10):
+        """
+        Retorna las k zonas frescas activas más cercanas dentro del radio indicado.
+        Usa el índice espacial en memoria; la tabla solo se consulta al cargarlo.
+        """
+        try:
+            await indice_zonas.asegurar_cargado(lambda: paginacion.listar_todo(PAGINACION_ZONAS, {"estado": "activa"}))
+            return indice_zonas.cercanos(latitud, longitud, radio_km, k)
+        except HTTPException as e:
+            # Re-lanzar excepciones HTTP conocidas
+            raise e
+        except Exception as e:
+            # Manejar errores en la búsqueda
+            raise HTTPException(status_code=500, detail=f"Error al buscar zonas frescas cercanas: {str(e)}")
+
+    @staticmethod
+    async def marcadores_viewport(sur: float, oeste: float, norte: float, este: float, zoom: int):
+        """
+        Retorna los marcadores de las zonas frescas activas visibles en el viewport,
+        agrupados en clusters según el zoom.
+        """
+        try:
+            await indice_zonas.asegurar_cargado(lambda: paginacion.listar_todo(PAGINACION_ZONAS, {"estado": "activa"}))
+            return piramide_zonas.viewport(sur, oeste, norte, este, zoom)
+        except HTTPException as e:
+            # Re-lanzar excepciones HTTP conocidas
+            raise e
+        except Exception as e:
+            # Manejar errores en la consulta
+            raise HTTPException(status_code=500, detail=f"Error al obtener marcadores de zonas frescas: {str(e)}")
+
 # Fin zonas_frescas_mdls.py
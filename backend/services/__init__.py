@@ -0,0 +1,7 @@
+# Inicio __init__.py
+
+# backend/services/__init__.py
+
+# Archivo de inicialización del módulo services
+
+# Fin __init__.py
@@ -0,0 +1,100 @@
+# Inicio alerta_vigente.py
+
+# backend/services/alerta_vigente.py
+
+# Importaciones necesarias para el servicio de alerta vigente
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from typing import Awaitable, Callable, Optional, Tuple
+
+
+# Clase principal del servicio de alerta vigente
+class AlertaVigente:
+    """
+    Mantiene en memoria la alerta activa más reciente junto con su ETag.
+    Se actualiza en cada creación o eliminación de alertas; si no hay valor
+    (arranque en frío, alerta eliminada o vigencia vencida) se consulta una sola
+    fila ordenada por fecha, una sola vez aunque la pidan muchas peticiones a la
+    vez. La vigencia hace converger procesos que no vieron la creación de una
+    alerta (por ejemplo, el worker del scheduler).
+    """
+
+    def __init__(self, vigencia: float = 60):
+        self.vigencia = vigencia
+        self._alerta: Optional[dict] = None
+        self._etag = ""
+        self._cargada_en: Optional[float] = None
+        self._lock = threading.Lock()
+        # Cambia con cada alta, retiro o invalidación: una consulta iniciada
+        # antes queda obsoleta y no se guarda ni se comparte
+        self._version = 0
+        self._en_vuelo: Optional[Tuple[int, asyncio.Task]] = None
+
+    @staticmethod
+    def _calcular_etag(alerta: Optional[dict]) -> str:
+        contenido = json.dumps(alerta, sort_keys=True, default=str).encode()
+        return f'"{hashlib.sha1(contenido).hexdigest()[:20]}"'
+
+    def _guardar(self, alerta: Optional[dict]):
+        self._alerta = alerta
+        self._etag = self._calcular_etag(alerta)
+        self._cargada_en = time.monotonic()
+
+    async def obtener(self, cargar: Callable[[], Awaitable[Optional[dict]]]) -> Tuple[Optional[dict], str]:
+        """
+        Retorna (alerta, etag). 'cargar' (asíncrona) solo se invoca si no hay un valor vigente.
+        """
+        cargada_en = self._cargada_en
+        if cargada_en is None or time.monotonic() - cargada_en > self.vigencia:
+            en_vuelo = self._en_vuelo
+            if en_vuelo is None or en_vuelo[0] != self._version:
+                en_vuelo = (self._version, asyncio.ensure_future(self._cargar(self._version, cargar)))
+                self._en_vuelo = en_vuelo
+            # shield: si un cliente se desconecta, la consulta sigue para los demás
+            return await asyncio.shield(en_vuelo[1])
+        return self._alerta, self._etag
+
+    async def _cargar(self, version: int, cargar: Callable[[], Awaitable[Optional[dict]]]) -> Tuple[Optional[dict], str]:
+        try:
+            alerta = await cargar()
+            with self._lock:
+                # Una alerta registrada o retirada mientras se consultaba tiene prioridad
+                if self._version == version:
+                    self._guardar(alerta)
+                return self._alerta, self._etag
+        finally:
+            if self._en_vuelo is not None and self._en_vuelo[0] == version:
+                self._en_vuelo = None
+
+    def registrar(self, alerta: Optional[dict]):
+        """
+        Refleja una alerta recién creada si está activa y es la más reciente.
+        """
+        if not alerta or alerta.get("estado") != "activa":
+            return
+        with self._lock:
+            actual = self._alerta
+            if self._cargada_en is None or actual is None \
+                    or str(alerta.get("fecha_alerta") or "") >= str(actual.get("fecha_alerta") or ""):
+                self._version += 1
+                self._guardar(alerta)
+
+    def retirar(self, id_alerta):
+        """
+        Si la alerta eliminada era la vigente, fuerza consultar la siguiente.
+        """
+        with self._lock:
+            if self._alerta is not None and str(self._alerta.get("id_alerta")) == str(id_alerta):
+                self._version += 1
+                self._alerta = None
+                self._cargada_en = None
+
+    def invalidar(self):
+        with self._lock:
+            self._version += 1
+            self._cargada_en = None
+
+# Fin alerta_vigente.py
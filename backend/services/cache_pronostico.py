@@ -0,0 +1,173 @@
+# Inicio cache_pronostico.py
+
+# backend/services/cache_pronostico.py
+
+# Importaciones necesarias para la caché de pronósticos
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Set
+
+
+class _Entrada:
+    """
+    Pronóstico almacenado en memoria junto con el instante en que se obtuvo.
+    """
+    __slots__ = ("datos", "obtenido_en")
+
+    def __init__(self, datos: Any, obtenido_en: float):
+        self.datos = datos
+        self.obtenido_en = obtenido_en
+
+
+# Clase principal de la caché de pronósticos
+class CachePronostico:
+    """
+    Caché TTL en memoria para pronósticos completos de Open-Meteo.
+    Cada clave (celda, variables) guarda los arreglos horarios completos una vez
+    por ventana de refresco. Los fallos concurrentes comparten una única descarga
+    (single-flight), varias claves pueden descargarse en un solo lote y, vencido
+    el TTL, se sirve el dato obsoleto durante un periodo de gracia mientras se
+    recarga en segundo plano.
+    """
+
+    def __init__(self, ttl: float = 600, gracia: float = 1800):
+        self.ttl = ttl
+        self.gracia = gracia
+        self._entradas: Dict[Hashable, _Entrada] = {}
+        self._en_vuelo: Dict[Hashable, asyncio.Task] = {}
+
+        # Contadores expuestos en estadisticas()
+        self.aciertos = 0
+        self.fallos = 0
+        self.obsoletos = 0
+        self.recargas = 0
+        self.errores = 0
+
+    async def obtener(self, clave: Hashable, cargar: Callable[[], Awaitable[Any]]):
+        """
+        Retorna el valor de la clave, descargándolo con 'cargar' solo si no hay
+        un valor vigente ni dentro del periodo de gracia.
+        """
+        async def cargar_lote(claves):
+            return {clave: await cargar()}
+
+        resultados = await self.obtener_lote([clave], cargar_lote)
+        return resultados[clave]
+
+    async def obtener_lote(self, claves: Iterable[Hashable],
+                           cargar_lote: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]],
+                           precarga: Iterable[Hashable] = ()):
+        """
+        Retorna un diccionario clave -> valor para varias claves a la vez.
+        Las claves ausentes se descargan juntas con una sola llamada a 'cargar_lote',
+        que recibe la lista de claves y debe retornar un diccionario con sus valores.
+        Las claves de 'precarga' se suman a esa descarga si también están vencidas,
+        sin contarse en las estadísticas.
+        """
+        ahora = time.monotonic()
+        resultados: Dict[Hashable, Any] = {}
+        vencidas: List[Hashable] = []
+        faltantes: List[Hashable] = []
+
+        for clave in claves:
+            entrada = self._entradas.get(clave)
+            edad = ahora - entrada.obtenido_en if entrada is not None else None
+            if edad is not None and edad < self.ttl:
+                self.aciertos += 1
+                resultados[clave] = entrada.datos
+            elif edad is not None and edad < self.ttl + self.gracia:
+                # Servir obsoleto y recargar en segundo plano (stale-while-revalidate)
+                self.obsoletos += 1
+                resultados[clave] = entrada.datos
+                vencidas.append(clave)
+            else:
+                self.fallos += 1
+                faltantes.append(clave)
+
+        if faltantes or vencidas:
+            extra = [c for c in precarga if c not in resultados and c not in faltantes and not self._vigente(c, ahora)]
+            self._iniciar_recarga(faltantes + vencidas + extra, cargar_lote)
+            # Solo se esperan las descargas que cubren claves sin ningún valor disponible
+            for tarea in {self._en_vuelo[clave] for clave in faltantes}:
+                # shield evita que la cancelación de un cliente aborte la descarga compartida
+                datos = await asyncio.shield(tarea)
+                for clave in faltantes:
+                    if clave in datos:
+                        resultados[clave] = datos[clave]
+
+        return resultados
+
+    def _vigente(self, clave: Hashable, ahora: float) -> bool:
+        entrada = self._entradas.get(clave)
+        return entrada is not None and ahora - entrada.obtenido_en < self.ttl
+
+    def _iniciar_recarga(self, claves: List[Hashable], cargar_lote) -> Set[asyncio.Task]:
+        """
+        Retorna las descargas en curso que cubren las claves, iniciando una nueva
+        (compartida) para las claves que aún no tienen descarga.
+        """
+        tareas: Set[asyncio.Task] = set()
+        nuevas: List[Hashable] = []
+        for clave in claves:
+            tarea = self._en_vuelo.get(clave)
+            if tarea is not None:
+                tareas.add(tarea)
+            elif clave not in nuevas:
+                nuevas.append(clave)
+
+        if nuevas:
+            tarea = asyncio.ensure_future(self._recargar(nuevas, cargar_lote))
+            # Marcar la excepción como recuperada si nadie espera una recarga en segundo plano
+            tarea.add_done_callback(lambda t: t.cancelled() or t.exception())
+            for clave in nuevas:
+                self._en_vuelo[clave] = tarea
+            tareas.add(tarea)
+        return tareas
+
+    async def _recargar(self, claves: List[Hashable], cargar_lote):
+        """
+        Ejecuta la descarga del lote y guarda cada valor para las siguientes consultas.
+        """
+        actual = asyncio.current_task()
+        try:
+            datos = await cargar_lote(list(claves))
+            ahora = time.monotonic()
+            for clave, valor in datos.items():
+                self._entradas[clave] = _Entrada(valor, ahora)
+            self.recargas += 1
+            return datos
+        except BaseException:
+            self.errores += 1
+            raise
+        finally:
+            for clave in claves:
+                if self._en_vuelo.get(clave) is actual:
+                    del self._en_vuelo[clave]
+
+    def invalidar(self, clave: Optional[Hashable] = None):
+        """
+        Elimina una clave concreta o, sin argumentos, toda la caché.
+        """
+        if clave is None:
+            self._entradas.clear()
+        else:
+            self._entradas.pop(clave, None)
+
+    def estadisticas(self):
+        """
+        Retorna los contadores de aciertos y fallos junto con el tamaño actual.
+        """
+        consultas = self.aciertos + self.obsoletos + self.fallos
+        return {
+            "aciertos": self.aciertos,
+            "obsoletos": self.obsoletos,
+            "fallos": self.fallos,
+            "recargas": self.recargas,
+            "errores": self.errores,
+            "tasa_aciertos": round((self.aciertos + self.obsoletos) / consultas, 4) if consultas else 0.0,
+            "claves": len(self._entradas),
+            "ttl_segundos": self.ttl,
+            "gracia_segundos": self.gracia,
+        }
+
+# Fin cache_pronostico.py
@@ -0,0 +1,132 @@
+# Inicio cache_tablas.py
+
+# backend/services/cache_tablas.py
+
+# Importaciones necesarias para la caché de lectura por tabla
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+from starlette.requests import Request
+from starlette.responses import Response
+from backend.services.serializacion import UMBRAL_GZIP, codificar, comprimir
+from backend.app.middleware.etag_condicional import coincide
+
+
+class RespuestaCacheada:
+    """
+    Cuerpo de una respuesta ya serializado a JSON, con su ETag y, si se pide y
+    supera UMBRAL_GZIP, también comprimido con gzip una sola vez.
+    """
+    __slots__ = ("datos", "cuerpo", "cuerpo_gzip", "etag", "creada_en")
+
+    def __init__(self, datos: Any, comprimido: bool = False):
+        self.datos = datos
+        self.cuerpo = codificar(datos)
+        self.cuerpo_gzip = comprimir(self.cuerpo) if comprimido and len(self.cuerpo) >= UMBRAL_GZIP else None
+        self.etag = f'"{hashlib.sha1(self.cuerpo).hexdigest()[:20]}"'
+        self.creada_en = time.monotonic()
+
+
+# Clase principal de la caché por tabla
+class CacheTabla:
+    """
+    Caché de lectura (read-through) de las respuestas de una tabla.
+    Las claves llevan la versión de la tabla: cada escritura sube la versión y
+    todas las respuestas anteriores dejan de servirse de inmediato, sin recorrerlas.
+    Guarda a lo sumo 'capacidad' respuestas (se descartan las menos usadas) ya
+    serializadas, así que un acierto no vuelve a codificar JSON. Los fallos
+    concurrentes de una misma clave comparten una única consulta, y 'vigencia'
+    hace converger procesos que no vieron la escritura. Con 'comprimido' las
+    respuestas grandes también se guardan comprimidas con gzip.
+    """
+
+    def __init__(self, tabla: str, capacidad: int = 256, vigencia: float = 300, comprimido: bool = True):
+        self.tabla = tabla
+        self.capacidad = capacidad
+        self.vigencia = vigencia
+        self.comprimido = comprimido
+        self.version = 0
+        self._entradas: "OrderedDict[Tuple[int, Hashable], RespuestaCacheada]" = OrderedDict()
+        self._en_vuelo: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+
+        # Contadores expuestos en estadisticas()
+        self.aciertos = 0
+        self.fallos = 0
+
+    async def obtener(self, clave: Hashable, cargar: Callable[[], Awaitable[Any]]) -> RespuestaCacheada:
+        """
+        Retorna la respuesta de la clave en la versión actual de la tabla.
+        'cargar' retorna el cuerpo de la respuesta y solo se invoca si no está en caché.
+        """
+        clave = (self.version, clave)
+        entrada = self._entradas.get(clave)
+        if entrada is not None and time.monotonic() - entrada.creada_en <= self.vigencia:
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return entrada
+
+        self.fallos += 1
+        tarea = self._en_vuelo.get(clave)
+        if tarea is None:
+            tarea = asyncio.ensure_future(self._cargar(clave, cargar))
+            self._en_vuelo[clave] = tarea
+        # shield: si un cliente se desconecta, la consulta sigue para los demás
+        return await asyncio.shield(tarea)
+
+    async def _cargar(self, clave: Tuple[int, Hashable], cargar: Callable[[], Awaitable[Any]]) -> RespuestaCacheada:
+        try:
+            entrada = RespuestaCacheada(await cargar(), self.comprimido)
+            # Una escritura durante la consulta la dejó obsoleta: se responde pero no se guarda
+            if clave[0] == self.version:
+                self._entradas[clave] = entrada
+                while len(self._entradas) > self.capacidad:
+                    self._entradas.popitem(last=False)
+            return entrada
+        finally:
+            self._en_vuelo.pop(clave, None)
+
+    def invalidar(self):
+        """
+        Descarta todas las respuestas de la tabla (se invoca en cada escritura).
+        """
+        self.version += 1
+        self._entradas.clear()
+
+    def descartar(self, clave: Hashable):
+        """
+        Descarta la respuesta de una sola clave (por ejemplo, el perfil de un usuario).
+        Si esa clave se está consultando, se invalida toda la tabla para que el
+        resultado en vuelo, ya obsoleto, no se guarde.
+        """
+        clave = (self.version, clave)
+        if clave in self._en_vuelo:
+            self.invalidar()
+        else:
+            self._entradas.pop(clave, None)
+
+    def estadisticas(self):
+        return {
+            "tabla": self.tabla,
+            "version": self.version,
+            "entradas": len(self._entradas),
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+        }
+
+
+def respuesta_cacheada(request: Request, entrada: RespuestaCacheada) -> Response:
+    """
+    Respuesta HTTP con el cuerpo ya serializado, o 304 si el cliente tiene esa versión.
+    Si el cliente acepta gzip y hay versión comprimida, se envía tal cual sin volver a comprimir.
+    """
+    headers = {"ETag": entrada.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if coincide(entrada.etag, request.headers.get("if-none-match", "")):
+        return Response(status_code=304, headers=headers)
+    if entrada.cuerpo_gzip is not None and "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(entrada.cuerpo_gzip, media_type="application/json", headers=headers)
+    return Response(entrada.cuerpo, media_type="application/json", headers=headers)
+
+# Fin cache_tablas.py
@@ -0,0 +1,92 @@
+# Inicio cliente_clima.py
+
+# backend/services/cliente_clima.py
+
+# Importaciones necesarias para el cliente HTTP asíncrono de Open-Meteo
+import asyncio
+import random
+from typing import Dict, Optional
+import httpx
+
+# Endpoints de Open-Meteo utilizados por la aplicación
+URLS_OPEN_METEO = {
+    "forecast": "https://api.open-meteo.com/v1/forecast",
+    "archive": "https://archive-api.open-meteo.com/v1/archive",
+}
+
+# Timeouts por endpoint: el archivo histórico responde más lento que el pronóstico
+TIMEOUTS_OPEN_METEO = {
+    "forecast": httpx.Timeout(10.0, connect=5.0),
+    "archive": httpx.Timeout(20.0, connect=5.0),
+}
+
+# Códigos de estado que justifican reintentar la petición
+ESTADOS_REINTENTABLES = {429, 500, 502, 503, 504}
+
+
+# Clase principal del cliente climático
+class ClienteClima:
+    """
+    Cliente asíncrono compartido por todo el proceso para las APIs de Open-Meteo.
+    Mantiene un pool de conexiones HTTP/2 keep-alive y reintenta los fallos
+    transitorios con backoff exponencial y jitter.
+    """
+
+    REINTENTOS = 3
+    BACKOFF_BASE = 0.25  # segundos
+    BACKOFF_MAXIMO = 4.0  # segundos
+
+    _cliente: Optional[httpx.AsyncClient] = None
+
+    @classmethod
+    def _obtener_cliente(cls) -> httpx.AsyncClient:
+        """
+        Crea el cliente HTTP la primera vez que se necesita y lo reutiliza después.
+        """
+        if cls._cliente is None or cls._cliente.is_closed:
+            cls._cliente = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60),
+                headers={"User-Agent": "CalorSOS-API"},
+            )
+        return cls._cliente
+
+    @classmethod
+    def _espera_reintento(cls, intento: int) -> float:
+        """
+        Calcula la espera antes del siguiente intento (backoff exponencial con jitter completo).
+        """
+        techo = min(cls.BACKOFF_MAXIMO, cls.BACKOFF_BASE * (2 ** intento))
+        return random.uniform(0, techo)
+
+    @classmethod
+    async def consultar(cls, endpoint: str, params: Dict) -> httpx.Response:
+        """
+        Realiza un GET al endpoint indicado ('forecast' o 'archive').
+        Reintenta errores de transporte y respuestas 429/5xx; retorna la última respuesta
+        obtenida o relanza la última excepción de transporte.
+        """
+        cliente = cls._obtener_cliente()
+        url = URLS_OPEN_METEO[endpoint]
+        timeout = TIMEOUTS_OPEN_METEO[endpoint]
+
+        for intento in range(cls.REINTENTOS + 1):
+            try:
+                response = await cliente.get(url, params=params, timeout=timeout)
+                if response.status_code not in ESTADOS_REINTENTABLES or intento == cls.REINTENTOS:
+                    return response
+            except httpx.TransportError:
+                if intento == cls.REINTENTOS:
+                    raise
+            await asyncio.sleep(cls._espera_reintento(intento))
+
+    @classmethod
+    async def cerrar(cls):
+        """
+        Cierra el pool de conexiones (se invoca al apagar la aplicación).
+        """
+        if cls._cliente is not None:
+            await cls._cliente.aclose()
+            cls._cliente = None
+
+# Fin cliente_clima.py
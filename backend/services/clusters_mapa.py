@@ -0,0 +1,179 @@
+# Inicio clusters_mapa.py
+
+# backend/services/clusters_mapa.py
+
+# Importaciones necesarias para la pirámide de clusters del mapa
+import math
+import threading
+from typing import Dict, List, Set, Tuple
+
+# Desde este zoom el mapa recibe los recursos individuales en lugar de clusters
+ZOOM_INDIVIDUAL = 16
+
+# Tamaño en píxeles de la celda de agrupación (teselas de 256 px => 4x4 celdas por tesela)
+PIXELES_CELDA = 64
+
+# Máximo de recursos individuales por respuesta
+LIMITE_INDIVIDUALES = 1000
+
+# Latitud máxima representable en la proyección Web Mercator de Leaflet
+LATITUD_MAXIMA = 85.05112878
+
+
+def proyectar(lat: float, lon: float) -> Tuple[float, float]:
+    """
+    Convierte una coordenada a Web Mercator normalizado: x, y en [0, 1).
+    """
+    lat = max(-LATITUD_MAXIMA, min(LATITUD_MAXIMA, lat))
+    x = (lon + 180.0) / 360.0
+    s = math.sin(math.radians(lat))
+    y = 0.5 - math.log((1 + s) / (1 - s)) / (4 * math.pi)
+    return min(max(x, 0.0), 1.0 - 1e-12), min(max(y, 0.0), 1.0 - 1e-12)
+
+
+class _Celda:
+    """
+    Resumen de los recursos que caen en una celda de un nivel de la pirámide.
+    """
+    __slots__ = ("suma_lat", "suma_lon", "ids")
+
+    def __init__(self):
+        self.suma_lat = 0.0
+        self.suma_lon = 0.0
+        self.ids: Set[str] = set()
+
+
+# Clase principal de la pirámide de clusters
+class PiramideClusters:
+    """
+    Pirámide de clusters por grilla para el mapa, un nivel por zoom de Leaflet.
+    En cada nivel los recursos se agrupan en celdas de PIXELES_CELDA píxeles con su
+    cantidad y centroide. Cada alta o baja actualiza solo una celda por nivel, así
+    que nunca se reconstruye completa. Una consulta por viewport recorre únicamente
+    las celdas visibles, por lo que el tamaño de la respuesta depende de la pantalla
+    y no del número de recursos.
+    """
+
+    def __init__(self, campo_id: str):
+        self.campo_id = campo_id
+        self._niveles: List[Dict[Tuple[int, int], _Celda]] = [{} for _ in range(ZOOM_INDIVIDUAL)]
+        self._registros: Dict[str, dict] = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _celdas_por_lado(zoom: int) -> int:
+        return (256 << zoom) // PIXELES_CELDA
+
+    def _celdas(self, registro: dict):
+        x, y = proyectar(float(registro["latitud"]), float(registro["longitud"]))
+        for zoom in range(ZOOM_INDIVIDUAL):
+            n = self._celdas_por_lado(zoom)
+            yield zoom, (int(x * n), int(y * n))
+
+    # ------------------------------ Mantenimiento ------------------------------
+
+    def agregar(self, registro: dict):
+        """
+        Suma un recurso a su celda en cada nivel.
+        """
+        id_registro = str(registro[self.campo_id])
+        lat, lon = float(registro["latitud"]), float(registro["longitud"])
+        with self._lock:
+            if id_registro in self._registros:
+                self.quitar(self._registros[id_registro])
+            self._registros[id_registro] = registro
+            for zoom, clave in self._celdas(registro):
+                celda = self._niveles[zoom].get(clave)
+                if celda is None:
+                    celda = self._niveles[zoom][clave] = _Celda()
+                celda.suma_lat += lat
+                celda.suma_lon += lon
+                celda.ids.add(id_registro)
+
+    def quitar(self, registro: dict):
+        """
+        Resta un recurso de su celda en cada nivel, descartando las celdas vacías.
+        """
+        id_registro = str(registro[self.campo_id])
+        with self._lock:
+            registro = self._registros.pop(id_registro, None)
+            if registro is None:
+                return
+            lat, lon = float(registro["latitud"]), float(registro["longitud"])
+            for zoom, clave in self._celdas(registro):
+                celda = self._niveles[zoom][clave]
+                celda.ids.discard(id_registro)
+                if not celda.ids:
+                    del self._niveles[zoom][clave]
+                else:
+                    celda.suma_lat -= lat
+                    celda.suma_lon -= lon
+
+    # ------------------------------ Consultas ------------------------------
+
+    def _visibles(self, nivel: Dict[Tuple[int, int], _Celda], n: int,
+                  sur: float, oeste: float, norte: float, este: float):
+        """
+        Retorna las celdas ocupadas de un nivel que intersectan el viewport.
+        """
+        x0, y0 = proyectar(norte, oeste)
+        x1, y1 = proyectar(sur, este)
+        i0, i1, j0, j1 = int(x0 * n), int(x1 * n), int(y0 * n), int(y1 * n)
+        if (i1 - i0 + 1) * (j1 - j0 + 1) <= len(nivel):
+            # Pocas celdas visibles: consultarlas una a una
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    celda = nivel.get((i, j))
+                    if celda is not None:
+                        yield celda
+        else:
+            # Pocas celdas ocupadas: filtrarlas por rango
+            for (i, j), celda in nivel.items():
+                if i0 <= i <= i1 and j0 <= j <= j1:
+                    yield celda
+
+    def _individual(self, id_registro: str) -> dict:
+        item = dict(self._registros[id_registro])
+        item["es_cluster"] = False
+        return item
+
+    def viewport(self, sur: float, oeste: float, norte: float, este: float, zoom: int):
+        """
+        Retorna los marcadores del viewport para el zoom indicado: clusters con
+        cantidad y centroide por debajo de ZOOM_INDIVIDUAL (o el recurso mismo si
+        la celda tiene uno solo) y recursos individuales desde ese zoom.
+        """
+        with self._lock:
+            marcadores = []
+            truncado = False
+            if zoom < ZOOM_INDIVIDUAL:
+                nivel = self._niveles[max(0, zoom)]
+                for celda in self._visibles(nivel, self._celdas_por_lado(max(0, zoom)), sur, oeste, norte, este):
+                    cantidad = len(celda.ids)
+                    if cantidad == 1:
+                        marcadores.append(self._individual(next(iter(celda.ids))))
+                    else:
+                        marcadores.append({
+                            "es_cluster": True,
+                            "cantidad": cantidad,
+                            "latitud": round(celda.suma_lat / cantidad, 6),
+                            "longitud": round(celda.suma_lon / cantidad, 6),
+                        })
+            else:
+                # Se parte del nivel más fino y se filtra cada recurso por el viewport exacto
+                nivel = self._niveles[ZOOM_INDIVIDUAL - 1]
+                n = self._celdas_por_lado(ZOOM_INDIVIDUAL - 1)
+                for celda in self._visibles(nivel, n, sur, oeste, norte, este):
+                    for id_registro in celda.ids:
+                        registro = self._registros[id_registro]
+                        if sur <= float(registro["latitud"]) <= norte and oeste <= float(registro["longitud"]) <= este:
+                            if len(marcadores) >= LIMITE_INDIVIDUALES:
+                                truncado = True
+                                break
+                            marcadores.append(self._individual(id_registro))
+                    if truncado:
+                        break
+
+            return {"total": len(self._registros), "marcadores": marcadores, "truncado": truncado}
+
+# Fin clusters_mapa.py
@@ -0,0 +1,88 @@
+# Inicio contador_no_leidas.py
+
+# backend/services/contador_no_leidas.py
+
+# Importaciones necesarias para el contador de notificaciones no leídas
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+# Clase principal del contador de no leídas
+class ContadorNoLeidas:
+    """
+    Contadores en memoria de notificaciones no leídas por usuario.
+    No leídas = personales no leídas + (total de globales - globales descontadas al usuario),
+    donde las descontadas son las que leyó y las enviadas antes de su registro.
+    El total de globales es uno solo para todos, así que publicar una notificación
+    global cuesta O(1). Cada contador se calcula con consultas count la primera
+    vez, se ajusta con cada creación o lectura y vence tras 'vigencia' segundos
+    para converger con cambios hechos desde otros procesos.
+    """
+
+    def __init__(self, vigencia: float = 300):
+        self.vigencia = vigencia
+        # id_usuario -> [personales no leídas, globales descontadas, cargado_en]
+        self._usuarios: Dict[str, List] = {}
+        self._globales: Optional[Tuple[int, float]] = None
+        self._lock = threading.Lock()
+
+    def _vigente(self, cargado_en: float) -> bool:
+        return time.monotonic() - cargado_en <= self.vigencia
+
+    async def obtener(self, id_usuario: str, contar_usuario: Callable[[], Awaitable[Tuple[int, int]]],
+                      contar_globales: Callable[[], Awaitable[int]]) -> int:
+        """
+        Retorna las no leídas del usuario. 'contar_usuario' retorna
+        (personales no leídas, globales descontadas) y 'contar_globales' el total
+        de globales; ambas son asíncronas y solo se invocan si el valor en
+        memoria no está vigente.
+        """
+        id_usuario = str(id_usuario)
+        globales = self._globales
+        if globales is None or not self._vigente(globales[1]):
+            total = await contar_globales()
+            with self._lock:
+                self._globales = globales = (total, time.monotonic())
+
+        entrada = self._usuarios.get(id_usuario)
+        if entrada is None or not self._vigente(entrada[2]):
+            personales, leidas = await contar_usuario()
+            with self._lock:
+                self._usuarios[id_usuario] = entrada = [personales, leidas, time.monotonic()]
+
+        return max(0, entrada[0] + globales[0] - entrada[1])
+
+    def sumar_personales(self, id_usuario: str, delta: int):
+        with self._lock:
+            entrada = self._usuarios.get(str(id_usuario))
+            if entrada is not None:
+                entrada[0] = max(0, entrada[0] + delta)
+
+    def sumar_globales(self, delta: int):
+        with self._lock:
+            if self._globales is not None:
+                self._globales = (max(0, self._globales[0] + delta), self._globales[1])
+
+    def marcar_todo_leido(self, id_usuario: str):
+        """
+        Deja en cero las no leídas del usuario tras marcar todo como leído.
+        """
+        with self._lock:
+            if self._globales is None:
+                self._usuarios.pop(str(id_usuario), None)
+            else:
+                self._usuarios[str(id_usuario)] = [0, self._globales[0], time.monotonic()]
+
+    def invalidar(self, id_usuario: Optional[str] = None):
+        """
+        Descarta el contador de un usuario o, sin argumentos, todos los contadores.
+        """
+        with self._lock:
+            if id_usuario is None:
+                self._usuarios.clear()
+                self._globales = None
+            else:
+                self._usuarios.pop(str(id_usuario), None)
+
+# Fin contador_no_leidas.py
@@ -0,0 +1,171 @@
+# Inicio difusion_notificaciones.py
+
+# backend/services/difusion_notificaciones.py
+
+# Importaciones necesarias para el motor de difusión de notificaciones
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+from postgrest.exceptions import APIError
+from postgrest.types import ReturnMethod
+
+# Configuración por defecto (ajustable con variables de entorno)
+TAMANO_PAGINA = int(os.getenv("CALORSOS_DIFUSION_PAGINA", "1000"))
+TAMANO_LOTE = int(os.getenv("CALORSOS_DIFUSION_LOTE", "500"))
+MAX_HILOS = int(os.getenv("CALORSOS_DIFUSION_HILOS", "4"))
+REINTENTOS = 3
+BACKOFF_BASE = 0.25
+
+# Máximo de ids fallidos que se reportan en el resumen
+MAX_IDS_REPORTADOS = 100
+
+
+def _es_error_de_filas(error: Exception) -> bool:
+    """
+    Indica si el error depende de las filas enviadas: un 4xx de PostgREST o una
+    restricción o dato inválido de PostgreSQL (SQLSTATE 22 y 23). Los errores de
+    transporte y los 5xx no mejoran al dividir el lote.
+    """
+    if not isinstance(error, APIError):
+        return False
+    codigo = str(error.code or "")
+    if codigo.isdigit() and len(codigo) == 3:
+        # Respuesta sin cuerpo JSON: el código es el estado HTTP
+        return codigo.startswith("4")
+    return codigo[:2] in ("22", "23") or codigo.startswith("PGRST1")
+
+
+# Clase principal del motor de difusión
+class MotorDifusion:
+    """
+    Envía una misma notificación a todos los usuarios sin una petición por fila.
+    Recorre la tabla usuarios por páginas con un cursor sobre id_usuario e inserta
+    las notificaciones en lotes, que se ejecutan en un pool acotado de hilos.
+    Un lote que falla por un error de transporte o del servidor se reintenta con
+    espera exponencial y, si sigue fallando, se reporta completo como fallido.
+    Un lote rechazado por sus filas se divide en mitades para aislar las filas
+    problemáticas sin perder el resto.
+    """
+
+    def __init__(self, cliente, tamano_pagina: int = TAMANO_PAGINA, tamano_lote: int = TAMANO_LOTE,
+                 max_hilos: int = MAX_HILOS, reintentos: int = REINTENTOS):
+        self.cliente = cliente
+        self.tamano_pagina = tamano_pagina
+        self.tamano_lote = tamano_lote
+        self.max_hilos = max_hilos
+        self.reintentos = reintentos
+
+    # ------------------------------ Lectura de usuarios ------------------------------
+
+    def paginar_usuarios(self):
+        """
+        Genera páginas de ids de usuario ordenadas, usando el último id como cursor
+        (sin OFFSET, cada página cuesta lo mismo sin importar su posición).
+        """
+        cursor = None
+        while True:
+            query = self.cliente.table("usuarios").select("id_usuario").order("id_usuario")
+            if cursor is not None:
+                query = query.gt("id_usuario", cursor)
+            pagina = [u["id_usuario"] for u in query.limit(self.tamano_pagina).execute().data]
+            if pagina:
+                yield pagina
+            if len(pagina) < self.tamano_pagina:
+                return
+            cursor = pagina[-1]
+
+    # ------------------------------ Inserción por lotes ------------------------------
+
+    def _insertar(self, filas: List[dict]):
+        self.cliente.table("notificaciones").insert(filas, returning=ReturnMethod.minimal).execute()
+
+    def _insertar_lote(self, filas: List[dict], intentos: int, resumen: dict, lock: threading.Lock):
+        """
+        Inserta un lote con reintentos ante errores de transporte o del servidor.
+        Si las filas son las rechazadas, lo divide en mitades y prueba cada una con
+        un único intento, hasta aislar las filas que no se pueden insertar; en otro
+        caso, agotados los reintentos, el lote completo se reporta como fallido.
+        """
+        for intento in range(intentos):
+            try:
+                self._insertar(filas)
+                with lock:
+                    resumen["insertadas"] += len(filas)
+                return
+            except Exception as e:
+                error = e
+                if _es_error_de_filas(e):
+                    # Reintentar las mismas filas no sirve
+                    break
+                if intento < intentos - 1:
+                    with lock:
+                        resumen["reintentos"] += 1
+                    # Espera exponencial con jitter completo
+                    time.sleep(random.uniform(0, BACKOFF_BASE * 2 ** intento))
+
+        if len(filas) > 1 and _es_error_de_filas(error):
+            mitad = len(filas) // 2
+            self._insertar_lote(filas[:mitad], 1, resumen, lock)
+            self._insertar_lote(filas[mitad:], 1, resumen, lock)
+            return
+
+        with lock:
+            resumen["fallidas"] += len(filas)
+            resumen["ultimo_error"] = str(error)
+            espacio = MAX_IDS_REPORTADOS - len(resumen["ids_fallidos"])
+            resumen["ids_fallidos"].extend(f["id_usuario"] for f in filas[:max(0, espacio)])
+
+    def difundir(self, mensaje: str, estado: str = "pendiente",
+                 al_progresar: Optional[Callable[[dict], None]] = None):
+        """
+        Crea la notificación para todos los usuarios y retorna un resumen con
+        usuarios, lotes, insertadas, fallidas, reintentos y duración.
+        'al_progresar' recibe una copia del resumen tras encolar cada página.
+        """
+        inicio = time.perf_counter()
+        lock = threading.Lock()
+        resumen = {
+            "usuarios": 0,
+            "lotes": 0,
+            "insertadas": 0,
+            "fallidas": 0,
+            "reintentos": 0,
+            "ids_fallidos": [],
+            "ultimo_error": None,
+        }
+        # Limita los lotes en memoria a dos por hilo mientras se leen más páginas
+        cupos = threading.BoundedSemaphore(self.max_hilos * 2)
+
+        def trabajar(filas):
+            try:
+                self._insertar_lote(filas, self.reintentos, resumen, lock)
+            finally:
+                cupos.release()
+
+        with ThreadPoolExecutor(max_workers=self.max_hilos, thread_name_prefix="difusion") as pool:
+            for pagina in self.paginar_usuarios():
+                for i in range(0, len(pagina), self.tamano_lote):
+                    filas = [
+                        {"id_usuario": id_usuario, "mensaje": mensaje, "estado": estado}
+                        for id_usuario in pagina[i:i + self.tamano_lote]
+                    ]
+                    cupos.acquire()
+                    pool.submit(trabajar, filas)
+                    resumen["lotes"] += 1
+                resumen["usuarios"] += len(pagina)
+                if al_progresar is not None:
+                    with lock:
+                        al_progresar(dict(resumen))
+
+        resumen["duracion_segundos"] = round(time.perf_counter() - inicio, 3)
+        print(
+            f"Difusión completada: {resumen['insertadas']}/{resumen['usuarios']} notificaciones "
+            f"en {resumen['lotes']} lotes ({resumen['fallidas']} fallidas, "
+            f"{resumen['reintentos']} reintentos, {resumen['duracion_segundos']} s)"
+        )
+        return resumen
+
+# Fin difusion_notificaciones.py
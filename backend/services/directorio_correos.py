@@ -0,0 +1,240 @@
+# Inicio directorio_correos.py
+
+# backend/services/directorio_correos.py
+
+# Importaciones necesarias para el directorio de correos registrados
+import asyncio
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+
+class FiltroBloom:
+    """
+    Filtro de Bloom de cadenas: responde "seguro que no está" o "puede estar"
+    (con una tasa de falsos positivos cercana a 'tasa_falsos' mientras no se
+    superen 'capacidad' elementos). Los bits se guardan en un bytearray.
+    """
+
+    def __init__(self, capacidad: int, tasa_falsos: float = 0.01):
+        self.capacidad = max(1, capacidad)
+        self.bits = max(8, math.ceil(-self.capacidad * math.log(tasa_falsos) / math.log(2) ** 2))
+        self.funciones = max(1, round(self.bits / self.capacidad * math.log(2)))
+        self.elementos = 0
+        self._arreglo = bytearray((self.bits + 7) // 8)
+
+    def _posiciones(self, valor: str):
+        # Doble hashing (Kirsch-Mitzenmacher): k posiciones a partir de un solo digest
+        digest = hashlib.blake2b(valor.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.bits for i in range(self.funciones))
+
+    def agregar(self, valor: str):
+        nuevo = False
+        for posicion in self._posiciones(valor):
+            byte, bit = divmod(posicion, 8)
+            if not self._arreglo[byte] & (1 << bit):
+                self._arreglo[byte] |= 1 << bit
+                nuevo = True
+        if nuevo:
+            self.elementos += 1
+
+    def __contains__(self, valor: str) -> bool:
+        return all(self._arreglo[p // 8] & (1 << (p % 8)) for p in self._posiciones(valor))
+
+    def tasa_estimada(self) -> float:
+        return (1 - math.exp(-self.funciones * self.elementos / self.bits)) ** self.funciones
+
+
+# Clase principal del directorio de correos
+class DirectorioCorreos:
+    """
+    Credenciales de inicio de sesión (id_usuario, correo, rol, password) por correo,
+    con un filtro de Bloom de todos los correos registrados. Si el filtro dice que un
+    correo no existe, el registro y el inicio de sesión lo saben sin consultar la
+    base de datos; si dice que puede existir, la consulta se hace una vez y se guarda
+    'ttl' segundos (las respuestas vacías, solo 'ttl_vacio'). Un cambio de contraseña
+    hecho en otro proceso se refleja aquí cuando vence 'ttl'.
+
+    El filtro se carga completo cada 'vigencia' segundos y, entre cargas, antes de
+    descartar un correo se traen siempre los registrados desde la última
+    sincronización (una consulta indexada por fecha_registro, compartida por las
+    peticiones concurrentes que llegaron antes de empezarla), así que un usuario
+    creado en otro proceso se reconoce de inmediato. Si la carga falla, todos los
+    correos "pueden existir" durante 'intervalo' segundos.
+    """
+
+    def __init__(self,
+                 cargar_todo: Callable[[], Awaitable[List[dict]]],
+                 cargar_desde: Callable[[str], Awaitable[List[dict]]],
+                 vigencia: float = 300, intervalo: float = 5, ttl: float = 5, ttl_vacio: float = 5,
+                 capacidad: int = 4096, tasa_falsos: float = 0.01):
+        self.cargar_todo = cargar_todo
+        self.cargar_desde = cargar_desde
+        self.vigencia = vigencia
+        self.intervalo = intervalo
+        self.ttl = ttl
+        self.ttl_vacio = ttl_vacio
+        self.capacidad = capacidad
+        self.tasa_falsos = tasa_falsos
+
+        self._filtro: Optional[FiltroBloom] = None
+        self._cargado_en: Optional[float] = None
+        self._sincronizado_en = 0.0
+        self._fallo_en: Optional[float] = None
+        self._marca: Optional[str] = None  # fecha_registro más reciente vista
+        self._tarea: Optional[asyncio.Task] = None
+        self._tarea_inicio = 0.0
+        # correo -> (credenciales o None, guardado_en)
+        self._credenciales: "OrderedDict[str, Tuple[Optional[dict], float]]" = OrderedDict()
+
+        # Contadores expuestos en estadisticas()
+        self.aciertos = 0
+        self.consultas = 0
+        self.descartados = 0
+        self.cargas = 0
+        self.sincronizaciones = 0
+
+    # ------------------------------ Filtro de correos ------------------------------
+
+    async def _refrescar(self, completo: bool, despues_de: Optional[float] = None):
+        """
+        Carga el filtro completo o agrega los correos registrados desde la última marca.
+        Las peticiones concurrentes esperan la misma tarea; con 'despues_de', solo
+        una que haya empezado después de ese instante (si no, se espera la actual y
+        se inicia otra).
+        """
+        try:
+            if self._tarea is not None and despues_de is not None and self._tarea_inicio < despues_de:
+                # La consulta en curso pudo no ver un registro anterior a esta petición
+                await asyncio.shield(self._tarea)
+            if self._tarea is None:
+                self._tarea_inicio = time.monotonic()
+                self._tarea = asyncio.ensure_future(self._ejecutar_refresco(completo))
+            await asyncio.shield(self._tarea)
+        except Exception as e:
+            # No se reintenta hasta pasado 'intervalo': mientras tanto se consulta la base de datos
+            self._fallo_en = time.monotonic()
+            print(f"No se pudo cargar el directorio de correos: {e}")
+
+    async def _ejecutar_refresco(self, completo: bool):
+        try:
+            inicio = time.monotonic()
+            if completo or self._marca is None:
+                filas = await self.cargar_todo()
+                self._fallo_en = None
+                filtro = FiltroBloom(max(self.capacidad, 2 * len(filas)), self.tasa_falsos)
+                self._marca = None
+                self._agregar_filas(filtro, filas)
+                self._filtro = filtro
+                self._cargado_en = inicio
+                self.cargas += 1
+            else:
+                self._agregar_filas(self._filtro, await self.cargar_desde(self._marca))
+                self.sincronizaciones += 1
+                # Superada la capacidad, la tasa de falsos positivos sube: se reconstruye en la próxima consulta
+                if self._filtro.elementos > self._filtro.capacidad:
+                    self._cargado_en = None
+            self._sincronizado_en = inicio
+        finally:
+            self._tarea = None
+
+    def _agregar_filas(self, filtro: FiltroBloom, filas: List[dict]):
+        for fila in filas:
+            if fila.get("correo"):
+                filtro.agregar(fila["correo"])
+            fecha = fila.get("fecha_registro")
+            if fecha and (self._marca is None or str(fecha) > self._marca):
+                self._marca = str(fecha)
+
+    async def puede_existir(self, correo: str) -> bool:
+        """
+        False solo si el correo seguro no está registrado.
+        """
+        ahora = time.monotonic()
+        if self._fallo_en is not None and ahora - self._fallo_en <= self.intervalo:
+            return True
+        if self._cargado_en is None or ahora - self._cargado_en > self.vigencia:
+            await self._refrescar(completo=True)
+        if self._filtro is None:
+            return True
+        if correo in self._filtro:
+            return True
+        # Antes de descartarlo, traer los registrados en otros procesos
+        await self._refrescar(completo=False, despues_de=ahora)
+        if self._fallo_en is not None and self._fallo_en >= ahora:
+            return True
+        return correo in self._filtro
+
+    # ------------------------------ Credenciales ------------------------------
+
+    async def obtener(self, correo: str, consultar: Callable[[str], Awaitable[Optional[dict]]],
+                      usar_cache: bool = True) -> Optional[dict]:
+        """
+        Credenciales del correo o None si no está registrado. 'consultar' busca el
+        correo en la base de datos y solo se invoca si el filtro no lo descarta y
+        no está en la caché (con usar_cache=False, siempre que el filtro no lo descarte).
+        """
+        entrada = self._credenciales.get(correo) if usar_cache else None
+        if entrada is not None:
+            vigencia = self.ttl if entrada[0] is not None else self.ttl_vacio
+            if time.monotonic() - entrada[1] <= vigencia:
+                self._credenciales.move_to_end(correo)
+                self.aciertos += 1
+                return dict(entrada[0]) if entrada[0] is not None else None
+            del self._credenciales[correo]
+
+        if not await self.puede_existir(correo):
+            self.descartados += 1
+            return None
+
+        self.consultas += 1
+        credenciales = await consultar(correo)
+        self._credenciales[correo] = (credenciales, time.monotonic())
+        while len(self._credenciales) > self.capacidad:
+            self._credenciales.popitem(last=False)
+        return dict(credenciales) if credenciales is not None else None
+
+    def registrar(self, usuario: Optional[dict]):
+        """
+        Refleja un usuario creado o actualizado en este proceso: agrega su correo
+        al filtro y descarta las credenciales guardadas de ese usuario.
+        """
+        if not usuario:
+            return
+        self.olvidar(usuario.get("id_usuario"))
+        correo = usuario.get("correo")
+        if correo:
+            self._credenciales.pop(correo, None)
+            if self._filtro is not None:
+                self._filtro.agregar(correo)
+
+    def olvidar(self, id_usuario):
+        """
+        Descarta las credenciales guardadas de un usuario (al cambiar su contraseña,
+        rol o correo, o al eliminarlo). Los correos no se quitan del filtro: uno
+        eliminado solo cuesta una consulta hasta la próxima carga completa.
+        """
+        if id_usuario is None:
+            return
+        for correo, (credenciales, _) in list(self._credenciales.items()):
+            if credenciales is not None and str(credenciales.get("id_usuario")) == str(id_usuario):
+                del self._credenciales[correo]
+
+    def estadisticas(self) -> dict:
+        return {
+            "correos_en_filtro": self._filtro.elementos if self._filtro is not None else None,
+            "bits_filtro": self._filtro.bits if self._filtro is not None else None,
+            "tasa_falsos_estimada": round(self._filtro.tasa_estimada(), 5) if self._filtro is not None else None,
+            "credenciales_en_cache": len(self._credenciales),
+            "aciertos": self.aciertos,
+            "consultas": self.consultas,
+            "descartados_por_filtro": self.descartados,
+            "cargas": self.cargas,
+            "sincronizaciones": self.sincronizaciones,
+        }
+
+# Fin directorio_correos.py
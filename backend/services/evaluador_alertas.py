@@ -0,0 +1,139 @@
+# Inicio evaluador_alertas.py
+
+# backend/services/evaluador_alertas.py
+
+# Importaciones necesarias para el evaluador de alertas con histéresis
+from datetime import datetime
+from typing import Dict, Optional
+from backend.services.indices_calor import NIVELES_ALERTA, UMBRALES_ALERTA
+
+# Cuánto debe bajar cada métrica por debajo del umbral de entrada para salir de un nivel
+MARGENES_HISTERESIS = {"temperatura": 1.0, "uv_index": 1.0, "sensacion_termica": 1.0}
+
+
+class Transicion:
+    """
+    Cambio de nivel (o escalada del riesgo térmico dentro del nivel) que debe emitirse.
+    """
+    __slots__ = ("anterior", "nivel", "escalada", "clima", "riesgo")
+
+    def __init__(self, anterior: Optional[int], nivel: int, escalada: bool, clima: dict):
+        self.anterior = anterior
+        self.nivel = nivel
+        self.escalada = escalada
+        self.clima = clima
+        self.riesgo = clima.get("thermal_risk")
+
+    @property
+    def nombre(self) -> str:
+        return NIVELES_ALERTA[self.nivel]
+
+    def mensaje(self) -> str:
+        """
+        Texto de la notificación global de la transición.
+        """
+        datos = f"Temp: {self.clima['temperatura']}°C, UV: {self.clima['uv_index']}"
+        if self.escalada:
+            return f"⚠️ ALERTA DE CALOR {self.nombre.upper()} — {datos}"
+        return f"ℹ️ El riesgo de calor baja a {self.nombre.upper()} — {datos}"
+
+
+# Clase principal del evaluador de alertas
+class EvaluadorAlertas:
+    """
+    Evalúa el nivel de alerta de cada lectura del clima y recuerda el último.
+    Para subir de nivel se usan los umbrales de UMBRALES_ALERTA; para mantenerse
+    en un nivel ya alcanzado basta con seguir por encima del umbral menos su
+    margen, así que una lectura que oscila alrededor del umbral no alterna entre
+    niveles. Solo hay transición cuando el nivel cambia o cuando, dentro del mismo
+    nivel, el riesgo térmico (WBGT) supera el máximo ya emitido; el resto de las
+    lecturas no escribe ni notifica nada. Una transición solo pasa a ser el estado
+    recordado con confirmar(), tras guardarla y notificarla: si eso falla, la
+    siguiente evaluación la vuelve a proponer.
+    """
+
+    def __init__(self, margenes: Optional[Dict[str, float]] = None):
+        self.margenes = margenes or MARGENES_HISTERESIS
+        self.nivel: Optional[int] = None
+        self.riesgo_emitido: Optional[int] = None
+        self.ultimo_clima: Optional[dict] = None
+        self.ultimo_cambio: Optional[str] = None
+
+        # Contadores expuestos en estado()
+        self.evaluaciones = 0
+        self.transiciones = 0
+        self.restaurado = False
+
+    def restaurar(self, nivel_riesgo: Optional[str]):
+        """
+        Toma como nivel actual el de la última alerta guardada ('bajo', 'medio' o 'alto'),
+        para que reiniciar el proceso o cambiar de líder no vuelva a emitir la misma alerta.
+        """
+        self.nivel = NIVELES_ALERTA.index(nivel_riesgo) if nivel_riesgo in NIVELES_ALERTA else None
+        self.riesgo_emitido = None
+        self.restaurado = True
+
+    def reiniciar(self):
+        """
+        Descarta el nivel recordado; la siguiente evaluación debe restaurarlo de nuevo.
+        Se invoca al tomar el liderazgo, porque otro proceso pudo emitir alertas mientras tanto.
+        """
+        self.restaurado = False
+
+    def _calcular_nivel(self, clima: dict) -> int:
+        for nivel in (2, 1):
+            # Dentro de un nivel ya alcanzado los umbrales bajan en su margen
+            mantener = self.nivel is not None and self.nivel >= nivel
+            for metrica, umbral in UMBRALES_ALERTA[nivel].items():
+                valor = clima.get(metrica)
+                if valor is not None and valor >= umbral - (self.margenes.get(metrica, 0.0) if mantener else 0.0):
+                    return nivel
+        return 0
+
+    def evaluar(self, clima: dict) -> Optional[Transicion]:
+        """
+        Evalúa una lectura de clima (temperatura, uv_index, sensacion_termica y
+        thermal_risk). Retorna la transición a emitir, o None si no hay cambio.
+        La transición no cambia el nivel recordado hasta confirmarla.
+        """
+        self.evaluaciones += 1
+        self.ultimo_clima = {k: clima.get(k) for k in ("temperatura", "humedad", "sensacion_termica", "uv_index", "thermal_risk")}
+        anterior = self.nivel
+        nivel = self._calcular_nivel(clima)
+        riesgo = clima.get("thermal_risk")
+
+        # Sin alertas previas, un nivel bajo no se anuncia
+        if nivel == anterior or (anterior is None and nivel == 0):
+            self.nivel = nivel
+            if self.riesgo_emitido is None:
+                # Primera lectura tras restaurar: línea base del riesgo térmico
+                self.riesgo_emitido = riesgo
+            # Escalada dentro del nivel: el riesgo térmico supera el máximo ya emitido
+            if nivel == 0 or riesgo is None or riesgo <= self.riesgo_emitido:
+                return None
+            escalada = True
+        else:
+            escalada = anterior is None or nivel > anterior
+
+        return Transicion(anterior, nivel, escalada, clima)
+
+    def confirmar(self, transicion: Transicion):
+        """
+        Registra como emitida una transición ya guardada y notificada.
+        """
+        self.nivel = transicion.nivel
+        self.riesgo_emitido = transicion.riesgo
+        self.transiciones += 1
+        self.ultimo_cambio = datetime.now().isoformat(timespec="seconds")
+
+    def estado(self) -> dict:
+        return {
+            "nivel": NIVELES_ALERTA[self.nivel] if self.nivel is not None else None,
+            "riesgo_emitido": self.riesgo_emitido,
+            "ultimo_clima": self.ultimo_clima,
+            "ultimo_cambio": self.ultimo_cambio,
+            "evaluaciones": self.evaluaciones,
+            "transiciones": self.transiciones,
+        }
+
+# Fin evaluador_alertas.py
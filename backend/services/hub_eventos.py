@@ -0,0 +1,148 @@
+# Inicio hub_eventos.py
+
+# backend/services/hub_eventos.py
+
+# Importaciones necesarias para el hub de eventos en tiempo real
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Optional
+from backend.services.serializacion import codificar
+
+# Segundos entre comentarios keep-alive del flujo SSE
+INTERVALO_KEEPALIVE = 15
+
+# Milisegundos que espera el navegador antes de reconectar
+REINTENTO_MS = 5000
+
+
+class _Suscriptor:
+    """
+    Conexión abierta de un cliente: su cola de eventos y el event loop que la atiende.
+    """
+    __slots__ = ("id_usuario", "cola", "loop", "desbordado")
+
+    def __init__(self, id_usuario: Optional[str], capacidad: int, loop: asyncio.AbstractEventLoop):
+        self.id_usuario = id_usuario
+        self.cola: asyncio.Queue = asyncio.Queue(maxsize=capacidad)
+        self.loop = loop
+        self.desbordado = False
+
+    def entregar(self, evento: dict):
+        try:
+            self.cola.put_nowait(evento)
+        except asyncio.QueueFull:
+            # Cliente lento: se cierra su flujo y al reconectar recupera desde el historial
+            self.desbordado = True
+
+
+# Clase principal del hub de eventos
+class HubEventos:
+    """
+    Pub/sub en memoria del proceso para empujar notificaciones y alertas a los
+    clientes conectados por Server-Sent Events. Cada evento recibe un id creciente
+    y se guarda en un historial acotado, de modo que un cliente que reconecta con
+    Last-Event-ID recibe solo lo que se perdió. Los ids parten del reloj en
+    milisegundos para seguir creciendo después de reiniciar el servidor.
+    'publicar' es seguro desde cualquier hilo (los modelos corren en el threadpool).
+    """
+
+    def __init__(self, capacidad_historial: int = 1000, capacidad_cola: int = 100):
+        self.capacidad_cola = capacidad_cola
+        self._historial = deque(maxlen=capacidad_historial)
+        self._suscriptores = set()
+        self._ultimo_id = int(time.time() * 1000)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _visible(evento: dict, id_usuario: Optional[str]) -> bool:
+        return evento["id_usuario"] is None or str(evento["id_usuario"]) == str(id_usuario)
+
+    def publicar(self, tipo: str, datos, id_usuario: Optional[str] = None) -> dict:
+        """
+        Publica un evento para todos (id_usuario=None) o para un usuario concreto.
+        """
+        with self._lock:
+            self._ultimo_id += 1
+            evento = {"id": self._ultimo_id, "tipo": tipo, "datos": datos, "id_usuario": id_usuario}
+            self._historial.append(evento)
+            destinatarios = [s for s in self._suscriptores if self._visible(evento, s.id_usuario)]
+
+        for suscriptor in destinatarios:
+            try:
+                suscriptor.loop.call_soon_threadsafe(suscriptor.entregar, evento)
+            except RuntimeError:
+                # El event loop del suscriptor ya se cerró
+                self.cancelar(suscriptor)
+        return evento
+
+    def suscribir(self, id_usuario: Optional[str], ultimo_id: Optional[int] = None):
+        """
+        Registra un suscriptor y retorna (suscriptor, pendientes, completo): los eventos
+        del historial posteriores a 'ultimo_id' y si el historial alcanzó a cubrirlos.
+        Debe llamarse desde el event loop que atenderá la conexión.
+        """
+        suscriptor = _Suscriptor(id_usuario, self.capacidad_cola, asyncio.get_running_loop())
+        with self._lock:
+            self._suscriptores.add(suscriptor)
+            pendientes, completo = [], True
+            if ultimo_id is not None:
+                pendientes = [e for e in self._historial if e["id"] > ultimo_id and self._visible(e, id_usuario)]
+                # Si el evento siguiente a 'ultimo_id' ya salió del historial hay un hueco
+                completo = not self._historial or self._historial[0]["id"] <= ultimo_id + 1 \
+                    or ultimo_id >= self._ultimo_id
+        return suscriptor, pendientes, completo
+
+    def cancelar(self, suscriptor: _Suscriptor):
+        with self._lock:
+            self._suscriptores.discard(suscriptor)
+
+    @staticmethod
+    def formatear(evento: dict) -> str:
+        datos = codificar(evento["datos"]).decode()
+        return f"id: {evento['id']}\nevent: {evento['tipo']}\ndata: {datos}\n\n"
+
+    async def flujo(self, id_usuario: Optional[str], ultimo_id: Optional[int] = None):
+        """
+        Generador del cuerpo text/event-stream para una conexión: primero los
+        eventos perdidos desde 'ultimo_id', luego los nuevos a medida que se publican.
+        Si el historial ya no cubre la desconexión envía un evento 'reinicio' para
+        que el cliente recargue su estado completo.
+        """
+        suscriptor, pendientes, completo = self.suscribir(id_usuario, ultimo_id)
+        try:
+            yield f"retry: {REINTENTO_MS}\n\n"
+            if not completo:
+                yield f"id: {self._ultimo_id}\nevent: reinicio\ndata: {{}}\n\n"
+            ultimo_enviado = ultimo_id or 0
+            for evento in pendientes:
+                ultimo_enviado = evento["id"]
+                yield self.formatear(evento)
+
+            while not suscriptor.desbordado:
+                try:
+                    evento = await asyncio.wait_for(suscriptor.cola.get(), INTERVALO_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                # Un evento pudo llegar por el historial y por la cola a la vez
+                if evento["id"] > ultimo_enviado:
+                    ultimo_enviado = evento["id"]
+                    yield self.formatear(evento)
+        finally:
+            self.cancelar(suscriptor)
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                "suscriptores": len(self._suscriptores),
+                "eventos_en_historial": len(self._historial),
+                "ultimo_id": self._ultimo_id,
+            }
+
+
+# Instancia compartida por toda la aplicación
+hub_eventos = HubEventos()
+
+# Fin hub_eventos.py
@@ -0,0 +1,238 @@
+# Inicio indice_espacial.py
+
+# backend/services/indice_espacial.py
+
+# Importaciones necesarias para el índice espacial en memoria
+import asyncio
+import heapq
+import math
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Radio medio de la Tierra en kilómetros
+RADIO_TIERRA_KM = 6371.0088
+
+# Kilómetros por grado de latitud
+KM_POR_GRADO = 111.32
+
+
+def distancia_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Distancia haversine en kilómetros entre dos coordenadas.
+    """
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * RADIO_TIERRA_KM * math.asin(math.sqrt(a))
+
+
+# Clase principal del índice espacial
+class IndiceEspacial:
+    """
+    Índice espacial en memoria basado en una grilla regular de celdas (tipo geohash).
+    Guarda los recursos activos de una tabla y responde consultas de los k más
+    cercanos recorriendo anillos de celdas alrededor del punto consultado, sin
+    escanear la tabla. Se mantiene al día con crear/actualizar/eliminar y se recarga
+    cada 'vigencia' segundos para converger entre procesos, aplicando solo las
+    diferencias. Las peticiones concurrentes comparten una sola recarga, y los
+    cambios hechos mientras corre se vuelven a aplicar sobre el resultado, así
+    que una lectura anterior a ellos no los deshace. Los oyentes suscritos
+    reciben cada alta y baja.
+    """
+
+    def __init__(self, campo_id: str, tamano_celda: float = 0.01, vigencia: float = 300):
+        self.campo_id = campo_id
+        self.tamano_celda = tamano_celda  # grados (~1.1 km)
+        self.vigencia = vigencia
+        self._celdas: Dict[Tuple[int, int], Dict[str, dict]] = {}
+        self._posiciones: Dict[str, Tuple[int, int]] = {}
+        self._cargado_en: Optional[float] = None
+        self._oyentes: List = []
+        self._lock = threading.RLock()
+        # Recarga en curso y cambios (alta, registro o id) recibidos mientras corre
+        self._carga: Optional[asyncio.Task] = None
+        self._pendientes: Optional[List[Tuple[bool, object]]] = None
+
+    # ------------------------------ Mantenimiento ------------------------------
+
+    def suscribir(self, oyente):
+        """
+        Registra un oyente con métodos agregar(registro) y quitar(registro)
+        que se invocan con cada cambio del índice.
+        """
+        with self._lock:
+            self._oyentes.append(oyente)
+            for registros in self._celdas.values():
+                for registro in registros.values():
+                    oyente.agregar(registro)
+
+    def necesita_carga(self) -> bool:
+        return self._cargado_en is None or time.monotonic() - self._cargado_en > self.vigencia
+
+    async def asegurar_cargado(self, cargar: Callable[[], Awaitable[List[dict]]]):
+        """
+        Carga el índice desde la base de datos si nunca se cargó o si venció su vigencia.
+        'cargar' es una función asíncrona que retorna todos los registros activos.
+        """
+        if not self.necesita_carga():
+            return
+        if self._carga is None:
+            self._carga = asyncio.ensure_future(self._cargar(cargar))
+        # shield: si un cliente se desconecta, la recarga sigue para los demás
+        await asyncio.shield(self._carga)
+
+    async def _cargar(self, cargar: Callable[[], Awaitable[List[dict]]]):
+        with self._lock:
+            self._pendientes = []
+        try:
+            registros = await cargar()
+            with self._lock:
+                self._reemplazar(registros)
+                # La lectura pudo empezar antes de estos cambios: se aplican encima
+                for alta, dato in self._pendientes:
+                    if alta:
+                        self._aplicar(dato)
+                    else:
+                        self._quitar(dato)
+        finally:
+            with self._lock:
+                self._pendientes = None
+            self._carga = None
+
+    def _reemplazar(self, registros: List[dict]):
+        """
+        Ajusta el índice al contenido de la tabla aplicando solo las diferencias,
+        para que los oyentes no tengan que reconstruirse en cada recarga.
+        """
+        nuevos = {
+            str(r[self.campo_id]): r for r in registros
+            if r.get("latitud") is not None and r.get("longitud") is not None
+        }
+        for id_registro in list(self._posiciones):
+            if id_registro not in nuevos:
+                self._quitar(id_registro)
+        for id_registro, registro in nuevos.items():
+            celda = self._posiciones.get(id_registro)
+            if celda is not None and self._celdas[celda][id_registro] == registro:
+                continue
+            self._quitar(id_registro)
+            self._insertar(registro)
+        self._cargado_en = time.monotonic()
+
+    def _celda(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (math.floor(lat / self.tamano_celda), math.floor(lon / self.tamano_celda))
+
+    def _insertar(self, registro: dict):
+        id_registro = str(registro[self.campo_id])
+        celda = self._celda(float(registro["latitud"]), float(registro["longitud"]))
+        self._celdas.setdefault(celda, {})[id_registro] = registro
+        self._posiciones[id_registro] = celda
+        for oyente in self._oyentes:
+            oyente.agregar(registro)
+
+    def _quitar(self, id_registro):
+        id_registro = str(id_registro)
+        celda = self._posiciones.pop(id_registro, None)
+        if celda is None:
+            return
+        registro = self._celdas[celda].pop(id_registro)
+        if not self._celdas[celda]:
+            del self._celdas[celda]
+        for oyente in self._oyentes:
+            oyente.quitar(registro)
+
+    def _aplicar(self, registro: dict):
+        self._quitar(registro[self.campo_id])
+        if registro.get("estado") == "activa" and registro.get("latitud") is not None \
+                and registro.get("longitud") is not None:
+            self._insertar(registro)
+
+    def eliminar(self, id_registro):
+        """
+        Quita un recurso del índice si estaba presente.
+        """
+        with self._lock:
+            if self._pendientes is not None:
+                self._pendientes.append((False, id_registro))
+            self._quitar(id_registro)
+
+    def sincronizar(self, registro: Optional[dict]):
+        """
+        Refleja un registro creado o actualizado: lo indexa si está activo y tiene
+        coordenadas, o lo quita en caso contrario. Si el índice no se ha cargado,
+        solo lo recuerda para la carga en curso.
+        """
+        if not registro:
+            return
+        with self._lock:
+            if self._pendientes is not None:
+                self._pendientes.append((True, registro))
+            if self._cargado_en is not None:
+                self._aplicar(registro)
+
+    # ------------------------------ Consultas ------------------------------
+
+    def cercanos(self, lat: float, lon: float, radio_km: float, k: int):
+        """
+        Retorna hasta k recursos dentro de radio_km ordenados por distancia,
+        cada uno con su campo 'distancia_km'.
+        """
+        with self._lock:
+            ci, cj = self._celda(lat, lon)
+            # Ancho mínimo de una celda en km (el de longitud se reduce con la latitud)
+            km_celda = self.tamano_celda * KM_POR_GRADO * max(0.01, math.cos(math.radians(abs(lat) + self.tamano_celda)))
+            max_anillo = math.ceil(radio_km / km_celda) + 1
+
+            mejores: List[Tuple[float, str, dict]] = []  # heap de máximos con distancias negativas
+
+            def evaluar(celda):
+                for id_registro, registro in self._celdas.get(celda, {}).items():
+                    d = distancia_km(lat, lon, float(registro["latitud"]), float(registro["longitud"]))
+                    if d > radio_km:
+                        continue
+                    if len(mejores) < k:
+                        heapq.heappush(mejores, (-d, id_registro, registro))
+                    elif d < -mejores[0][0]:
+                        heapq.heapreplace(mejores, (-d, id_registro, registro))
+
+            def completo(r):
+                # Las celdas del anillo r+1 están al menos a r celdas de distancia
+                return len(mejores) >= k and -mejores[0][0] <= r * km_celda
+
+            if (2 * max_anillo + 1) ** 2 > len(self._celdas):
+                # Pocas celdas ocupadas: recorrerlas ordenadas por anillo es más barato
+                # que visitar todas las celdas vacías del radio
+                km_lat = self.tamano_celda * KM_POR_GRADO
+                ocupadas = sorted(
+                    (math.hypot(max(0, abs(i - ci) - 1) * km_lat, max(0, abs(j - cj) - 1) * km_celda), (i, j))
+                    for (i, j) in self._celdas
+                )
+                # Cada celda se visita en orden de su distancia mínima posible al punto
+                for cota, celda in ocupadas:
+                    if cota > radio_km or (len(mejores) >= k and -mejores[0][0] <= cota):
+                        break
+                    evaluar(celda)
+            else:
+                for r in range(max_anillo + 1):
+                    if r == 0:
+                        evaluar((ci, cj))
+                    else:
+                        for d in range(-r, r + 1):
+                            evaluar((ci - r, cj + d))
+                            evaluar((ci + r, cj + d))
+                        for d in range(-r + 1, r):
+                            evaluar((ci + d, cj - r))
+                            evaluar((ci + d, cj + r))
+                    if completo(r):
+                        break
+
+            resultado = []
+            for d, _, registro in sorted(mejores, key=lambda x: -x[0]):
+                item = dict(registro)
+                item["distancia_km"] = round(-d, 3)
+                resultado.append(item)
+            return resultado
+
+# Fin indice_espacial.py
@@ -0,0 +1,131 @@
+# Inicio indices_calor.py
+
+# backend/services/indices_calor.py
+
+# Importaciones necesarias para el cálculo vectorizado de índices de calor
+import numpy as np
+
+# Límites inferiores de WBGT para los niveles de riesgo térmico 1 a 5
+UMBRALES_WBGT = np.array([24.0, 27.0, 30.0, 33.0, 36.0])
+
+# Niveles de alerta climática indexados por su código (0, 1, 2)
+NIVELES_ALERTA = ("bajo", "medio", "alto")
+
+# Umbrales de entrada a cada nivel de alerta: basta con alcanzar uno de ellos
+UMBRALES_ALERTA = {
+    2: {"temperatura": 36.0, "uv_index": 9.0, "sensacion_termica": 40.0},
+    1: {"temperatura": 33.0},
+}
+
+
+def calcular_indices(temperatura, humedad, sensacion, uv):
+    """
+    Calcula en una sola pasada los índices de calor para arreglos horarios completos.
+    Recibe secuencias de igual longitud (listas, arrays o escalares) y retorna arreglos
+    NumPy con heat_level, hydration_level, wbgt, thermal_risk y el código de alerta
+    (0=bajo, 1=medio, 2=alto). Las horas con datos ausentes (NaN) quedan marcadas
+    en la máscara 'valido'.
+    """
+    t = np.asarray(temperatura, dtype=np.float64)
+    h = np.asarray(humedad, dtype=np.float64)
+    s = np.asarray(sensacion, dtype=np.float64)
+    u = np.asarray(uv, dtype=np.float64)
+
+    valido = ~(np.isnan(t) | np.isnan(h) | np.isnan(s) | np.isnan(u))
+
+    # Niveles personalizados de calor (0-100) e hidratación (1-10)
+    heat_level = np.clip((s - 20) * 4, 0, 100)
+    hydration_level = np.clip(np.round(1 + (h / 100) * 3 + (t / 40) * 5), 1, 10)
+
+    # Riesgo térmico por tramos de WBGT aproximado
+    wbgt = (0.7 * s) + (0.3 * (h / 10))
+    thermal_risk = np.searchsorted(UMBRALES_WBGT, wbgt, side="right")
+
+    # Reglas de alerta: alto si temp >= 36, UV >= 9 o sensación >= 40; medio si temp >= 33
+    alto, medio = UMBRALES_ALERTA[2], UMBRALES_ALERTA[1]
+    alerta = np.where(
+        (t >= alto["temperatura"]) | (u >= alto["uv_index"]) | (s >= alto["sensacion_termica"]), 2,
+        np.where(t >= medio["temperatura"], 1, 0)
+    )
+
+    return {
+        "heat_level": heat_level,
+        "hydration_level": hydration_level,
+        "wbgt": wbgt,
+        "thermal_risk": thermal_risk,
+        "alerta": alerta,
+        "valido": valido,
+    }
+
+
+def nivel_alerta(codigo: int) -> str:
+    """
+    Traduce el código numérico de alerta a su nombre ("bajo", "medio" o "alto").
+    """
+    return NIVELES_ALERTA[int(codigo)]
+
+
+def a_lista(valores, valido, tipo=float):
+    """
+    Convierte un arreglo NumPy a lista de Python, con None en las horas sin datos.
+    """
+    if valido.all():
+        return valores.astype(tipo).tolist()
+    limpios = np.where(valido, valores, 0).astype(tipo).astype(object)
+    return np.where(valido, limpios, None).tolist()
+
+
+def nombres_alerta(alerta, valido):
+    """
+    Traduce un arreglo de códigos de alerta a la lista de nombres, con None en las horas sin datos.
+    """
+    nombres = np.array(NIVELES_ALERTA, dtype=object)[alerta]
+    return np.where(valido, nombres, None).tolist()
+
+
+def ventanas_riesgo(tiempos, temperatura, humedad, sensacion, uv):
+    """
+    Aplica las reglas de alerta a un horizonte horario completo en una sola pasada y
+    agrupa las horas consecutivas con alerta media o alta en ventanas. Retorna una lista
+    con, por ventana: primera y última hora, cantidad de horas, nivel máximo, horas en
+    nivel alto, riesgo térmico máximo y la hora de mayor sensación térmica con sus valores.
+    """
+    indices = calcular_indices(temperatura, humedad, sensacion, uv)
+    alerta, valido = indices["alerta"], indices["valido"]
+    t = np.asarray(temperatura, dtype=np.float64)
+    s = np.asarray(sensacion, dtype=np.float64)
+    u = np.asarray(uv, dtype=np.float64)
+
+    # Bordes de las rachas de horas en riesgo: posiciones pares = inicio, impares = fin (exclusivo)
+    en_riesgo = ((alerta >= 1) & valido).astype(np.int8)
+    bordes = np.flatnonzero(np.diff(np.concatenate(([0], en_riesgo, [0]))))
+    if not len(bordes):
+        return []
+    inicios, fines = bordes[0::2], bordes[1::2]
+
+    # reduceat sobre [inicio, fin, inicio, fin...]: las posiciones pares reducen cada ventana
+    cortes = bordes if bordes[-1] < len(alerta) else bordes[:-1]
+    nivel = np.maximum.reduceat(alerta, cortes)[0::2]
+    horas_alto = np.add.reduceat((alerta == 2).astype(np.int64), cortes)[0::2]
+    riesgo = np.maximum.reduceat(indices["thermal_risk"], cortes)[0::2]
+
+    ventanas = []
+    for i, (inicio, fin) in enumerate(zip(inicios, fines)):
+        pico = inicio + int(np.argmax(s[inicio:fin]))
+        ventanas.append({
+            "inicio": tiempos[inicio],
+            "fin": tiempos[fin - 1],
+            "horas": int(fin - inicio),
+            "nivel": NIVELES_ALERTA[int(nivel[i])],
+            "horas_alto": int(horas_alto[i]),
+            "thermal_risk_max": int(riesgo[i]),
+            "pico": {
+                "hora": tiempos[pico],
+                "temperatura": float(t[pico]),
+                "sensacion_termica": float(s[pico]),
+                "uv_index": float(u[pico]),
+            },
+        })
+    return ventanas
+
+# Fin indices_calor.py
@@ -0,0 +1,129 @@
+# Inicio registro_tareas.py
+
+# backend/services/registro_tareas.py
+
+# Importaciones necesarias para el registro de tareas programadas
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+
+class MetricasTarea:
+    """
+    Contadores y tiempos de ejecución de una tarea.
+    """
+    __slots__ = ("ejecuciones", "errores", "omitidas", "total", "ultima", "maxima", "ultima_ejecucion", "ultimo_error")
+
+    def __init__(self):
+        self.ejecuciones = 0
+        self.errores = 0
+        self.omitidas = 0
+        self.total = 0.0
+        self.ultima = 0.0
+        self.maxima = 0.0
+        self.ultima_ejecucion: Optional[str] = None
+        self.ultimo_error: Optional[str] = None
+
+    def registrar(self, duracion: float, error: Optional[Exception] = None):
+        self.ejecuciones += 1
+        self.total += duracion
+        self.ultima = duracion
+        self.maxima = max(self.maxima, duracion)
+        self.ultima_ejecucion = datetime.now().isoformat(timespec="seconds")
+        if error is not None:
+            self.errores += 1
+            self.ultimo_error = str(error)
+
+    def resumen(self) -> dict:
+        return {
+            "ejecuciones": self.ejecuciones,
+            "errores": self.errores,
+            "omitidas": self.omitidas,
+            "ultima_ms": round(self.ultima * 1000, 1),
+            "promedio_ms": round(self.total / self.ejecuciones * 1000, 1) if self.ejecuciones else 0.0,
+            "maxima_ms": round(self.maxima * 1000, 1),
+            "ultima_ejecucion": self.ultima_ejecucion,
+            "ultimo_error": self.ultimo_error,
+        }
+
+
+# Clase principal del registro de tareas
+class RegistroTareas:
+    """
+    Tareas programadas con sus métricas de ejecución. Con un arriendo (ver
+    backend/database/arriendo.py) solo las ejecuta el proceso líder: los demás
+    procesos que programan las mismas tareas las omiten, así que correr varias
+    réplicas de la API o del worker no multiplica las ejecuciones.
+    """
+
+    def __init__(self, arriendo=None):
+        self.arriendo = arriendo
+        self._tareas: Dict[str, dict] = {}
+        # Funciones que se invocan cuando este proceso toma el liderazgo
+        self.al_tomar_liderazgo: List[Callable[[], None]] = []
+
+    def registrar(self, nombre: str, funcion: Callable[[], Awaitable], **intervalo):
+        """
+        Registra una tarea asíncrona con su intervalo (argumentos de un disparador
+        'interval' de APScheduler, por ejemplo minutes=10).
+        """
+        self._tareas[nombre] = {"funcion": funcion, "intervalo": intervalo, "metricas": MetricasTarea()}
+
+    async def ejecutar(self, nombre: str):
+        """
+        Ejecuta una tarea si este proceso es el líder y registra su duración y errores.
+        """
+        tarea = self._tareas[nombre]
+        metricas: MetricasTarea = tarea["metricas"]
+        if self.arriendo is not None and not self.arriendo.es_lider():
+            metricas.omitidas += 1
+            return
+
+        inicio = time.perf_counter()
+        error = None
+        try:
+            await tarea["funcion"]()
+        except Exception as e:
+            error = e
+            print(f"Error en tarea programada '{nombre}': {e}")
+        finally:
+            metricas.registrar(time.perf_counter() - inicio, error)
+
+    async def renovar_arriendo(self):
+        """
+        Toma o renueva el arriendo; se programa a un tercio de su duración para no perderlo entre renovaciones.
+        """
+        era_lider = self.arriendo.es_lider()
+        es_lider = await self.arriendo.adquirir()
+        if es_lider != era_lider:
+            print(f"Tareas programadas: {'este proceso es el líder' if es_lider else 'se perdió el liderazgo'} ({self.arriendo.dueno})")
+            if es_lider:
+                for funcion in self.al_tomar_liderazgo:
+                    funcion()
+
+    def programar(self, scheduler):
+        """
+        Agrega las tareas registradas (y la renovación del arriendo) a un scheduler de APScheduler.
+        """
+        if self.arriendo is not None:
+            scheduler.add_job(self.renovar_arriendo, "interval", seconds=self.arriendo.duracion / 3,
+                              id="renovar_arriendo", next_run_time=datetime.now())
+        for nombre, tarea in self._tareas.items():
+            # coalesce + max_instances: una ejecución atrasada no se acumula con la siguiente
+            scheduler.add_job(self.ejecutar, "interval", args=[nombre], id=nombre,
+                              coalesce=True, max_instances=1, **tarea["intervalo"])
+
+    async def detener(self):
+        """
+        Libera el arriendo para que otro proceso tome el liderazgo sin esperar su vencimiento.
+        """
+        if self.arriendo is not None:
+            await self.arriendo.liberar()
+
+    def estadisticas(self) -> dict:
+        return {
+            "lider": self.arriendo.es_lider() if self.arriendo is not None else True,
+            "tareas": {nombre: tarea["metricas"].resumen() for nombre, tarea in self._tareas.items()},
+        }
+
+# Fin registro_tareas.py
@@ -0,0 +1,74 @@
+# Inicio serializacion.py
+
+# backend/services/serializacion.py
+
+# Importaciones necesarias para la serialización de respuestas
+import gzip
+from typing import Any
+import orjson
+from fastapi.responses import ORJSONResponse
+
+# brotli es opcional: sin él solo se comprime con gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Opciones comunes: claves no textuales (ids numéricos) y arreglos NumPy sin convertir a listas
+OPCIONES_ORJSON = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# Cuerpos menores que este umbral no compensan el costo de comprimir
+UMBRAL_GZIP = 1024
+NIVEL_GZIP = 6
+# Calidad 5: cerca de la tasa de gzip 9 a una velocidad similar a gzip 6
+CALIDAD_BROTLI = 5
+
+# Codificaciones disponibles, en orden de preferencia
+CODIFICACIONES = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def codificar(datos: Any) -> bytes:
+    """
+    Serializa a JSON (UTF-8) con orjson. Los tipos que orjson no conoce
+    (Decimal, UUID de otras librerías...) se convierten con str, como hacía json.dumps(default=str).
+    """
+    return orjson.dumps(datos, default=str, option=OPCIONES_ORJSON)
+
+
+def comprimir(cuerpo: bytes, codificacion: str = "gzip") -> bytes:
+    """
+    Comprime un cuerpo ya serializado con gzip o brotli ("br"). En gzip, mtime=0
+    hace que el resultado dependa solo del contenido.
+    """
+    if codificacion == "br":
+        return brotli.compress(cuerpo, quality=CALIDAD_BROTLI)
+    return gzip.compress(cuerpo, compresslevel=NIVEL_GZIP, mtime=0)
+
+
+def elegir_codificacion(accept_encoding: str):
+    """
+    Retorna la codificación preferida de CODIFICACIONES que acepta el cliente
+    según su cabecera Accept-Encoding (las que llevan q=0 se excluyen), o None.
+    """
+    aceptadas = set()
+    for parte in accept_encoding.lower().split(","):
+        nombre, _, parametros = parte.partition(";")
+        calidad = parametros.replace(" ", "")
+        if calidad.startswith("q=") and not calidad[2:].strip("0."):
+            continue
+        aceptadas.add(nombre.strip())
+    for codificacion in CODIFICACIONES:
+        if codificacion in aceptadas or "*" in aceptadas:
+            return codificacion
+    return None
+
+
+class RespuestaJSON(ORJSONResponse):
+    """
+    Clase de respuesta por defecto de la API: serializa con orjson en vez de json.dumps.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return codificar(content)
+
+# Fin serializacion.py
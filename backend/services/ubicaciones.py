@@ -0,0 +1,80 @@
+# Inicio ubicaciones.py
+
+# backend/services/ubicaciones.py
+
+# Importaciones necesarias para el registro de ubicaciones
+import unicodedata
+from typing import Dict, Optional, Tuple
+
+# Tamaño de la celda de la grilla climática en grados (~5.5 km en Cartagena).
+# Las ubicaciones que caen en la misma celda comparten un único pronóstico.
+TAMANO_CELDA = 0.05
+
+# Registro de barrios de Cartagena y municipios cercanos: clave -> (nombre, latitud, longitud)
+UBICACIONES: Dict[str, Tuple[str, float, float]] = {
+    "cartagena": ("Cartagena", 10.3910, -75.4794),
+    "centro-historico": ("Centro Histórico", 10.4236, -75.5490),
+    "getsemani": ("Getsemaní", 10.4206, -75.5460),
+    "bocagrande": ("Bocagrande", 10.3990, -75.5550),
+    "manga": ("Manga", 10.4130, -75.5350),
+    "crespo": ("Crespo", 10.4430, -75.5150),
+    "la-boquilla": ("La Boquilla", 10.4770, -75.4960),
+    "el-pozon": ("El Pozón", 10.3990, -75.4600),
+    "mamonal": ("Mamonal", 10.3300, -75.5050),
+    "bayunca": ("Bayunca", 10.5370, -75.4120),
+    "turbaco": ("Turbaco", 10.3320, -75.4140),
+    "turbana": ("Turbaná", 10.2740, -75.4430),
+    "arjona": ("Arjona", 10.2550, -75.3440),
+    "santa-rosa": ("Santa Rosa", 10.4440, -75.3690),
+    "clemencia": ("Clemencia", 10.5670, -75.3280),
+    "santa-catalina": ("Santa Catalina", 10.6040, -75.2870),
+}
+
+
+def normalizar(texto: str) -> str:
+    """
+    Convierte un nombre libre ("El Pozón", "centro histórico") a la clave del registro.
+    """
+    sin_tildes = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+    return "-".join(sin_tildes.lower().replace("_", " ").split())
+
+
+def resolver_ubicacion(texto: str) -> Optional[dict]:
+    """
+    Busca una ubicación registrada por clave o nombre.
+    Retorna un diccionario con clave, nombre y coordenadas, o None si no existe.
+    """
+    clave = normalizar(texto)
+    if clave not in UBICACIONES:
+        return None
+    nombre, lat, lon = UBICACIONES[clave]
+    return {"clave": clave, "nombre": nombre, "latitud": lat, "longitud": lon}
+
+
+def celda(lat: float, lon: float) -> Tuple[float, float]:
+    """
+    Retorna el centro de la celda de la grilla climática que contiene la coordenada.
+    """
+    return (
+        round(round(lat / TAMANO_CELDA) * TAMANO_CELDA, 4),
+        round(round(lon / TAMANO_CELDA) * TAMANO_CELDA, 4),
+    )
+
+
+def listar_ubicaciones():
+    """
+    Retorna todas las ubicaciones registradas con su celda climática.
+    """
+    return [
+        {"clave": clave, "nombre": nombre, "latitud": lat, "longitud": lon, "celda": celda(lat, lon)}
+        for clave, (nombre, lat, lon) in UBICACIONES.items()
+    ]
+
+
+def celdas_registradas():
+    """
+    Retorna el conjunto de celdas cubiertas por el registro.
+    """
+    return {celda(lat, lon) for _, lat, lon in UBICACIONES.values()}
+
+# Fin ubicaciones.py
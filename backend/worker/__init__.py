@@ -0,0 +1,7 @@
+# Inicio __init__.py
+
+# backend/worker/__init__.py
+
+# Archivo de inicialización del módulo worker (tareas programadas fuera de la API)
+
+# Fin __init__.py
@@ -0,0 +1,63 @@
+# Inicio __main__.py
+
+# backend/worker/__main__.py
+
+# Worker dedicado de tareas programadas: ejecuta las alertas automáticas fuera
+# de la API. Varias réplicas pueden correr a la vez; solo la que tiene el
+# arriendo de liderazgo ejecuta las tareas.
+# Uso: python -m backend.worker
+
+import asyncio
+import signal
+from backend.worker.tareas import crear_scheduler, registro_tareas
+from backend.services.cliente_clima import ClienteClima
+from backend.database.supabase_config import SupabaseAsync
+
+# Minutos entre cada resumen de métricas en el log
+INTERVALO_RESUMEN = 30
+
+
+def imprimir_resumen():
+    estadisticas = registro_tareas.estadisticas()
+    print(f"Worker de tareas ({'líder' if estadisticas['lider'] else 'en espera'}):")
+    for nombre, metricas in estadisticas["tareas"].items():
+        print(
+            f"  {nombre}: {metricas['ejecuciones']} ejecuciones, {metricas['errores']} errores, "
+            f"{metricas['omitidas']} omitidas, última {metricas['ultima_ms']} ms, "
+            f"promedio {metricas['promedio_ms']} ms, máxima {metricas['maxima_ms']} ms"
+        )
+
+
+async def main():
+    detener = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for senal in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(senal, detener.set)
+        except NotImplementedError:
+            # Windows: Ctrl+C llega como KeyboardInterrupt
+            pass
+
+    scheduler = crear_scheduler()
+    scheduler.add_job(imprimir_resumen, "interval", minutes=INTERVALO_RESUMEN, id="resumen_metricas")
+    scheduler.start()
+    print(f"Worker de tareas iniciado ({registro_tareas.arriendo.dueno})")
+
+    try:
+        await detener.wait()
+    finally:
+        scheduler.shutdown(wait=False)
+        await registro_tareas.detener()
+        imprimir_resumen()
+        await ClienteClima.cerrar()
+        await SupabaseAsync.cerrar()
+        print("Worker de tareas detenido")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+# Fin __main__.py
@@ -0,0 +1,80 @@
+# Inicio tareas.py
+
+# backend/worker/tareas.py
+
+# Importaciones necesarias para las tareas programadas
+import os
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from backend.models.clima_mdls import ClimaModel
+from backend.models.alertas_calor_mdls import AlertaCalorModel
+from backend.models.notificaciones_mdls import NotificacionModel
+from backend.database.arriendo import crear_arriendo
+from backend.services.registro_tareas import RegistroTareas
+from backend.services.evaluador_alertas import EvaluadorAlertas
+
+# Segundos que dura el liderazgo sin renovar; si el líder cae, otro proceso lo toma tras este tiempo
+DURACION_ARRIENDO = float(os.getenv("CALORSOS_ARRIENDO_DURACION", "60"))
+
+# Registro compartido por la API y el worker: solo el proceso líder ejecuta las tareas
+registro_tareas = RegistroTareas(crear_arriendo("tareas_programadas", DURACION_ARRIENDO))
+
+
+# ------------------------ ALERTAS AUTOMÁTICAS ------------------------
+
+# Último nivel evaluado: solo los cambios de nivel (o escaladas) escriben y notifican
+evaluador_alertas = EvaluadorAlertas()
+
+# Otro proceso pudo emitir alertas mientras este no era el líder
+registro_tareas.al_tomar_liderazgo.append(evaluador_alertas.reiniciar)
+
+
+async def tarea_alerta_automatica():
+    """
+    Tarea automática que consulta el clima (desde la caché de pronósticos) y lo
+    evalúa con histéresis. Solo cuando el nivel cambia o escala crea la alerta en
+    la base de datos y genera la notificación global; en el resto de las
+    ejecuciones no escribe nada. La transición se confirma en el evaluador solo
+    si ambas escrituras terminan; si no, la siguiente ejecución la reintenta.
+    Los errores los registra RegistroTareas.
+    """
+    clima = await ClimaModel.obtener_clima("Cartagena")
+
+    # Tras arrancar o tomar el liderazgo se parte del nivel de la última alerta guardada
+    if not evaluador_alertas.restaurado:
+        alerta, _ = await AlertaCalorModel.obtener_alerta_actual()
+        evaluador_alertas.restaurar(alerta.get("nivel_riesgo") if alerta else None)
+
+    transicion = evaluador_alertas.evaluar(clima)
+    if transicion is None:
+        return
+
+    # Crear alerta con el nuevo nivel (sin consulta de duplicados: el evaluador ya decidió)
+    await AlertaCalorModel.crear_alerta(
+        temperatura=clima["temperatura"],
+        humedad=clima["humedad"],
+        indice_uv=clima["uv_index"],
+        nivel_riesgo=transicion.nombre,
+        estado="activa"
+    )
+
+    # Enviar notificaciones globales
+    await NotificacionModel.crear_notificaciones_globales(transicion.mensaje(), deduplicar=False)
+    evaluador_alertas.confirmar(transicion)
+
+    print(f"Alerta de calor {transicion.nombre} generada automáticamente.")
+
+# Ejecutar la tarea de alertas cada 10 minutos
+registro_tareas.registrar("alerta_automatica", tarea_alerta_automatica, minutes=10)
+
+# ---------------------------------------------------------------------
+
+
+def crear_scheduler() -> AsyncIOScheduler:
+    """
+    Scheduler sobre el event loop actual con las tareas registradas y la renovación del arriendo.
+    """
+    scheduler = AsyncIOScheduler()
+    registro_tareas.programar(scheduler)
+    return scheduler
+
+# Fin tareas.py
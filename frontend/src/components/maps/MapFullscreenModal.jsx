@@ -31,7 +31,8 @@ export default function MapFullscreenModal({
     selectedMarker = null,
     markerPosition = null,
     routeCoordinates = null,
-    highlightedMarker = null
+    highlightedMarker = null,
+    capasViewport = null
 }) {
     // Estado para controlar la visibilidad del mapa
     const [showMap, setShowMap] = useState(false);
@@ -93,6 +94,7 @@ export default function MapFullscreenModal({
                                     showExpandButton={false}
                                     routeCoordinates={routeCoordinates}
                                     highlightedMarker={highlightedMarker}
+                                    capasViewport={capasViewport}
                                 />
                             )}
                         </>
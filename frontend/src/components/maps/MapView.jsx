@@ -3,7 +3,7 @@
 // Componente principal para mostrar mapas interactivos con marcadores
 
 // Importaciones de React y hooks
-import React, { useEffect, useRef, useState } from "react";
+import React, { useEffect, useMemo, useRef, useState } from "react";
 
 // Importaciones de React Leaflet
 import {
@@ -13,6 +13,7 @@ import {
     Popup,
     Polyline,
     useMap,
+    useMapEvents,
 } from "react-leaflet";
 
 // Importación de Leaflet
@@ -24,6 +25,13 @@ import "./MapView.css";
 // Importación de utilidades de distancia
 import { calcularDistancia, formatearDistancia } from "../../utils/distanceUtils";
 
+// Servicio de marcadores por viewport
+import mapaService from "../../services/mapaService.js";
+
+// Vista inicial del mapa
+const CENTRO_INICIAL = [10.391, -75.479];
+const ZOOM_INICIAL = 13;
+
 // Configuración de íconos por defecto de Leaflet
 delete L.Icon.Default.prototype._getIconUrl;
 L.Icon.Default.mergeOptions({
@@ -93,16 +101,25 @@ function FitRouteBounds({ routeCoordinates }) {
 // Componente para reset general de vista
 function ResetView({ trigger, zonasFrescas, puntosHidratacion }) {
     const map = useMap();
+    const ultimoTrigger = useRef(trigger);
 
     useEffect(() => {
         if (trigger === 0) return;
+        const nuevoTrigger = trigger !== ultimoTrigger.current;
+        ultimoTrigger.current = trigger;
 
         const coords = [];
 
         zonasFrescas?.forEach(z => coords.push([z.latitud, z.longitud]));
         puntosHidratacion?.forEach(p => coords.push([p.latitud, p.longitud]));
 
-        if (coords.length === 0) return;
+        // Sin recursos cargados (marcadores por viewport): volver a la vista inicial
+        if (coords.length === 0) {
+            if (!nuevoTrigger) return;
+            map.closePopup();
+            map.setView(CENTRO_INICIAL, ZOOM_INICIAL, { animate: true });
+            return;
+        }
 
         const bounds = L.latLngBounds(coords);
 
@@ -124,12 +141,15 @@ function ResetView({ trigger, zonasFrescas, puntosHidratacion }) {
             zonasFrescas?.forEach(z => coords.push([z.latitud, z.longitud]));
             puntosHidratacion?.forEach(p => coords.push([p.latitud, p.longitud]));
 
-            if (coords.length === 0) return;
-
-            const bounds = L.latLngBounds(coords);
-            
             // Cerrar todos los popups
             map.closePopup();
+
+            if (coords.length === 0) {
+                map.setView(CENTRO_INICIAL, ZOOM_INICIAL, { animate: true });
+                return;
+            }
+
+            const bounds = L.latLngBounds(coords);
             
             map.fitBounds(bounds, {
                 padding: [50, 50],
@@ -146,6 +166,69 @@ function ResetView({ trigger, zonasFrescas, puntosHidratacion }) {
     return null;
 }
 
+// Componente que pide al backend los marcadores del área visible al mover o hacer zoom
+function ViewportLoader({ capas, onCargar }) {
+    const map = useMap();
+    const timeoutRef = useRef(null);
+    const solicitudRef = useRef(0);
+
+    const cargar = () => {
+        // Esperar a que el mapa se detenga para no pedir un viewport por cada paso
+        clearTimeout(timeoutRef.current);
+        timeoutRef.current = setTimeout(async () => {
+            const solicitud = ++solicitudRef.current;
+            try {
+                const data = await mapaService.obtenerMarcadoresViewport(map.getBounds(), map.getZoom(), capas);
+                // Descartar respuestas de un viewport anterior
+                if (solicitud === solicitudRef.current) onCargar(data);
+            } catch (error) {
+                console.error("Error cargando marcadores del mapa:", error);
+            }
+        }, 250);
+    };
+
+    useMapEvents({ moveend: cargar, zoomend: cargar });
+
+    useEffect(() => {
+        cargar();
+        return () => clearTimeout(timeoutRef.current);
+    }, [capas]);
+
+    return null;
+}
+
+// Marcador de un cluster: muestra la cantidad y al hacer clic acerca el mapa
+function ClusterMarker({ cluster, capa }) {
+    const map = useMap();
+    const icon = useMemo(() => new L.DivIcon({
+        html: `<span class="cluster-div-marker cluster-${capa}">${cluster.cantidad}</span>`,
+        className: "custom-div-icon-wrapper",
+        iconSize: [36, 36],
+        iconAnchor: [18, 18],
+    }), [capa, cluster.cantidad]);
+
+    return (
+        <Marker
+            position={[cluster.latitud, cluster.longitud]}
+            icon={icon}
+            eventHandlers={{
+                click: () => map.setView([cluster.latitud, cluster.longitud], Math.min(map.getZoom() + 2, 18), { animate: true }),
+            }}
+        />
+    );
+}
+
+// Recursos individuales de una capa del viewport, sin perder el seleccionado o resaltado
+function individualesDeCapa(capa, campoId, extras) {
+    const individuales = (capa?.marcadores || []).filter((m) => !m.es_cluster);
+    extras.forEach((extra) => {
+        if (extra?.[campoId] != null && !individuales.some((m) => m[campoId] === extra[campoId])) {
+            individuales.push(extra);
+        }
+    });
+    return individuales;
+}
+
 // Ícono verde para zonas frescas
 const greenDivIcon = new L.DivIcon({
     html: `<span class="zf-div-marker"></span>`,
@@ -199,9 +282,24 @@ export default function MapView({
     touchZoom = true,
     routeCoordinates = null, // Nueva prop para coordenadas de ruta
     highlightedMarker = null, // Nueva prop para resaltar marcador
+    capasViewport = null, // Capas ("puntos,zonas") que se piden al backend según el área visible
+    onViewportLoad = () => {}, // Recibe cada respuesta del viewport (incluye el total por capa)
 }) {
     // Referencias para marcadores
     const markerRefs = useRef({});
+
+    // Marcadores del área visible (solo con capasViewport)
+    const [viewport, setViewport] = useState(null);
+
+    // Con capasViewport, las zonas y puntos dibujados salen del viewport (más los
+    // seleccionados o resaltados, aunque estén dentro de un cluster)
+    const extras = [zonaSeleccionada, puntoSeleccionado, highlightedMarker];
+    const zonasMapa = capasViewport && viewport ? individualesDeCapa(viewport.zonas, "id_zona", extras) : zonasFrescas;
+    const puntosMapa = capasViewport && viewport ? individualesDeCapa(viewport.puntos, "id_punto", extras) : puntosHidratacion;
+    const clusters = capasViewport && viewport
+        ? ["zonas", "puntos"].flatMap((capa) =>
+            (viewport[capa]?.marcadores || []).filter((m) => m.es_cluster).map((m) => ({ ...m, capa })))
+        : [];
     
     // Estado para la ubicación del usuario
     const [userLocation, setUserLocation] = useState(null);
@@ -285,7 +383,7 @@ export default function MapView({
                 markerRefs.current[puntoSeleccionado.id_punto].openPopup();
             } catch {}
         }
-    }, [zonaSeleccionada, puntoSeleccionado]);
+    }, [zonaSeleccionada, puntoSeleccionado, viewport]);
 
     // Abrir popup cuando hay marcador resaltado
     useEffect(() => {
@@ -302,13 +400,13 @@ export default function MapView({
                 }, 500);
             }
         }
-    }, [highlightedMarker]);
+    }, [highlightedMarker, viewport]);
 
     return (
         <div className={mini ? "mv-container mini" : "mv-container full"}>
             <MapContainer
-                center={[10.391, -75.479]}
-                zoom={13}
+                center={CENTRO_INICIAL}
+                zoom={ZOOM_INICIAL}
                 className="mv-map"
                 maxBounds={[
                     [10.30, -75.60],
@@ -329,6 +427,14 @@ export default function MapView({
             >
                 <ForceResize />
 
+                {/* Marcadores por viewport: se piden al mover o hacer zoom */}
+                {capasViewport && (
+                    <ViewportLoader
+                        capas={capasViewport}
+                        onCargar={(data) => { setViewport(data); onViewportLoad(data); }}
+                    />
+                )}
+
                 {/* Ajustar vista cuando hay ruta */}
                 <FitRouteBounds routeCoordinates={routeCoordinates} />
 
@@ -377,8 +483,17 @@ export default function MapView({
                     />
                 )}
 
+                {/* Clusters del viewport con la cantidad de recursos agrupados */}
+                {clusters.map((c) => (
+                    <ClusterMarker
+                        key={`${c.capa}-${c.latitud}-${c.longitud}`}
+                        cluster={c}
+                        capa={c.capa}
+                    />
+                ))}
+
                 {/* Marcadores verdes para zonas frescas */}
-                {Array.isArray(zonasFrescas) && zonasFrescas.map((z) => {
+                {Array.isArray(zonasMapa) && zonasMapa.map((z) => {
                     const distancia = calcularDistanciaDesdeUsuario(z.latitud, z.longitud);
                     const isHighlighted = highlightedMarker && highlightedMarker.id_zona === z.id_zona;
                     
@@ -411,7 +526,7 @@ export default function MapView({
                 })}
 
                 {/* Marcadores azules para puntos de hidratación */}
-                {Array.isArray(puntosHidratacion) && puntosHidratacion.map((p) => {
+                {Array.isArray(puntosMapa) && puntosMapa.map((p) => {
                     const distancia = calcularDistanciaDesdeUsuario(p.latitud, p.longitud);
                     const isHighlighted = highlightedMarker && highlightedMarker.id_punto === p.id_punto;
                     
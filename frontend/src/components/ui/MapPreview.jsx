@@ -23,7 +23,7 @@ export default function MapPreview() {
 
             <div className="mt-body">
                 <div style={{ height: "200px", width: "100%", borderRadius: "12px", overflow: "hidden" }}>
-                    <MapView mini />
+                    <MapView mini capasViewport="puntos,zonas" />
                 </div>
             </div>
 
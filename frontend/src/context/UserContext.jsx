@@ -8,7 +8,7 @@
 import { createContext, useState, useEffect } from "react";
 
 // Importación del servicio API
-import API from "../services/api.js";
+import API, { API_URL } from "../services/api.js";
 
 export const UserContext = createContext();
 
@@ -44,8 +44,9 @@ export const UserProvider = ({ children }) => {
             setUser(normalized);
 
         } catch {
-            // Token inválido
+            // Token inválido (y no se pudo renovar)
             localStorage.removeItem("token");
+            localStorage.removeItem("refresh_token");
             setToken(null);
             setUser(null);
         }
@@ -98,8 +99,9 @@ export const UserProvider = ({ children }) => {
         const data = await res.json();
         const token = data.access_token;
 
-        // Guardar token
+        // Guardar token y refresh token (renueva la sesión sin volver a pedir la contraseña)
         localStorage.setItem("token", token);
+        localStorage.setItem("refresh_token", data.refresh_token);
         setToken(token);
 
         // Obtener perfil real y normalizado
@@ -120,7 +122,15 @@ export const UserProvider = ({ children }) => {
 
     // Función de logout
     const logout = () => {
+        // Revocar la sesión en el servidor (sin esperar la respuesta)
+        const refreshToken = localStorage.getItem("refresh_token");
+        if (refreshToken) {
+            const form = new FormData();
+            form.append("refresh_token", refreshToken);
+            fetch(`${API_URL}/usuarios/logout`, { method: "POST", body: form }).catch(() => {});
+        }
         localStorage.removeItem("token");
+        localStorage.removeItem("refresh_token");
         setUser(null);
         setToken(null);
     };
@@ -21,15 +21,11 @@ import MapFullscreenModal from "../components/maps/MapFullscreenModal.jsx";
 
 // Importaciones de servicios
 import { getClima } from "../services/climaService.js";
-import zonasService from "../services/zonasService.js";
-import puntosService from "../services/puntosService.js";
+import mapaService from "../services/mapaService.js";
 import alertasService from "../services/alertasService.js";
 import notificacionesService from "../services/notificacionesService.js";
 import notificacionesGlobalesService from "../services/notificacionesGlobalesService.js";
 
-// Importación de utilidades de distancia
-import { encontrarPuntoMasCercano } from "../utils/distanceUtils";
-
 // Importaciones de datos
 import { consejosData } from "../data/consejosData.js";
 
@@ -47,9 +43,8 @@ export default function Home() {
     // Estado para consejos aleatorios
     const [consejosAleatorios, setConsejosAleatorios] = useState([]);
 
-    // Estados para datos del backend
-    const [zonasFrescas, setZonasFrescas] = useState([]);
-    const [puntosHidratacion, setPuntosHidratacion] = useState([]);
+    // Totales de zonas frescas y puntos de hidratación activos (del viewport del mapa)
+    const [totales, setTotales] = useState({ zonas: 0, puntos: 0 });
 
     // Estado para marcador seleccionado
     const [markerSeleccionado, setMarkerSeleccionado] = useState(null);
@@ -60,20 +55,13 @@ export default function Home() {
     const [highlightedMarker, setHighlightedMarker] = useState(null);
     const [resetViewTrigger, setResetViewTrigger] = useState(0);
 
-    // Efecto para cargar zonas frescas y puntos de hidratación
-    useEffect(() => {
-        const loadData = async () => {
-            try {
-                const zonas = await zonasService.listarZonas("activa");
-                const puntos = await puntosService.obtenerPuntosHidratacion();
-                setZonasFrescas(zonas || []);
-                setPuntosHidratacion(puntos || []);
-            } catch (error) {
-                console.error("Error cargando datos del mapa:", error);
-            }
-        };
-        loadData();
-    }, []);
+    // Los marcadores del mapa se piden por viewport: aquí solo se guardan los totales
+    const handleViewportLoad = (data) => {
+        setTotales({
+            zonas: data?.zonas?.total ?? 0,
+            puntos: data?.puntos?.total ?? 0,
+        });
+    };
 
     // Estados para datos climáticos
     const [weather, setWeather] = useState(null);
@@ -204,44 +192,48 @@ export default function Home() {
         setResetViewTrigger(prev => prev + 1);
     };
 
-    // Handler para ir a zona fresca más cercana
-    const handleIrZonaFrescaCercana = () => {
-        if (!userLocation || zonasFrescas.length === 0) {
+    // Handler para ir a zona fresca más cercana (búsqueda en el índice espacial del backend)
+    const handleIrZonaFrescaCercana = async () => {
+        let zonaMasCercana = null;
+        try {
+            zonaMasCercana = userLocation ? await mapaService.zonaMasCercana(userLocation) : null;
+        } catch (error) {
+            console.error("Error buscando la zona fresca más cercana:", error);
+        }
+        if (!zonaMasCercana) {
             alert("No se pudo obtener tu ubicación o no hay zonas frescas disponibles");
             return;
         }
 
-        const zonaMasCercana = encontrarPuntoMasCercano(userLocation, zonasFrescas);
-        
-        if (zonaMasCercana) {
-            // Trazar ruta
-            setRouteCoordinates([
-                [userLocation.lat, userLocation.lng],
-                [zonaMasCercana.latitud, zonaMasCercana.longitud]
-            ]);
-            setHighlightedMarker(zonaMasCercana);
-            setMarkerSeleccionado(zonaMasCercana);
-        }
+        // Trazar ruta
+        setRouteCoordinates([
+            [userLocation.lat, userLocation.lng],
+            [zonaMasCercana.latitud, zonaMasCercana.longitud]
+        ]);
+        setHighlightedMarker(zonaMasCercana);
+        setMarkerSeleccionado(zonaMasCercana);
     };
 
-    // Handler para ir a punto de hidratación más cercano
-    const handleIrPuntoHidratacionCercano = () => {
-        if (!userLocation || puntosHidratacion.length === 0) {
+    // Handler para ir a punto de hidratación más cercano (búsqueda en el índice espacial del backend)
+    const handleIrPuntoHidratacionCercano = async () => {
+        let puntoMasCercano = null;
+        try {
+            puntoMasCercano = userLocation ? await mapaService.puntoMasCercano(userLocation) : null;
+        } catch (error) {
+            console.error("Error buscando el punto de hidratación más cercano:", error);
+        }
+        if (!puntoMasCercano) {
             alert("No se pudo obtener tu ubicación o no hay puntos de hidratación disponibles");
             return;
         }
 
-        const puntoMasCercano = encontrarPuntoMasCercano(userLocation, puntosHidratacion);
-        
-        if (puntoMasCercano) {
-            // Trazar ruta
-            setRouteCoordinates([
-                [userLocation.lat, userLocation.lng],
-                [puntoMasCercano.latitud, puntoMasCercano.longitud]
-            ]);
-            setHighlightedMarker(puntoMasCercano);
-            setMarkerSeleccionado(puntoMasCercano);
-        }
+        // Trazar ruta
+        setRouteCoordinates([
+            [userLocation.lat, userLocation.lng],
+            [puntoMasCercano.latitud, puntoMasCercano.longitud]
+        ]);
+        setHighlightedMarker(puntoMasCercano);
+        setMarkerSeleccionado(puntoMasCercano);
     };
 
     // Renderizado del componente
@@ -266,8 +258,8 @@ export default function Home() {
                                     <h3>🗺️ Cartagena de Indias - COLOMBIA</h3>
                                     <p className="map-location-desc">Se muestran todas las zonas frescas y puntos de hidratación en el mapa.</p>
                                     <div className="map-stats">
-                                        <span className="map-stat-item">Zonas Frescas en total: {zonasFrescas.length}</span>
-                                        <span className="map-stat-item">Puntos de Hidratacion en total: {puntosHidratacion.length}</span>
+                                        <span className="map-stat-item">Zonas Frescas en total: {totales.zonas}</span>
+                                        <span className="map-stat-item">Puntos de Hidratacion en total: {totales.puntos}</span>
                                     </div>
                                 </div>
                                 <div className="map-legend">
@@ -288,8 +280,8 @@ export default function Home() {
                             <MapView
                                 mini={true}
                                 onExpand={() => setOpenMap(true)}
-                                zonasFrescas={zonasFrescas}
-                                puntosHidratacion={puntosHidratacion}
+                                capasViewport="puntos,zonas"
+                                onViewportLoad={handleViewportLoad}
                                 onSelectMarker={handleSelectMarker}
                                 resetView={resetViewTrigger}
                                 routeCoordinates={routeCoordinates}
@@ -301,7 +293,7 @@ export default function Home() {
                                 <button 
                                     className="quick-nav-btn btn-zona-fresca"
                                     onClick={handleIrZonaFrescaCercana}
-                                    disabled={!userLocation || zonasFrescas.length === 0}
+                                    disabled={!userLocation || totales.zonas === 0}
                                 >
                                     <span className="btn-icon">🌳</span>
                                     <span className="btn-text">Ver Zona Fresca Más Cercana</span>
@@ -309,7 +301,7 @@ export default function Home() {
                                 <button 
                                     className="quick-nav-btn btn-punto-hidratacion"
                                     onClick={handleIrPuntoHidratacionCercano}
-                                    disabled={!userLocation || puntosHidratacion.length === 0}
+                                    disabled={!userLocation || totales.puntos === 0}
                                 >
                                     <span className="btn-icon">💧</span>
                                     <span className="btn-text">Ver Punto de Hidratación Más Cercano</span>
@@ -370,8 +362,7 @@ export default function Home() {
             <MapFullscreenModal 
                 open={openMap} 
                 onClose={() => setOpenMap(false)}
-                zonasFrescas={zonasFrescas}
-                puntosHidratacion={puntosHidratacion}
+                capasViewport="puntos,zonas"
                 onSelectMarker={handleSelectMarker}
                 zonaSeleccionada={markerSeleccionado?.id_zona ? markerSeleccionado : null}
                 puntoSeleccionado={markerSeleccionado?.id_punto ? markerSeleccionado : null}
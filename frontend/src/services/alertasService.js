@@ -2,17 +2,22 @@
 
 // frontend/src/services/alertasService.js
 
-import api from "./api";
+import api, { listarTodo } from "./api";
 
 // Obtener alerta actual
 export const obtenerAlertaActual = () => {
     return api.get("/alertas_calor/actual");
 };
 
+// Obtener las ventanas de riesgo de calor pronosticadas (24-72 horas)
+export const obtenerPronosticoAlertas = async (horas = 48, ciudad = "Cartagena") => {
+    const response = await api.get("/alertas_calor/pronostico", { params: { horas, ciudad } });
+    return response.data.data;
+};
+
 // Listar todas las alertas
 export const listarAlertas = async () => {
-    const response = await api.get("/alertas_calor/");
-    return response.data.data || [];
+    return listarTodo("/alertas_calor/");
 };
 
 // Crear alerta manual
@@ -22,6 +22,81 @@ API.interceptors.request.use((config) => {
     return config;
 });
 
+// Renovación en curso compartida por las peticiones que reciben 401 a la vez
+let renovacion = null;
+
+// Pide al servidor un access token nuevo con el refresh token indicado
+const pedirRenovacion = async (refreshToken) => {
+    const form = new FormData();
+    form.append("refresh_token", refreshToken);
+    const res = await fetch(`${API_URL}/usuarios/refresh`, { method: "POST", body: form });
+    if (!res.ok) {
+        // Solo se descarta si otra pestaña no lo reemplazó mientras tanto
+        if (localStorage.getItem("refresh_token") === refreshToken) {
+            localStorage.removeItem("refresh_token");
+        }
+        return null;
+    }
+    const data = await res.json();
+    localStorage.setItem("token", data.access_token);
+    localStorage.setItem("refresh_token", data.refresh_token);
+    return data.access_token;
+};
+
+// Renueva dentro de un lock compartido por las pestañas (Web Locks, si el navegador lo
+// tiene): el refresh token de localStorage es uno solo y cada uno sirve una vez
+const renovarEntrePestanas = async (refreshToken) => {
+    if (!navigator.locks) return pedirRenovacion(refreshToken);
+    return navigator.locks.request("calorsos_renovacion", async () => {
+        // Otra pestaña ya lo renovó mientras se esperaba el lock
+        const actual = localStorage.getItem("refresh_token");
+        if (actual !== refreshToken) return actual ? localStorage.getItem("token") : null;
+        return pedirRenovacion(refreshToken);
+    });
+};
+
+// Cambia el refresh token guardado por un access token nuevo (cada refresh token sirve una vez)
+export const renovarSesion = async () => {
+    const refreshToken = localStorage.getItem("refresh_token");
+    if (!refreshToken) return null;
+    if (!renovacion) {
+        renovacion = renovarEntrePestanas(refreshToken)
+            .catch(() => null)
+            .finally(() => { renovacion = null; });
+    }
+    return renovacion;
+};
+
+// Interceptor de respuesta: si el access token venció, se renueva y se reintenta una vez
+API.interceptors.response.use(
+    (response) => response,
+    async (error) => {
+        const original = error.config;
+        if (error.response?.status === 401 && original && !original._reintento) {
+            original._reintento = true;
+            const token = await renovarSesion();
+            if (token) {
+                original.headers.Authorization = `Bearer ${token}`;
+                return API(original);
+            }
+        }
+        return Promise.reject(error);
+    }
+);
+
+// Recorre un listado paginado siguiendo next_cursor y retorna todas las filas.
+// 'clave' es el campo de la respuesta con las filas ("data" o, en /usuarios/, "usuarios")
+export const listarTodo = async (url, params = {}, clave = "data") => {
+    const filas = [];
+    let cursor = null;
+    do {
+        const res = await API.get(url, { params: { ...params, limit: 1000, ...(cursor ? { cursor } : {}) } });
+        filas.push(...(res.data[clave] || []));
+        cursor = res.data.next_cursor;
+    } while (cursor);
+    return filas;
+};
+
 // Exportar cliente configurado
 export default API;
 
@@ -0,0 +1,49 @@
+// Inicio mapaService.js
+
+// frontend/src/services/mapaService.js
+
+// Importación del cliente API configurado
+import API from "./api.js";
+
+// Radio máximo que aceptan las búsquedas de cercanos (km)
+const RADIO_CERCANOS_KM = 50;
+
+// Función para obtener los marcadores visibles del mapa (clusters o recursos según el zoom)
+const obtenerMarcadoresViewport = async (limites, zoom, capas = "puntos,zonas") => {
+    const res = await API.get("/mapa/viewport", {
+        params: {
+            sur: limites.getSouth(),
+            oeste: limites.getWest(),
+            norte: limites.getNorth(),
+            este: limites.getEast(),
+            zoom,
+            capas,
+        },
+    });
+    return res.data.data;
+};
+
+// Función para obtener la zona fresca activa más cercana a una ubicación
+const zonaMasCercana = async (ubicacion) => {
+    const res = await API.get("/zonas_frescas/cercanas", {
+        params: { lat: ubicacion.lat, lon: ubicacion.lng, radio_km: RADIO_CERCANOS_KM, k: 1 },
+    });
+    return res.data.data?.[0] || null;
+};
+
+// Función para obtener el punto de hidratación activo más cercano a una ubicación
+const puntoMasCercano = async (ubicacion) => {
+    const res = await API.get("/puntos_hidratacion/cercanos", {
+        params: { lat: ubicacion.lat, lon: ubicacion.lng, radio_km: RADIO_CERCANOS_KM, k: 1 },
+    });
+    return res.data.data?.[0] || null;
+};
+
+// Exportar objeto con todas las funciones
+export default {
+    obtenerMarcadoresViewport,
+    zonaMasCercana,
+    puntoMasCercano,
+};
+
+// Fin mapaService.js
@@ -2,7 +2,7 @@
 
 // frontend/src/services/notificacionesApiService.js
 
-import api from "./api";
+import api, { listarTodo } from "./api";
 
 // Crear notificación individual
 export const crearNotificacion = (data) => {
@@ -17,8 +17,7 @@ export const crearNotificacionGlobal = (mensaje) => {
 // Listar notificaciones
 export const listarNotificaciones = async (idUsuario = null) => {
     const params = idUsuario ? { id_usuario: idUsuario } : {};
-    const response = await api.get("/notificaciones/", { params });
-    return response.data.data || [];
+    return listarTodo("/notificaciones/", params);
 };
 
 // Obtener notificación por ID
@@ -5,15 +5,23 @@
 // Servicio para monitorear notificaciones globales desde el backend
 // Funciona independientemente de la página actual
 
-import api from './api.js';
+import api, { API_URL, renovarSesion } from './api.js';
 import notificacionesService from './notificacionesService.js';
 
 class NotificacionesGlobalesService {
     constructor() {
         this.intervalId = null;
+        this.eventSource = null;
         this.lastNotificationId = null;
+        this.lastEventId = null;
+        this.streamFailures = 0;
+        this.shownIds = new Set(); // Ids ya mostrados por el flujo, para no repetirlos al consultar
+        this.pollingEvery = null;
         this.isMonitoring = false;
-        this.checkInterval = 30000; // Verificar cada 30 segundos
+        this.checkInterval = 30000; // Verificar cada 30 segundos sin EventSource
+        // Con el flujo abierto también se consulta, más lento: los eventos publicados
+        // por otro proceso del backend (worker, otro worker de uvicorn) no llegan por él
+        this.streamCheckInterval = 120000;
     }
 
     // Iniciar monitoreo de notificaciones globales
@@ -26,10 +34,77 @@ class NotificacionesGlobalesService {
         // Verificar inmediatamente
         this.checkForNewNotifications();
 
-        // Configurar intervalo de verificación
+        // Preferir el canal push (Server-Sent Events) y consultar periódicamente
+        // (cada checkInterval sin flujo, cada streamCheckInterval con él)
+        this.startEventStream();
+        this.startPolling();
+    }
+
+    // Consultar periódicamente, al ritmo que corresponde a si el flujo está abierto
+    startPolling() {
+        if (!this.isMonitoring) return;
+        const intervalo = this.eventSource ? this.streamCheckInterval : this.checkInterval;
+        if (this.intervalId && this.pollingEvery === intervalo) return;
+        if (this.intervalId) clearInterval(this.intervalId);
+        this.pollingEvery = intervalo;
         this.intervalId = setInterval(() => {
             this.checkForNewNotifications();
-        }, this.checkInterval);
+        }, intervalo);
+    }
+
+    // Abrir el flujo de eventos del backend. El navegador reconecta solo y envía
+    // Last-Event-ID, así que solo llegan los eventos nuevos o perdidos
+    startEventStream() {
+        const token = localStorage.getItem('token');
+        if (typeof EventSource === 'undefined' || !token) return false;
+
+        // Al reabrir el flujo, el último id recibido evita perder los eventos intermedios
+        let url = `${API_URL}/eventos/?token=${encodeURIComponent(token)}`;
+        if (this.lastEventId) url += `&last_event_id=${encodeURIComponent(this.lastEventId)}`;
+        const fuente = new EventSource(url);
+        this.eventSource = fuente;
+
+        fuente.onopen = () => { this.streamFailures = 0; };
+
+        // Si el navegador cierra el flujo (por ejemplo, 401 al reconectar con el token
+        // vencido), se renueva la sesión y se reabre; si no se puede, se consulta periódicamente
+        fuente.onerror = async () => {
+            if (fuente.readyState !== EventSource.CLOSED || this.eventSource !== fuente) return;
+            fuente.close();
+            this.eventSource = null;
+            if (!this.isMonitoring) return;
+
+            this.streamFailures += 1;
+            const token = this.streamFailures <= 1 ? await renovarSesion() : null;
+            if (!this.isMonitoring) return;
+            if (!token || !this.startEventStream()) {
+                console.warn('No se pudo reabrir el flujo de eventos; se consultará periódicamente');
+            }
+            this.startPolling();
+        };
+
+        // Los eventos no mueven lastNotificationId: la consulta periódica debe seguir
+        // viendo las que no llegaron por el flujo. Los ids mostrados se recuerdan para
+        // no repetirlos y un evento sin id (global en modo copias) solo adelanta la consulta
+        const handleEvent = (event) => {
+            if (event.lastEventId) this.lastEventId = event.lastEventId;
+            const notification = JSON.parse(event.data);
+            if (notification.id_notificacion == null) {
+                this.checkForNewNotifications();
+                return;
+            }
+            if (this.shownIds.has(String(notification.id_notificacion))) return;
+            this.rememberShown(notification.id_notificacion);
+            this.processNotification(notification);
+        };
+
+        this.eventSource.addEventListener('notificacion', handleEvent);
+        this.eventSource.addEventListener('notificacion_global', handleEvent);
+
+        // El historial del servidor ya no cubre la desconexión: recargar una vez
+        this.eventSource.addEventListener('reinicio', () => this.checkForNewNotifications());
+
+        return true;
     }
 
     // Detener monitoreo
@@ -42,35 +117,54 @@ class NotificacionesGlobalesService {
         if (this.intervalId) {
             clearInterval(this.intervalId);
             this.intervalId = null;
+            this.pollingEvery = null;
+        }
+
+        if (this.eventSource) {
+            this.eventSource.close();
+            this.eventSource = null;
+        }
+    }
+
+    // Recordar un id mostrado por el flujo (solo los más recientes)
+    rememberShown(id) {
+        this.shownIds.add(String(id));
+        if (this.shownIds.size > 200) {
+            this.shownIds.delete(this.shownIds.values().next().value);
         }
     }
 
     // Verificar nuevas notificaciones
     async checkForNewNotifications() {
         try {
-            // Obtener la última notificación del usuario actual
-            const response = await api.get('/notificaciones/');
-            const notificaciones = response.data?.data || [];
-
-            if (notificaciones.length === 0) return;
-
-            // Ordenar por fecha descendente (más reciente primero)
-            const sortedNotifications = notificaciones.sort((a, b) =>
-                new Date(b.fecha_envio) - new Date(a.fecha_envio)
-            );
-
-            const latestNotification = sortedNotifications[0];
+            // Primera consulta: solo la notificación más reciente como punto de partida
+            if (!this.lastNotificationId) {
+                const response = await api.get('/notificaciones/', { params: { limit: 1 } });
+                const ultima = response.data?.data?.[0];
+                if (!ultima) return;
+                this.lastNotificationId = ultima.id_notificacion;
+                if (this.shownIds.delete(String(ultima.id_notificacion))) return;
+                await this.processNotification(ultima);
+                return;
+            }
 
-            // Verificar si es una nueva notificación
-            if (!this.lastNotificationId || latestNotification.id_notificacion !== this.lastNotificationId) {
-                // Es una nueva notificación
-                this.lastNotificationId = latestNotification.id_notificacion;
+            // Siguientes consultas: solo las posteriores a la última vista, de la más antigua a la más nueva
+            const response = await api.get('/notificaciones/', { params: { since: this.lastNotificationId } });
+            const nuevas = response.data?.data || [];
 
-                // Determinar tipo de notificación y mostrarla
-                await this.processNotification(latestNotification);
+            for (const notificacion of nuevas) {
+                this.lastNotificationId = notificacion.id_notificacion;
+                // Ya mostrada por el flujo de eventos
+                if (this.shownIds.delete(String(notificacion.id_notificacion))) continue;
+                await this.processNotification(notificacion);
             }
 
         } catch (error) {
+            // La notificación de referencia ya no existe: volver a tomar la más reciente
+            if (error.response?.status === 404) {
+                this.lastNotificationId = null;
+                return;
+            }
             console.warn('Error verificando notificaciones globales:', error);
         }
     }
@@ -147,8 +241,10 @@ class NotificacionesGlobalesService {
     getStatus() {
         return {
             isMonitoring: this.isMonitoring,
+            isStreaming: this.eventSource !== null,
             lastNotificationId: this.lastNotificationId,
-            checkInterval: this.checkInterval
+            checkInterval: this.checkInterval,
+            streamCheckInterval: this.streamCheckInterval
         };
     }
 
@@ -156,10 +252,9 @@ class NotificacionesGlobalesService {
     setCheckInterval(intervalMs) {
         this.checkInterval = intervalMs;
 
-        // Reiniciar monitoreo con nuevo intervalo
-        if (this.isMonitoring) {
-            this.stopMonitoring();
-            this.startMonitoring();
+        // Reiniciar la consulta periódica con el nuevo intervalo
+        if (this.isMonitoring && !this.eventSource) {
+            this.startPolling();
         }
     }
 }
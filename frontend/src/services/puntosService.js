@@ -3,13 +3,12 @@
 // frontend/src/services/puntosService.js
 
 // Importación del cliente API configurado
-import API from "./api.js";
+import API, { listarTodo } from "./api.js";
 
 // Función para obtener puntos de hidratación
 const obtenerPuntosHidratacion = async (estado = "activa") => {
-    const url = estado !== "activa" ? "/puntos_hidratacion/" : `/puntos_hidratacion/?estado=${estado}`;
-    const res = await API.get(url);
-    return res.data.data;
+    const params = estado !== "activa" ? {} : { estado };
+    return listarTodo("/puntos_hidratacion/", params);
 };
 
 // Función para obtener punto específico por ID
@@ -3,7 +3,7 @@
 // frontend/src/services/reportesService.js
 
 // Importación del cliente API configurado
-import API from "./api";
+import API, { listarTodo } from "./api";
 
 /**
  * Crear un nuevo reporte.
@@ -43,13 +43,12 @@ export const crearReporte = async (reporte) => {
  */
 export const listarReportes = async (filtros = {}) => {
     try {
-        const params = new URLSearchParams();
-        if (filtros.id_usuario) params.append("id_usuario", filtros.id_usuario);
-        if (filtros.tipo) params.append("tipo", filtros.tipo);
-        if (filtros.estado) params.append("estado", filtros.estado);
+        const params = {};
+        if (filtros.id_usuario) params.id_usuario = filtros.id_usuario;
+        if (filtros.tipo) params.tipo = filtros.tipo;
+        if (filtros.estado) params.estado = filtros.estado;
 
-        const response = await API.get(`/reportes/?${params.toString()}`);
-        return response.data.data;
+        return await listarTodo("/reportes/", params);
     } catch (error) {
         console.error("Error listando reportes:", error.response?.data || error.message);
         throw error;
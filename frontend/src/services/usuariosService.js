@@ -4,7 +4,7 @@
 
 // Importaciones del cliente API y URL base
 import API from "./api.js";
-import { API_URL } from "./api.js";
+import { API_URL, listarTodo } from "./api.js";
 
 // Función para registrar nuevo usuario
 export const registerUser = async (data) => {
@@ -26,8 +26,7 @@ export const registerUser = async (data) => {
 // Función para listar todos los usuarios (solo admin)
 export const listarUsuarios = async () => {
     try {
-        const res = await API.get("/usuarios/");
-        return res.data.usuarios;
+        return await listarTodo("/usuarios/", {}, "usuarios");
     } catch (error) {
         console.error("Error al listar usuarios:", error);
         throw error;
@@ -3,7 +3,7 @@
 // frontend/src/services/zonasService.js
 
 // Importación del cliente API configurado
-import API from "./api";
+import API, { listarTodo } from "./api";
 
 // Servicio para manejar operaciones con zonas frescas
 const zonasService = {
@@ -11,9 +11,7 @@ const zonasService = {
     async listarZonas(estado = "activa") {
         try {
             // Si estado es null o vacío, obtener todas las zonas (para admin)
-            const url = estado ? `/zonas_frescas?estado=${estado}` : "/zonas_frescas";
-            const res = await API.get(url);
-            return res.data.data;
+            return await listarTodo("/zonas_frescas/", estado ? { estado } : {});
         } catch (error) {
             console.error("Error al listar zonas frescas:", error);
             throw error;